@@ -0,0 +1,188 @@
+"""
+Sprite atlas packing and lazy loading for the assets/ tree.
+
+The packer walks a folder of PNG sprites (creatures, traps, berries,
+environments, ...), bins them into a few large sheets with a shelf packer and
+writes the sheets plus a JSON index mapping each sprite name to its sheet and
+rect. At runtime `Atlas` reads only the index; a sheet is loaded and converted
+the first time one of its sprites is requested, and sprites are served as
+subsurfaces of their sheet, so startup opens one small file instead of one
+file per sprite and blits from the same sheet share a texture.
+
+Sprite names are paths relative to the source folder without the extension,
+with "/" separators, e.g. "creatures/forest/timber_wolf_walk_01".
+
+Pack the assets offline with:
+    python atlas.py assets --out assets/atlas
+"""
+
+import argparse
+import json
+import os
+import re
+
+import pygame
+
+INDEX_NAME = "atlas.json"
+INDEX_VERSION = 1
+DEFAULT_SHEET_SIZE = 2048
+DEFAULT_PADDING = 1  # transparent pixels between sprites, avoids bleeding when scaled
+SHEET_NAME = re.compile(r"atlas_\d+\.png")
+
+
+def pack_rects(sizes, sheet_size=DEFAULT_SHEET_SIZE, padding=DEFAULT_PADDING):
+    """
+    Place (width, height) rects on square sheets with a shelf packer.
+
+    Returns one (sheet, x, y) placement per input size, in input order.
+    """
+    placements = [None] * len(sizes)
+    # Tallest first keeps shelves tightly filled
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    sheet = 0
+    x = y = shelf_h = 0
+    for i in order:
+        w, h = sizes[i]
+        if w > sheet_size or h > sheet_size:
+            raise ValueError(f"sprite of size {w}x{h} does not fit on a {sheet_size}px sheet")
+        if x + w > sheet_size:
+            # start a new shelf
+            x = 0
+            y += shelf_h + padding
+            shelf_h = 0
+        if y + h > sheet_size:
+            # start a new sheet
+            sheet += 1
+            x = y = shelf_h = 0
+        placements[i] = (sheet, x, y)
+        x += w + padding
+        shelf_h = max(shelf_h, h)
+    return placements
+
+
+def find_sprites(src_dir, exclude=()):
+    """Map sprite names to PNG paths under src_dir"""
+    exclude = {os.path.abspath(path) for path in exclude}
+    sprites = {}
+    for root, dirs, files in os.walk(src_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) not in exclude)
+        for filename in sorted(files):
+            if not filename.lower().endswith(".png"):
+                continue
+            path = os.path.join(root, filename)
+            name = os.path.splitext(os.path.relpath(path, src_dir))[0].replace(os.sep, "/")
+            sprites[name] = path
+    return sprites
+
+
+def build_atlas(src_dir, out_dir, sheet_size=DEFAULT_SHEET_SIZE, padding=DEFAULT_PADDING):
+    """
+    Pack every PNG under src_dir into sheets in out_dir and write the index.
+    Sheets left over from an earlier pack with more sheets are deleted.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    sprites = find_sprites(src_dir, exclude=[out_dir])
+    names = list(sprites)
+    images = [pygame.image.load(sprites[name]) for name in names]
+    placements = pack_rects([img.get_size() for img in images], sheet_size, padding)
+
+    sheet_count = max((sheet for sheet, _, _ in placements), default=-1) + 1
+    # Trim each sheet to the area actually used
+    extents = [[0, 0] for _ in range(sheet_count)]
+    for img, (sheet, x, y) in zip(images, placements):
+        extents[sheet][0] = max(extents[sheet][0], x + img.get_width())
+        extents[sheet][1] = max(extents[sheet][1], y + img.get_height())
+    surfaces = [pygame.Surface(size, pygame.SRCALPHA) for size in extents]
+    for surf in surfaces:
+        surf.fill((0, 0, 0, 0))
+
+    index = {"version": INDEX_VERSION, "sheets": [], "sprites": {}}
+    for img, name, (sheet, x, y) in zip(images, names, placements):
+        surfaces[sheet].blit(img, (x, y))
+        index["sprites"][name] = [sheet, x, y, img.get_width(), img.get_height()]
+    for i, surf in enumerate(surfaces):
+        filename = f"atlas_{i}.png"
+        pygame.image.save(surf, os.path.join(out_dir, filename))
+        index["sheets"].append(filename)
+
+    with open(os.path.join(out_dir, INDEX_NAME), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    for filename in os.listdir(out_dir):
+        if SHEET_NAME.fullmatch(filename) and filename not in index["sheets"]:
+            os.remove(os.path.join(out_dir, filename))
+    return index
+
+
+class Atlas:
+    """
+    Lazily loaded sprite sheets described by an atlas index
+    """
+
+    def __init__(self, index_path):
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"{index_path} has unsupported atlas version {index.get('version')}")
+        base = os.path.dirname(index_path)
+        self.sheet_paths = [os.path.join(base, name) for name in index["sheets"]]
+        self.sprites = {name: tuple(entry) for name, entry in index["sprites"].items()}
+        self._sheets = [None] * len(self.sheet_paths)
+        self._cache = {}
+        self.sheets_loaded = 0
+
+    @classmethod
+    def open(cls, out_dir):
+        """Open the atlas in out_dir, or return None if it has not been packed"""
+        path = os.path.join(out_dir, INDEX_NAME)
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def __contains__(self, name):
+        return name in self.sprites
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def names(self, prefix=""):
+        """Sprite names starting with prefix, e.g. "creatures/forest/" """
+        return sorted(name for name in self.sprites if name.startswith(prefix))
+
+    def sheet(self, i):
+        """Get a sheet surface, loading and converting it on first use"""
+        surf = self._sheets[i]
+        if surf is None:
+            surf = pygame.image.load(self.sheet_paths[i])
+            if pygame.display.get_surface() is not None:
+                surf = surf.convert_alpha()
+            self._sheets[i] = surf
+            self.sheets_loaded += 1
+        return surf
+
+    def get(self, name, default=None):
+        """Get a sprite as a subsurface of its sheet"""
+        surf = self._cache.get(name)
+        if surf is not None:
+            return surf
+        entry = self.sprites.get(name)
+        if entry is None:
+            return default
+        sheet, x, y, w, h = entry
+        surf = self.sheet(sheet).subsurface((x, y, w, h))
+        self._cache[name] = surf
+        return surf
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack PNG sprites into atlas sheets")
+    parser.add_argument("src", help="folder of PNG sprites, e.g. assets")
+    parser.add_argument("--out", required=True, help="output folder for sheets and index")
+    parser.add_argument("--sheet-size", type=int, default=DEFAULT_SHEET_SIZE)
+    parser.add_argument("--padding", type=int, default=DEFAULT_PADDING)
+    args = parser.parse_args()
+    index = build_atlas(args.src, args.out, sheet_size=args.sheet_size, padding=args.padding)
+    print(f"Packed {len(index['sprites'])} sprites into {len(index['sheets'])} sheets in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,9 +22,10 @@ class Battle:
     Manages a battle between player and wild creature
     """
     
-    def __init__(self, player, wild_creature):
+    def __init__(self, player, wild_creature, capture_modifier=1.0):
         self.player = player
         self.wild_creature = wild_creature
+        self.capture_modifier = capture_modifier  # time of day and weather, see world_clock.py
         self.player_creature = player.get_active_creature()
         self.battle_log = []
         self.result = BattleResult.ONGOING
@@ -116,7 +117,7 @@ class Battle:
         
         # Calculate catch chance
         hp_factor = (3 * self.wild_creature.max_hp - 2 * self.wild_creature.current_hp) / (3 * self.wild_creature.max_hp)
-        catch_rate = hp_factor * trap.catch_rate * 255
+        catch_rate = min(255, hp_factor * trap.catch_rate * self.capture_modifier * 255)
         
         # Shake calculation (simplified)
         shake_check = int((65536 / (255 / catch_rate)) ** 0.25)
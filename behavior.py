@@ -0,0 +1,223 @@
+"""
+Overworld behavior for roaming wild creatures.
+
+Each creature has a temperament from the `behavior_modifiers` table in
+config/capture_probabilities.yaml: docile, neutral, aggressive, skittish or
+territorial. When the player comes within detection range, a creature rolls
+its temperament's flee chance once, lowered by the calming effect of a berry
+lure in reach. It may flee, it may defend its territory or confront the
+player, or it may just keep watching. Creatures also walk to berry lures
+within reach, more readily for berries their temperament prefers, and
+otherwise wander near home.
+
+Behavior is updated at three levels of detail around the player (the camera
+follows the player):
+- near creatures decide and steer every tick;
+- mid-range creatures do the same every MID_INTERVAL ticks, staggered by id;
+- far creatures get one statistical update for the whole group every
+  FAR_INTERVAL ticks, which forgets reactions and turns a random share of
+  them.
+All updates are vectorized over the selected creatures, so AI cost follows
+what is around the player rather than the world population.
+
+This module has no pygame dependency.
+"""
+
+import numpy as np
+
+from config_loader import load_config
+
+WANDER, WATCH, FLEE, APPROACH, DEFEND = range(5)
+STATE_NAMES = ["wander", "watch", "flee", "approach", "defend"]
+
+NEAR_RADIUS = 8  # tiles from the player: updated every tick
+MID_RADIUS = 16  # tiles: updated every MID_INTERVAL ticks
+MID_INTERVAL = 4
+FAR_INTERVAL = 30
+
+DETECTION_RANGE = 4  # tiles, scaled by a temperament's detection_range_multiplier
+RELEASE_FACTOR = 1.5  # reactions end when the player is this much farther than detection range
+TERRITORY_RADIUS = 5  # tiles around a creature's home
+TURN_RATE = 0.5  # wandering heading changes per second
+LURE_RATE = 0.8  # chance per second, times berry_effectiveness and preference, to head for a lure in reach
+ARRIVE_DISTANCE = 8  # pixels from a lure at which a creature stops to eat
+
+SPEEDS = np.array([40.0, 40.0, 110.0, 60.0, 75.0], dtype=np.float32)  # pixels per second, by state
+
+
+def load_temperaments():
+    """Temperament names and their behavior parameters as arrays"""
+    table = load_config("capture_probabilities")["behavior_modifiers"]
+    names = list(table)
+    return names, {
+        "flee_chance": np.array([table[n].get("flee_chance", 0.0) for n in names]),
+        "detection": np.array([table[n].get("detection_range_multiplier", 1.0) for n in names]),
+        "defend_chance": np.array([table[n].get("defend_territory_chance", 0.0) for n in names]),
+        "berry_effectiveness": np.array([table[n].get("berry_effectiveness", 1.0) for n in names]),
+        "confronts": np.array([n == "aggressive" for n in names]),
+    }
+
+
+TEMPERAMENTS, TEMPERAMENT_PARAMS = load_temperaments()
+
+
+def unit(vectors):
+    """Vectors scaled to length 1; zero vectors stay zero"""
+    length = np.hypot(vectors[:, 0], vectors[:, 1])
+    return vectors / np.maximum(length, 1e-6)[:, None]
+
+
+class BehaviorEngine:
+    """
+    Level-of-detail behavior updates for the creatures in an EntityStore
+    """
+
+    def __init__(self, store, tile_size, rng=None):
+        self.store = store
+        self.tile_size = tile_size
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.params = TEMPERAMENT_PARAMS
+        self.lure_pos = np.zeros((0, 2), dtype=np.float32)
+        self.lure_radius = np.zeros(0, dtype=np.float32)
+        self.lure_calm = np.zeros(0, dtype=np.float32)
+        self.lure_preference = np.zeros((0, len(TEMPERAMENTS)), dtype=np.float32)
+        self.updated = {"near": 0, "mid": 0, "far": 0}  # creatures updated by the last update()
+        self.detect_range = DETECTION_RANGE * tile_size * self.params["detection"]  # pixels, by temperament
+        self.territory = TERRITORY_RADIUS * tile_size
+        self._slots = np.zeros(0, dtype=np.int64)
+
+    def set_lures(self, positions, radii, calm=None, preference=None):
+        """
+        Replace the berry lures creatures can walk to (world pixels). `calm`
+        is the share of each lure's flee chance it takes away from creatures
+        in reach, and `preference` each lure's pull by temperament, 1 if not
+        given.
+        """
+        self.lure_pos = np.asarray(positions, dtype=np.float32).reshape(-1, 2)
+        self.lure_radius = np.asarray(radii, dtype=np.float32).reshape(-1)
+        if calm is None:
+            calm = np.zeros(len(self.lure_radius))
+        self.lure_calm = np.asarray(calm, dtype=np.float32).reshape(-1)
+        if preference is None:
+            preference = np.ones((len(self.lure_radius), len(TEMPERAMENTS)))
+        self.lure_preference = np.asarray(preference, dtype=np.float32).reshape(-1, len(TEMPERAMENTS))
+
+    def update(self, dt, player_x, player_y, tick):
+        """Run this tick's behavior updates around the player"""
+        store = self.store
+        n = store.size
+        self.updated = {"near": 0, "mid": 0, "far": 0}
+        if store.count == 0:
+            return
+        offset = store.pos[:n] - (player_x, player_y)
+        dist2 = offset[:, 0] ** 2 + offset[:, 1] ** 2
+        near_r2 = (NEAR_RADIUS * self.tile_size) ** 2
+        mid_r2 = (MID_RADIUS * self.tile_size) ** 2
+        alive = store.alive[:n]
+
+        # near and this tick's share of mid-range creatures are updated together,
+        # the mid-range ones with the time since their last update
+        near = alive & (dist2 <= near_r2)
+        mid = alive & (dist2 > near_r2) & (dist2 <= mid_r2) & (self.slots[:n] == tick % MID_INTERVAL)
+        idx = np.flatnonzero(near | mid)
+        if len(idx):
+            self.think(idx, np.where(near[idx], dt, dt * MID_INTERVAL), player_x, player_y)
+        self.updated["near"] = int(np.count_nonzero(near))
+        self.updated["mid"] = len(idx) - self.updated["near"]
+
+        if tick % FAR_INTERVAL == 0:
+            far = np.flatnonzero(alive & (dist2 > mid_r2))
+            self.advance_far(far, dt * FAR_INTERVAL)
+            self.updated["far"] = len(far)
+
+    @property
+    def slots(self):
+        """Which of the MID_INTERVAL ticks each entity's mid-range update falls on"""
+        if len(self._slots) != self.store.capacity:
+            self._slots = np.arange(self.store.capacity) % MID_INTERVAL
+        return self._slots
+
+    def think(self, idx, dt, player_x, player_y):
+        """Decide and steer the selected creatures; dt is per creature"""
+        store = self.store
+        params = self.params
+        k = len(idx)
+        pos = store.pos[idx]
+        temperament = store.temperament[idx]
+        old = store.state[idx]
+        rolls = self.rng.random((k, 4))  # flee, defend, turn and heading rolls
+
+        to_player = np.array((player_x, player_y), dtype=np.float32) - pos
+        player_dist = np.hypot(to_player[:, 0], to_player[:, 1])
+        detect_range = self.detect_range[temperament]
+
+        # reactions to the player end once it is well out of range
+        reacting = (old == WATCH) | (old == FLEE) | (old == DEFEND)
+        state = np.where(reacting & (player_dist > detect_range * RELEASE_FACTOR), WANDER, old)
+
+        # the nearest lure, if any is in reach
+        to_lure = np.zeros((k, 2), dtype=np.float32)
+        in_reach = np.zeros(k, dtype=bool)
+        if len(self.lure_pos):
+            to_lures = self.lure_pos[None, :, :] - pos[:, None, :]
+            lure_dist = np.hypot(to_lures[..., 0], to_lures[..., 1])
+            nearest = np.argmin(lure_dist, axis=1)
+            in_reach = lure_dist[np.arange(k), nearest] <= self.lure_radius[nearest]
+            to_lure = to_lures[np.arange(k), nearest]
+
+        # a creature that notices the player rolls its reaction once
+        noticed = ((state == WANDER) | (state == APPROACH)) & (player_dist <= detect_range)
+        if noticed.any():
+            flee_chance = params["flee_chance"][temperament]
+            if in_reach.any():
+                flee_chance = flee_chance * (1.0 - self.lure_calm[nearest] * in_reach)
+            flee = rolls[:, 0] < flee_chance
+            home_to_player = np.hypot(player_x - store.home[idx, 0], player_y - store.home[idx, 1])
+            defend = params["confronts"][temperament] | (
+                (home_to_player <= self.territory) & (rolls[:, 1] < params["defend_chance"][temperament]))
+            state = np.where(noticed, np.where(flee, FLEE, np.where(defend, DEFEND, WATCH)), state)
+
+        # lures draw in creatures that are not reacting to the player
+        if len(self.lure_pos):
+            pull = params["berry_effectiveness"][temperament] * self.lure_preference[nearest, temperament]
+            chance = 1.0 - np.exp(-LURE_RATE * pull * dt)
+            drawn = (state == WANDER) & in_reach & (rolls[:, 1] < chance)
+            state = np.where(drawn, APPROACH, np.where((state == APPROACH) & ~in_reach, WANDER, state))
+        else:
+            state = np.where(state == APPROACH, WANDER, state)
+
+        # steer: pick each creature's heading by its state
+        calm = (state == WANDER) | (state == WATCH)
+        turn = calm & ((rolls[:, 2] < 1.0 - np.exp(-TURN_RATE * dt)) | (old != state))
+        heading = unit(store.vel[idx])
+        if turn.any():
+            angles = rolls[:, 3] * (2.0 * np.pi)
+            heading = np.where(turn[:, None], np.stack([np.cos(angles), np.sin(angles)], axis=1), heading)
+        to_home = store.home[idx] - pos
+        strayed = calm & (np.hypot(to_home[:, 0], to_home[:, 1]) > self.territory)  # wanderers head home
+        if strayed.any():
+            heading = np.where(strayed[:, None], unit(to_home), heading)
+        if not calm.all():
+            toward_player = to_player / np.maximum(player_dist, 1e-6)[:, None]
+            heading = np.where((state == FLEE)[:, None], -toward_player, heading)
+            heading = np.where((state == DEFEND)[:, None], toward_player, heading)
+            arrived = np.hypot(to_lure[:, 0], to_lure[:, 1]) <= ARRIVE_DISTANCE  # eating: stand still
+            heading = np.where((state == APPROACH)[:, None], unit(to_lure) * ~arrived[:, None], heading)
+
+        store.vel[idx] = heading * SPEEDS[state][:, None]
+        store.state[idx] = state
+
+    def advance_far(self, idx, dt):
+        """
+        Statistical update for creatures far from the player: reactions are
+        forgotten and the share of them expected to turn within dt turns.
+        """
+        if len(idx) == 0:
+            return
+        store = self.store
+        store.state[idx] = WANDER
+        store.vel[idx] = unit(store.vel[idx]) * SPEEDS[WANDER]
+        turn = idx[self.rng.random(len(idx)) < 1.0 - np.exp(-TURN_RATE * dt)]
+        angles = self.rng.uniform(0.0, 2.0 * np.pi, len(turn))
+        store.vel[turn, 0] = np.cos(angles) * SPEEDS[WANDER]
+        store.vel[turn, 1] = np.sin(angles) * SPEEDS[WANDER]
@@ -0,0 +1,281 @@
+"""
+Event-driven berry farming for Trapper-Mastering.
+
+A farm is a grid of plots. A planted berry grows from seed to harvest in its
+`growth_time_hours`, scaled by the settings in config/berry_types.yaml:
+- the soil's growth multiplier and the fertilizer's growth boost;
+- watering, which speeds growth by `bonus_growth` for `frequency_hours`;
+- a festival event halving growth time, set by hand or followed from an
+  event_calendar.EventCalendar.
+On the way the plot sprouts, flowers and ripens. At flowering, a berry
+planted next to a mutation partner (for example oran next to sitrus) may
+turn into the mutation's result, if the plot has the soil, fertilizer or
+festival the mutation requires.
+
+Nothing is scanned per frame. Each plot stores its growth progress and rate
+as of the last change. Its next state changes are queued in one heap by
+game hour: sprouting, flowering (the mutation roll), ripening and drying
+out. Watering, festivals and harvests bump the plot's version, and
+superseded entries are skipped when popped. `advance(now)` pops only what
+is due, so catching up after hours offline costs O(k log n) for k due
+events among n queued ones. With a calendar, `advance` stops at each event
+boundary on the way to switch festivals, and does nothing extra between
+boundaries.
+
+This module has no pygame dependency.
+"""
+
+import heapq
+import random
+from itertools import count
+
+from config_loader import load_config
+
+EMPTY, SEEDED, SPROUTED, FLOWERING, RIPE = range(5)
+STAGE_NAMES = ["empty", "seeded", "sprouted", "flowering", "ripe"]
+
+# growth progress (0..1) at which each stage begins, and the event queued for it
+SPROUT_AT = 0.25
+FLOWER_AT = 0.5
+SPROUT, FLOWER, RIPEN, DRY = "sprout", "flower", "ripen", "dry"
+STAGE_EVENTS = [(SPROUT_AT, SPROUTED, SPROUT), (FLOWER_AT, FLOWERING, FLOWER), (1.0, RIPE, RIPEN)]
+
+DEFAULT_SOIL = "basic_soil"
+
+
+def parse_yield(text):
+    """(low, high) from a config yield such as "1-3" or 4"""
+    low, _, high = str(text).partition("-")
+    return int(low), int(high or low)
+
+
+def load_mutations(berries, mutations, conditions=None):
+    """
+    Mutation partners keyed by the unordered pair of parent berries. A
+    mutation's `requires` names a soil, fertilizer or event that must be
+    present at the flowering plot; with `conditions`, the known names, any
+    other requirement is refused rather than silently never met.
+    """
+    table = {}
+    for name, mutation in mutations.items():
+        first, second = name.split("_x_")
+        pair = frozenset((first + "_berry", second + "_berry"))
+        requires = mutation.get("requires")
+        if requires is not None and conditions is not None and requires not in conditions:
+            raise ValueError(f"mutation {name} requires {requires!r}, which is no soil, fertilizer or event")
+        if pair <= set(berries):
+            table[pair] = (mutation["result"], mutation["chance"], requires)
+    return table
+
+
+class Plot:
+    """One farm plot: what grows there and how fast, as of its last change"""
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.stage = EMPTY
+        self.berry = None
+        self.soil = DEFAULT_SOIL
+        self.fertilizer = None
+        self.progress = 0.0  # share of growth done at hour `updated`
+        self.updated = 0.0
+        self.rate = 0.0  # progress per hour
+        self.watered_until = None  # game hour the last watering runs out
+        self.version = 0  # bumped on every change; queued events of older versions are stale
+
+
+class BerryFarm:
+    """
+    A grid of plots advanced by a queue of timed state changes
+    """
+
+    def __init__(self, width, height, rng=random, config=None, calendar=None, now=0.0):
+        if config is None:
+            config = load_config("berry_types")
+        self.width = width
+        self.height = height
+        self.rng = rng
+        self.berries = config["berries"]
+        farming = config["farming"]
+        self.soils = farming["soil_types"]
+        self.fertilizers = farming["fertilizers"]
+        self.water_hours = farming["watering"]["frequency_hours"]
+        self.water_bonus = farming["watering"]["bonus_growth"]
+        self.events = config.get("events", {})
+        self.mutations = load_mutations(self.berries, config.get("mutations", {}),
+                                        set(self.soils) | set(self.fertilizers) | set(self.events))
+        self.festivals = ()
+        self.plots = [Plot(x, y) for y in range(height) for x in range(width)]
+        self._queue = []  # (game hour, sequence, plot index, plot version, event)
+        self._sequence = count()  # keeps events due at the same hour in the order they were queued
+        self.processed = 0  # events popped by advance(), stale ones included
+        self.calendar = calendar
+        self.calendar_state = None
+        if calendar is not None:
+            self.follow_calendar(now)
+
+    def plot(self, x, y):
+        return self.plots[y * self.width + x]
+
+    def __len__(self):
+        """Number of queued events, stale ones included"""
+        return len(self._queue)
+
+    def festival_effects(self):
+        return [effect for name in self.festivals for effect in self.events.get(name, {}).get("effects", [])]
+
+    def growth_rate(self, plot, now):
+        """Progress per hour of a plot's berry under its current conditions"""
+        hours = self.berries[plot.berry]["growth_time_hours"] * self.soils[plot.soil]["growth_multiplier"]
+        if plot.fertilizer is not None:
+            hours *= 1.0 - self.fertilizers[plot.fertilizer].get("growth_boost", 0.0)
+        rate = 1.0 / hours
+        if plot.watered_until is not None and plot.watered_until > now:
+            rate *= 1.0 + self.water_bonus
+        if "all_berry_growth_time_halved" in self.festival_effects():
+            rate *= 2.0
+        return rate
+
+    def _push(self, hour, plot, event):
+        index = plot.y * self.width + plot.x
+        heapq.heappush(self._queue, (hour, next(self._sequence), index, plot.version, event))
+
+    def _reschedule(self, plot, now):
+        """Bring a plot's progress up to `now`, take its new rate and queue its next changes"""
+        plot.progress = min(1.0, plot.progress + plot.rate * (now - plot.updated))
+        plot.updated = now
+        plot.version += 1
+        if plot.stage in (EMPTY, RIPE):
+            plot.rate = 0.0
+            return
+        plot.rate = self.growth_rate(plot, now)
+        for threshold, stage, event in STAGE_EVENTS:
+            if stage > plot.stage:
+                self._push(now + max(0.0, threshold - plot.progress) / plot.rate, plot, event)
+                break
+        if plot.watered_until is not None and plot.watered_until > now:
+            self._push(plot.watered_until, plot, DRY)
+
+    def plant(self, x, y, berry, now, soil=DEFAULT_SOIL, fertilizer=None):
+        """Plant a berry on an empty plot at game hour `now`"""
+        plot = self.plot(x, y)
+        if plot.stage != EMPTY:
+            raise ValueError(f"plot ({x}, {y}) is not empty")
+        if not self.berries[berry].get("can_plant", False):
+            raise ValueError(f"{berry} cannot be planted")
+        plot.stage = SEEDED
+        plot.berry = berry
+        plot.soil = soil
+        plot.fertilizer = fertilizer
+        plot.progress = 0.0
+        plot.rate = 0.0
+        plot.watered_until = None
+        self._reschedule(plot, now)
+        return plot
+
+    def water(self, x, y, now):
+        """Water a growing plot: it grows faster for the next frequency_hours"""
+        plot = self.plot(x, y)
+        if plot.stage in (EMPTY, RIPE):
+            return False
+        plot.watered_until = now + self.water_hours
+        self._reschedule(plot, now)
+        return True
+
+    def harvest(self, x, y):
+        """Pick a ripe plot: returns (berry, amount) and empties the plot, or None"""
+        plot = self.plot(x, y)
+        if plot.stage != RIPE:
+            return None
+        low, high = parse_yield(self.soils[plot.soil]["yield"])
+        amount = self.rng.randint(low, high)
+        effects = self.festival_effects()
+        if "double_berry_yields" in effects:
+            amount *= 2
+        if "triple_farming_yields" in effects:
+            amount *= 3
+        berry = plot.berry
+        plot.stage = EMPTY
+        plot.berry = None
+        plot.fertilizer = None
+        plot.watered_until = None
+        self._reschedule(plot, plot.updated)
+        return berry, amount
+
+    def set_festival(self, name, now):
+        """Start a festival from the config's events, or end festivals with None"""
+        self.set_festivals([name] if name else [], now)
+
+    def set_festivals(self, names, now):
+        """
+        Set the festivals going on from game hour `now`. Growing plots change
+        pace, so each is rescheduled; this happens a few times a season, not
+        per frame.
+        """
+        self.festivals = tuple(names)
+        for plot in self.plots:
+            if plot.stage not in (EMPTY, RIPE):
+                self._reschedule(plot, now)
+
+    def mutation_roll(self, plot):
+        """At flowering, maybe turn the berry into a mutation with a neighbour's berry"""
+        bonus = self.fertilizers[plot.fertilizer].get("rare_mutation_chance", 0.0) if plot.fertilizer else 0.0
+        scale = 2.0 if "increased_mutation_rates" in self.festival_effects() else 1.0
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nx, ny = plot.x + dx, plot.y + dy
+            if not (0 <= nx < self.width and 0 <= ny < self.height):
+                continue
+            neighbour = self.plot(nx, ny)
+            mutation = self.mutations.get(frozenset((plot.berry, neighbour.berry)))
+            if mutation is None:
+                continue
+            result, chance, requires = mutation
+            if requires is not None and requires not in (plot.soil, plot.fertilizer) + self.festivals:
+                continue
+            if self.rng.random() < (chance + bonus) * scale:
+                plot.berry = result
+                return result
+        return None
+
+    def follow_calendar(self, now):
+        """Take the calendar's festivals at game hour `now`, if they changed"""
+        self.calendar_state = self.calendar.state(now)
+        festivals = tuple(name for name in self.calendar_state.names if name in self.events)
+        if festivals != self.festivals:
+            self.set_festivals(festivals, now)
+
+    def advance(self, now):
+        """
+        Process every state change due by game hour `now`, in time order.
+        Returns (hour, x, y, event) tuples for the changes that happened.
+        """
+        happened = []
+        while self.calendar_state is not None and self.calendar_state.until <= now:
+            boundary = self.calendar_state.until
+            happened.extend(self._process(boundary))
+            self.follow_calendar(boundary)
+        happened.extend(self._process(now))
+        return happened
+
+    def _process(self, now):
+        """Pop and apply the queued changes due by game hour `now`"""
+        happened = []
+        queue = self._queue
+        while queue and queue[0][0] <= now:
+            hour, _, index, version, event = heapq.heappop(queue)
+            self.processed += 1
+            plot = self.plots[index]
+            if version != plot.version:
+                continue
+            if event == DRY:
+                self._reschedule(plot, hour)
+            else:
+                plot.stage = {SPROUT: SPROUTED, FLOWER: FLOWERING, RIPEN: RIPE}[event]
+                if event == FLOWER:
+                    mutated = self.mutation_roll(plot)
+                    if mutated is not None:
+                        happened.append((hour, plot.x, plot.y, "mutate"))
+                self._reschedule(plot, hour)
+            happened.append((hour, plot.x, plot.y, event))
+        return happened
@@ -0,0 +1,178 @@
+"""
+Berry lures and the influence field they lay over the world.
+
+A berry placed on the map attracts creatures within its `attract_radius`
+(in tiles) for `duration_minutes` of game time. The settings come from
+config/berry_types.yaml. While it lasts, the berry adds its
+`spawn_rate_boost`, `catch_rate_bonus` and `calm_creature` effects to every
+cell of a coarse grid (LURE_CELL tiles per cell) within that radius. Each cell
+also counts the berries of every kind reaching it. A bitmask of the kinds
+present indexes a table, built once, of the best matching
+`berry_combinations` multiplier. Placing or expiring a berry updates only
+the cells it covers, so spawn and capture code read a tile's boost with one
+array lookup however many berries are out.
+
+The field's boosts are the same for every creature: a spawn is boosted
+before its temperament is drawn. A berry's `creature_preferences`, by
+temperament, instead weight how readily each roaming creature walks to it
+(behavior.BehaviorEngine.set_lures).
+
+This module has no pygame dependency.
+"""
+
+import heapq
+
+import numpy as np
+
+from behavior import TEMPERAMENTS
+from config_loader import load_config
+
+LURE_CELL = 4  # tiles per influence cell side
+MAX_CALM = 0.9  # calming berries never stop fleeing entirely
+
+
+def load_berries(temperaments=TEMPERAMENTS):
+    """
+    Berry names and their lure effects as arrays, with each berry's
+    preference multiplier by (berry, temperament)
+    """
+    table = load_config("berry_types")["berries"]
+    names = list(table)
+    effects = [table[n].get("effects", {}) for n in names]
+    preferences = [table[n].get("creature_preferences", {}) for n in names]
+    return names, {
+        "preference": np.array([[p.get(t, 1.0) for t in temperaments] for p in preferences]),
+        "radius": np.array([e.get("attract_radius", 0) for e in effects]),
+        "minutes": np.array([e.get("duration_minutes", 0) for e in effects]),
+        "spawn": np.array([e.get("spawn_rate_boost", 0.0) for e in effects]),
+        "capture": np.array([e.get("catch_rate_bonus", 0.0) for e in effects]),
+        "calm": np.array([e.get("calm_creature", 0.0) for e in effects]),
+    }
+
+
+def combo_table(names, combinations=None):
+    """
+    Best berry combination multiplier for every bitmask of berry kinds.
+    Bit k stands for names[k]; masks matching no combination get 1.
+    """
+    if combinations is None:
+        combinations = load_config("berry_types")["berry_combinations"]
+    masks = np.arange(1 << len(names), dtype=np.int64)
+    table = np.ones(len(masks), dtype=np.float32)
+    for combo in combinations.values():
+        bits = sum(1 << names.index(berry) for berry in combo["berries"])
+        matched = (masks & bits) == bits
+        table[matched] = np.maximum(table[matched], combo["effectiveness_multiplier"])
+    return table
+
+
+BERRIES, BERRY_PARAMS = load_berries()
+COMBO_MULTIPLIERS = combo_table(BERRIES)
+
+
+class LureField:
+    """
+    Active berries and the per-cell boosts they add up to
+    """
+
+    def __init__(self, cols, rows, cell=LURE_CELL):
+        self.cell = cell
+        self.shape = ((rows + cell - 1) // cell, (cols + cell - 1) // cell)
+        self.params = BERRY_PARAMS
+        self.counts = np.zeros((len(BERRIES),) + self.shape, dtype=np.int16)  # berries of each kind per cell
+        self.mask = np.zeros(self.shape, dtype=np.int64)  # bit k set where berry kind k reaches
+        self.spawn_boost = np.zeros(self.shape, dtype=np.float32)
+        self.capture_bonus = np.zeros(self.shape, dtype=np.float32)
+        self.calm_sum = np.zeros(self.shape, dtype=np.float32)
+        # what spawn and capture code reads: the boosts with the combo multiplier applied
+        self.spawn = np.ones(self.shape, dtype=np.float32)
+        self.capture = np.ones(self.shape, dtype=np.float32)
+        self.calm = np.zeros(self.shape, dtype=np.float32)
+        self.berries = {}  # berry id -> (tx, ty, kind index, expiry hour)
+        self._expiry = []  # heap of (expiry hour, berry id)
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.berries)
+
+    def footprint(self, tx, ty, radius):
+        """Slices and mask of the cells whose centers lie within radius tiles of a tile"""
+        rows, cols = self.shape
+        r = max(radius, self.cell) / self.cell  # always at least the berry's own cell
+        cx, cy = (tx + 0.5) / self.cell, (ty + 0.5) / self.cell
+        x0, x1 = max(0, int(cx - r)), min(cols, int(cx + r) + 1)
+        y0, y1 = max(0, int(cy - r)), min(rows, int(cy + r) + 1)
+        ys, xs = np.ogrid[y0:y1, x0:x1]
+        inside = (xs + 0.5 - cx) ** 2 + (ys + 0.5 - cy) ** 2 <= r * r
+        return (slice(y0, y1), slice(x0, x1)), inside
+
+    def _apply(self, tx, ty, k, sign):
+        """Add (sign 1) or take away (sign -1) one berry's effects"""
+        area, inside = self.footprint(tx, ty, self.params["radius"][k])
+        self.counts[k][area] += sign * inside
+        self.spawn_boost[area] += sign * self.params["spawn"][k] * inside
+        self.capture_bonus[area] += sign * self.params["capture"][k] * inside
+        self.calm_sum[area] += sign * self.params["calm"][k] * inside
+        present = self.counts[:, area[0], area[1]] > 0
+        bits = (present * (np.int64(1) << np.arange(len(BERRIES), dtype=np.int64))[:, None, None]).sum(axis=0)
+        self.mask[area] = bits
+        empty = bits == 0  # clear rounding left over from adding and taking away
+        self.spawn_boost[area][empty] = 0.0
+        self.capture_bonus[area][empty] = 0.0
+        self.calm_sum[area][empty] = 0.0
+        combo = COMBO_MULTIPLIERS[bits]
+        self.spawn[area] = (1.0 + np.maximum(self.spawn_boost[area], 0.0)) * combo
+        self.capture[area] = (1.0 + np.maximum(self.capture_bonus[area], 0.0)) * combo
+        self.calm[area] = np.clip(self.calm_sum[area], 0.0, MAX_CALM)
+
+    def place(self, tx, ty, kind, now):
+        """Put out a berry of a named kind on a tile at game hour `now`; returns its id"""
+        k = BERRIES.index(kind)
+        berry = self._next_id
+        self._next_id += 1
+        expiry = now + self.params["minutes"][k] / 60.0
+        self.berries[berry] = (tx, ty, k, expiry)
+        heapq.heappush(self._expiry, (expiry, berry))
+        self._apply(tx, ty, k, 1)
+        return berry
+
+    def remove(self, berry):
+        """Take a berry away early"""
+        tx, ty, k, _ = self.berries.pop(berry)
+        self._apply(tx, ty, k, -1)
+
+    def expire(self, now):
+        """Remove the berries that ran out by game hour `now`; returns their ids"""
+        expired = []
+        while self._expiry and self._expiry[0][0] <= now:
+            _, berry = heapq.heappop(self._expiry)
+            if berry in self.berries:
+                self.remove(berry)
+                expired.append(berry)
+        return expired
+
+    def cell_of(self, tx, ty):
+        return ty // self.cell, tx // self.cell
+
+    def spawn_multiplier(self, tx, ty):
+        return float(self.spawn[self.cell_of(tx, ty)])
+
+    def capture_multiplier(self, tx, ty):
+        return float(self.capture[self.cell_of(tx, ty)])
+
+    def boosts(self, tiles):
+        """Spawn and capture multipliers at an (n, 2) array of tile coordinates"""
+        rows = tiles[:, 1] // self.cell
+        cols = tiles[:, 0] // self.cell
+        return self.spawn[rows, cols], self.capture[rows, cols]
+
+    def lures(self, tile_size):
+        """
+        Positions and attract radii in world pixels, calm effects and
+        preferences by temperament of the active berries, for creature behavior
+        """
+        if not self.berries:
+            return np.zeros((0, 2)), np.zeros(0), np.zeros(0), np.zeros((0, len(TEMPERAMENTS)))
+        tx, ty, k, _ = (np.array(column) for column in zip(*self.berries.values()))
+        positions = np.stack([(tx + 0.5) * tile_size, (ty + 0.5) * tile_size], axis=1)
+        return positions, self.params["radius"][k] * tile_size, self.params["calm"][k], self.params["preference"][k]
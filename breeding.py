@@ -0,0 +1,236 @@
+"""
+Creature breeding for Trapper-Mastering.
+
+Every registered creature has a genome: one gene per stat (max HP, attack,
+defense, speed), where 1.0 is the stat a creature of its level gets by
+default. A creature caught or chosen as a starter gets a genome read back
+from its stats. An offspring's genes are drawn together as arrays:
+- each gene is a random blend of the two parents' genes plus a little noise;
+- inbreeding scales the genes down in proportion to the offspring's
+  inbreeding coefficient;
+- crossing two different species may give a hybrid, a new species named
+  after both parents, with a vigor bonus on every gene.
+The offspring takes the type of one parent and the strongest of the moves
+its parents know, preferring moves both of them know.
+
+The pedigree is a graph of (mother, father) links. Parents are always
+registered before their offspring and never change, so each offspring's
+kinship with everyone already in the table is one vectorized row computed
+from its parents' rows when it is registered. The table only holds
+creatures that have bred or been bred, and doubles in size when full like
+entities.EntityStore. Kinship and inbreeding queries are lookups.
+`Breeder.rank_pairings` scores every pairing in a collection at once: a
+matrix of expected offspring genes, discounted by the kinship of each pair.
+
+This module has no pygame dependency.
+"""
+
+import random
+
+import numpy as np
+
+from creature import Creature
+
+STATS = ["max_hp", "attack", "defense", "speed"]
+HATCH_LEVEL = 5
+MAX_MOVES = 4
+GENE_NOISE = 0.05  # standard deviation of an offspring gene around its parents' blend
+INBREEDING_DEPRESSION = 0.5  # share of the genes lost at inbreeding coefficient 1
+HYBRID_CHANCE = 0.1  # chance that parents of different species give a hybrid
+HYBRID_VIGOR = 1.05
+DEFAULT_CAPACITY = 64  # kinship table rows before it first grows
+NO_SLOT = -1
+
+
+def default_stats(level):
+    """The stats a Creature of a level gets when none are given, in STATS order"""
+    return np.array([20 + level * 5, 5 + level * 2, 5 + level * 2, 5 + level * 2], dtype=float)
+
+
+def genome_of(creature):
+    """Genes read back from a creature's stats"""
+    stats = np.array([getattr(creature, stat) for stat in STATS], dtype=float)
+    return stats / default_stats(creature.level)
+
+
+def hybrid_name(mother, father):
+    """A new species name made of the front of one name and the back of the other"""
+    return mother[:(len(mother) + 1) // 2] + father[len(father) // 2:]
+
+
+def inherit(mother_genes, father_genes, inbreeding, rng):
+    """
+    Offspring genes for rows of parent genes, shape (n, len(STATS)), with an
+    inbreeding coefficient per row
+    """
+    blend = rng.random(mother_genes.shape)
+    genes = blend * mother_genes + (1.0 - blend) * father_genes
+    genes += rng.normal(0.0, GENE_NOISE, genes.shape)
+    genes *= (1.0 - INBREEDING_DEPRESSION * np.asarray(inbreeding, dtype=float))[:, None]
+    return np.maximum(genes, 0.1)
+
+
+def inherit_moves(mother, father):
+    """Up to MAX_MOVES of the parents' moves, those both know first, then by power"""
+    moves = {}
+    known = {}
+    for move in mother.moves + father.moves:
+        moves.setdefault(move.name, move)
+        known[move.name] = known.get(move.name, 0) + 1
+    ranked = sorted(moves.values(), key=lambda m: (known[m.name] > 1, m.power), reverse=True)
+    return ranked[:MAX_MOVES]
+
+
+class Pedigree:
+    """
+    Parent links between registered creatures, with the kinship between
+    every creature that has bred or been bred kept in a growing table
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.parents = []  # id -> (mother id, father id), or None for a founder
+        self.slots = []  # id -> row in the kinship table, or NO_SLOT
+        self.table = np.zeros((capacity, capacity))  # kinship between slotted members
+        self.size = 0  # slots in use
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self, mother=None, father=None):
+        """Register a creature and return its id; parents must already be registered"""
+        if (mother is None) != (father is None):
+            raise ValueError("give both parents or neither")
+        member = len(self.parents)
+        self.parents.append(None if mother is None else (mother, father))
+        self.slots.append(NO_SLOT)
+        if mother is not None:
+            m, f = self._slot(mother), self._slot(father)
+            i = self._slot(member)
+            # every slotted member was registered before this one, so its
+            # kinship with it comes from its kinship with the parents
+            row = 0.5 * (self.table[m, :i] + self.table[f, :i])
+            self.table[i, :i] = row
+            self.table[:i, i] = row
+            self.table[i, i] = 0.5 * (1.0 + self.table[m, f])
+        return member
+
+    def _slot(self, member):
+        """The member's row in the kinship table, given one on first use"""
+        slot = self.slots[member]
+        if slot != NO_SLOT:
+            return slot
+        if self.size == len(self.table):
+            grown = np.zeros((2 * self.size, 2 * self.size))
+            grown[:self.size, :self.size] = self.table
+            self.table = grown
+        slot = self.slots[member] = self.size
+        self.size += 1
+        self.table[slot, slot] = 0.5  # a founder; add() overwrites it for offspring
+        return slot
+
+    def ancestors(self, member):
+        """Every ancestor of a member, as a frozenset of ids"""
+        return self.lineage([member]) - {member}
+
+    def lineage(self, members):
+        """The members and all their ancestors, as a frozenset of ids"""
+        found = set(members)
+        stack = list(found)
+        while stack:
+            parents = self.parents[stack.pop()]
+            if parents is None:
+                continue
+            for parent in parents:
+                if parent not in found:
+                    found.add(parent)
+                    stack.append(parent)
+        return frozenset(found)
+
+    def kinship_matrix(self, members):
+        """
+        Coefficients of kinship between every pair of members: the chance
+        that a gene drawn from each is inherited from the same ancestor.
+        Founders that never bred are unrelated to everyone.
+        """
+        slots = np.array([self.slots[member] for member in members], dtype=np.int64).reshape(-1)
+        kinship = np.zeros((len(slots), len(slots)))
+        kinship[np.diag_indices(len(slots))] = 0.5
+        known = np.flatnonzero(slots != NO_SLOT)
+        kinship[np.ix_(known, known)] = self.table[np.ix_(slots[known], slots[known])]
+        return kinship
+
+    def kinship(self, a, b):
+        """Coefficient of kinship between two members"""
+        sa, sb = self.slots[a], self.slots[b]
+        if sa == NO_SLOT or sb == NO_SLOT:
+            return 0.5 if a == b else 0.0
+        return float(self.table[sa, sb])
+
+    def inbreeding(self, member):
+        """Inbreeding coefficient: the kinship of a member's parents"""
+        parents = self.parents[member]
+        return 0.0 if parents is None else self.kinship(*parents)
+
+
+class Breeder:
+    """
+    Genomes and pedigree of the creatures in a collection, and breeding between them
+    """
+
+    def __init__(self, rng=None, pick=random):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.pick = pick  # for the offspring's type and hybrid rolls
+        self.pedigree = Pedigree()
+        self.genes = []  # pedigree id -> gene array
+        self.ids = {}  # id(creature) -> pedigree id
+        self.members = []  # pedigree id -> creature
+
+    def register(self, creature, genes=None, parents=None):
+        """Add a creature to the pedigree, reading its genes from its stats by default"""
+        if id(creature) in self.ids:
+            return self.ids[id(creature)]
+        member = self.pedigree.add(*(parents or (None, None)))
+        self.ids[id(creature)] = member
+        self.members.append(creature)
+        genes = genome_of(creature) if genes is None else genes
+        self.genes.append(np.asarray(genes, dtype=float))
+        return member
+
+    def breed(self, mother, father):
+        """Create an offspring of two creatures at HATCH_LEVEL and register it"""
+        if mother is father:
+            raise ValueError("a creature cannot breed with itself")
+        a, b = self.register(mother), self.register(father)
+        inbreeding = self.pedigree.kinship(a, b)
+        genes = inherit(self.genes[a][None, :], self.genes[b][None, :], [inbreeding], self.rng)[0]
+        name, creature_type = mother.name, mother.type
+        if self.pick.random() < 0.5:
+            creature_type = father.type
+        if mother.name != father.name and self.pick.random() < HYBRID_CHANCE:
+            name = hybrid_name(mother.name, father.name)
+            genes = genes * HYBRID_VIGOR
+        stats = np.maximum(1, np.rint(genes * default_stats(HATCH_LEVEL))).astype(int)
+        child = Creature(name, creature_type, level=HATCH_LEVEL,
+                         moves=inherit_moves(mother, father), **dict(zip(STATS, stats.tolist())))
+        self.register(child, genes, (a, b))
+        return child
+
+    def rank_pairings(self, creatures, top=10, weights=None):
+        """
+        The best pairings in a collection by the expected offspring's
+        weighted gene total, after inbreeding. Returns (score, creature,
+        creature) tuples, best first.
+        """
+        members = [self.register(c) for c in creatures]
+        if weights is None:
+            weights = np.ones(len(STATS))
+        genes = np.array([self.genes[m] for m in members])
+        value = genes @ np.asarray(weights, dtype=float)  # the expected blend is linear in the genes
+        kinship = self.pedigree.kinship_matrix(members)
+        scores = 0.5 * (value[:, None] + value[None, :]) * (1.0 - INBREEDING_DEPRESSION * kinship)
+        i, j = np.triu_indices(len(members), k=1)
+        pair_scores = scores[i, j]
+        top = min(top, len(pair_scores))
+        best = np.argpartition(-pair_scores, top - 1)[:top] if top else []
+        best = sorted(best, key=lambda k: -pair_scores[k])
+        return [(float(pair_scores[k]), creatures[i[k]], creatures[j[k]]) for k in best]
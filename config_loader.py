@@ -0,0 +1,21 @@
+"""
+Loading of the YAML design tables in config/.
+
+Each file is parsed once per process and cached, so systems that need a
+table can call `load_config` freely. The returned data is shared: treat it
+as read-only and build derived tables from it instead of modifying it.
+"""
+
+import os
+from functools import lru_cache
+
+import yaml
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+
+
+@lru_cache(maxsize=None)
+def load_config(name, config_dir=CONFIG_DIR):
+    """Parsed contents of config/<name>.yaml"""
+    with open(os.path.join(config_dir, f"{name}.yaml"), encoding="utf-8") as f:
+        return yaml.safe_load(f)
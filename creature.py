@@ -176,19 +176,38 @@ STARTER_CREATURES = {
 }
 
 
-# Wild creatures that can be encountered
-WILD_CREATURES = [
-    lambda: Creature("Rockbug", CreatureType.ROCK, level=random.randint(2, 6),
-                     moves=[Move("Tackle", CreatureType.NORMAL, 40)]),
-    lambda: Creature("Sparkrat", CreatureType.ELECTRIC, level=random.randint(3, 7),
-                     moves=[Move("Quick Attack", CreatureType.NORMAL, 40),
-                            Move("Thunder Shock", CreatureType.ELECTRIC, 40)]),
-    lambda: Creature("Sandmole", CreatureType.GROUND, level=random.randint(2, 5),
-                     moves=[Move("Scratch", CreatureType.NORMAL, 40)]),
-    lambda: Creature("Windbird", CreatureType.FLYING, level=random.randint(3, 6),
-                     moves=[Move("Peck", CreatureType.FLYING, 35)]),
+class WildSpecies:
+    """A kind of wild creature and the range it is encountered in"""
+
+    def __init__(self, name, creature_type, min_level, max_level, moves):
+        self.name = name
+        self.type = creature_type
+        self.min_level = min_level
+        self.max_level = max_level
+        self.moves = moves  # (name, type, power) tuples
+
+    def create(self, rng=random):
+        """Create a new wild creature of this species"""
+        return Creature(self.name, self.type, level=rng.randint(self.min_level, self.max_level),
+                        moves=[Move(*move) for move in self.moves])
+
+
+# Wild species that can be encountered
+WILD_SPECIES = [
+    WildSpecies("Rockbug", CreatureType.ROCK, 2, 6,
+                [("Tackle", CreatureType.NORMAL, 40)]),
+    WildSpecies("Sparkrat", CreatureType.ELECTRIC, 3, 7,
+                [("Quick Attack", CreatureType.NORMAL, 40),
+                 ("Thunder Shock", CreatureType.ELECTRIC, 40)]),
+    WildSpecies("Sandmole", CreatureType.GROUND, 2, 5,
+                [("Scratch", CreatureType.NORMAL, 40)]),
+    WildSpecies("Windbird", CreatureType.FLYING, 3, 6,
+                [("Peck", CreatureType.FLYING, 35)]),
 ]
 
+# Wild creatures that can be encountered
+WILD_CREATURES = [species.create for species in WILD_SPECIES]
+
 
 def get_random_wild_creature():
     """Generate a random wild creature"""
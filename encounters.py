@@ -0,0 +1,135 @@
+"""
+Wild encounter spawning for Trapper-Mastering.
+
+Every tile type gets a weighted species pool, built once: species whose type
+suits the tile's habitat are HABITAT_WEIGHT times likelier than the rest.
+An encounter draws exactly one species from the pool of the tile it happens
+on, with a single random number, and only then creates the creature, so the
+odds of each species are explicit and nothing is rerolled or thrown away.
+
+When encounters happen is scheduled the same way: the number of steps until
+the next one is drawn up front from the geometric distribution of the
+per-step rate, instead of rolling a random number on every step.
+"""
+
+import math
+import random
+from itertools import accumulate
+
+from creature import WILD_SPECIES
+from terrain import BIOME_TERRAIN, TERRAIN_GRASS, TERRAIN_ROCK, TERRAIN_WATER
+
+# Preferred wild creature types for each coarse terrain class, looked up per tile id
+HABITAT_TYPES = {
+    TERRAIN_WATER: ["Water", "Electric"],
+    TERRAIN_ROCK: ["Rock", "Ground"],
+    TERRAIN_GRASS: ["Grass", "Normal", "Flying", "Ground"],
+}
+TILE_HABITAT_TYPES = [HABITAT_TYPES[terrain] for terrain in BIOME_TERRAIN]
+HABITAT_WEIGHT = 8.0  # weight of species suited to the habitat; others weigh 1
+
+
+class SpawnPool:
+    """
+    Species with cumulative weights, sampled with one random number
+    """
+
+    def __init__(self, species, weights):
+        self.species = list(species)
+        self.weights = list(weights)
+        self.cum_weights = list(accumulate(self.weights))
+        self.total = self.cum_weights[-1]
+
+    def __len__(self):
+        return len(self.species)
+
+    def probability(self, name):
+        """Chance that a draw from this pool is the named species"""
+        return sum(w for s, w in zip(self.species, self.weights) if s.name == name) / self.total
+
+    def sample_index(self, rng=random):
+        """Draw one species and return its index in the pool"""
+        return rng.choices(range(len(self.species)), cum_weights=self.cum_weights)[0]
+
+    def sample(self, rng=random):
+        """Draw one species"""
+        return self.species[self.sample_index(rng)]
+
+
+class EncounterService:
+    """
+    Precomputed spawn pools per tile type, plus a habitat-free default pool
+    """
+
+    def __init__(self, species=WILD_SPECIES, tile_habitats=TILE_HABITAT_TYPES, habitat_weight=HABITAT_WEIGHT):
+        self.default_pool = SpawnPool(species, [1.0] * len(species))
+        # tiles that prefer the same types share one pool
+        shared = {}
+        self.tile_pools = []
+        for preferred in tile_habitats:
+            key = tuple(sorted(preferred))
+            if key not in shared:
+                weights = [habitat_weight if s.type in preferred else 1.0 for s in species]
+                shared[key] = SpawnPool(species, weights)
+            self.tile_pools.append(shared[key])
+
+    def pool(self, tile=None):
+        """The spawn pool for a tile id, or the default pool"""
+        if tile is None:
+            return self.default_pool
+        return self.tile_pools[tile]
+
+    def spawn(self, tile=None, rng=random):
+        """Create the wild creature for one encounter on a tile"""
+        return self.pool(tile).sample(rng).create(rng)
+
+
+ENCOUNTERS = EncounterService()
+
+
+def steps_until_encounter(rate, rng=random):
+    """
+    Number of steps up to and including the next encounter, when each step
+    has an independent chance `rate` of one: a geometric sample from one
+    random number. Returns None when encounters are impossible.
+    """
+    if rate <= 0:
+        return None
+    if rate >= 1:
+        return 1
+    u = 1.0 - rng.random()  # in (0, 1], so the log is defined
+    return int(math.log(u) / math.log(1.0 - rate)) + 1
+
+
+class EncounterScheduler:
+    """
+    Counts down the steps to the next encounter
+
+    The countdown is drawn once from the geometric distribution of the
+    current per-step rate and only redrawn when an encounter happens or the
+    rate changes (a new location, a lure, the time of day). Since the
+    distribution is memoryless, redrawing on a rate change keeps the odds
+    exact, and stepping costs no random numbers.
+    """
+
+    def __init__(self, rng=random, rate=0.0):
+        self.rng = rng
+        self.rate = None
+        self.remaining = None
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        """Change the per-step encounter chance, redrawing the countdown if it differs"""
+        if rate != self.rate:
+            self.rate = rate
+            self.remaining = steps_until_encounter(rate, self.rng)
+
+    def step(self, steps=1):
+        """Advance by some steps; True when an encounter happens"""
+        if self.remaining is None:
+            return False
+        self.remaining -= steps
+        if self.remaining > 0:
+            return False
+        self.remaining = steps_until_encounter(self.rate, self.rng)
+        return True
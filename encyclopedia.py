@@ -0,0 +1,225 @@
+"""
+In-game creature encyclopedia for Trapper-Mastering.
+
+Entries are compiled once from the config tables:
+- config/creature_spawns.yaml gives each creature's environments, rarity
+  and time and weather preferences;
+- config/trap_types.yaml gives the traps that work best on its type;
+- config/capture_probabilities.yaml gives how hard its rarity is to catch.
+Creatures in the spawn config have no type of their own, so they are filed
+under their environment's type (ENVIRONMENT_TYPES).
+
+The index holds two parts. An inverted index maps each word of each entry to
+a bitset of entry numbers. Facet bitsets cover environment, type, rarity,
+preferred time of day and preferred weather. Bitsets are Python ints, so
+combining filters is a handful of integer ANDs. A query such as "rare water
+creatures active at dusk in rain" splits into facet words, which select
+bitsets, and free words, which are looked up as prefixes so results update
+while typing. Nothing scans the list of creatures.
+
+This module has no pygame dependency.
+"""
+
+import bisect
+import re
+from functools import lru_cache
+
+from config_loader import load_config
+
+# Type the creatures of each spawn environment are filed under, in trap_types.yaml type names
+ENVIRONMENT_TYPES = {
+    "forest": "normal",
+    "lake": "water",
+    "ocean": "water",
+    "mountain": "ground",
+    "desert": "ground",
+    "volcano": "fire",
+    "glacier": "ice",
+    "crystal_caves": "psychic",
+    "floating_islands": "flying",
+}
+PREFERRED = 1.2  # a time or weather modifier at least this high counts as a preference
+BEST_TRAPS = 3
+FACETS = ["environment", "type", "rarity", "time", "weather"]
+# Query words that mean a facet value; facet values themselves also match
+SYNONYMS = {
+    "rain": "rainy", "sun": "sunny", "storm": "stormy", "fog": "foggy", "cloud": "cloudy", "clouds": "cloudy",
+    "snow": "snowy", "morning": "dawn", "evening": "dusk", "daytime": "day", "nighttime": "night",
+    "lakes": "lake", "oceans": "ocean", "mountains": "mountain", "deserts": "desert", "volcanoes": "volcano",
+    "glaciers": "glacier", "forests": "forest",
+}
+STOP_WORDS = {"a", "an", "the", "at", "in", "on", "of", "and", "with", "during", "by",
+              "creature", "creatures", "active", "that", "which", "type", "types"}
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def words(text):
+    return WORD.findall(text.lower().replace("_", " "))
+
+
+def bits(mask):
+    """Entry numbers set in a bitset, in order"""
+    found = []
+    while mask:
+        low = mask & -mask
+        found.append(low.bit_length() - 1)
+        mask ^= low
+    return found
+
+
+class Entry:
+    """One creature's encyclopedia page"""
+
+    def __init__(self, name, creature_type, rarity):
+        self.name = name
+        self.type = creature_type
+        self.rarity = rarity
+        self.environments = []
+        self.times = set()  # preferred periods
+        self.weathers = set()  # preferred weather
+        self.spawn_chance = {}  # environment -> base_probability
+        self.capture_modifier = 1.0
+        self.best_traps = []
+
+    def facet_values(self, facet):
+        return {
+            "environment": self.environments,
+            "type": [self.type],
+            "rarity": [self.rarity],
+            "time": sorted(self.times),
+            "weather": sorted(self.weathers),
+        }[facet]
+
+    def text(self):
+        """Habitat, behavior and trapping tips as one paragraph"""
+        parts = [f"{self.name}, a {self.rarity} {self.type} creature of the {', '.join(self.environments)}."]
+        if self.times:
+            parts.append(f"Most active at {', '.join(sorted(self.times))}.")
+        if self.weathers:
+            parts.append(f"Favours {', '.join(w.replace('_', ' ') for w in sorted(self.weathers))} weather.")
+        parts.append(f"Capture odds x{self.capture_modifier:.2f}; best traps: "
+                     f"{', '.join(t.replace('_', ' ') for t in self.best_traps)}.")
+        return " ".join(parts)
+
+
+def compile_entries(spawns, traps, capture):
+    """Encyclopedia entries from the three config tables, ordered by name"""
+    by_rarity = capture["creature_modifiers"]["by_rarity"]
+    entries = {}
+    for environment, table in spawns["environments"].items():
+        for creature in table.get("creatures", []):
+            name = creature["name"]
+            entry = entries.get(name)
+            if entry is None:
+                creature_type = ENVIRONMENT_TYPES.get(environment, "normal")
+                entry = entries[name] = Entry(name, creature_type, creature.get("rarity", "common"))
+            entry.environments.append(environment)
+            entry.spawn_chance[environment] = creature["base_probability"]
+            entry.times |= {t for t, m in creature.get("time_modifiers", {}).items() if m >= PREFERRED}
+            entry.weathers |= {w for w, m in creature.get("weather_modifiers", {}).items() if m >= PREFERRED}
+
+    def trap_score(trap, creature_type):
+        types = trap.get("effectiveness_multipliers", {}).get("creature_type", {})
+        return trap["base_effectiveness"] * types.get(creature_type, 1.0)
+
+    for entry in entries.values():
+        entry.capture_modifier = by_rarity.get(entry.rarity, 1.0)
+        ranked = sorted(traps["trap_types"].items(), key=lambda item: -trap_score(item[1], entry.type))
+        entry.best_traps = [name for name, trap in ranked if trap.get("obtain_method") is None][:BEST_TRAPS]
+    return [entries[name] for name in sorted(entries)]
+
+
+class Encyclopedia:
+    """
+    Entries with an inverted word index and facet bitsets
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.all = (1 << len(entries)) - 1
+        self.facets = {facet: {} for facet in FACETS}  # facet -> value -> bitset
+        self.index = {}  # word -> bitset
+        for number, entry in enumerate(entries):
+            bit = 1 << number
+            for facet in FACETS:
+                for value in entry.facet_values(facet):
+                    self.facets[facet][value] = self.facets[facet].get(value, 0) | bit
+            for word in set(words(entry.text())):
+                self.index[word] = self.index.get(word, 0) | bit
+        self.vocabulary = sorted(self.index)
+        # (facet, value) pairs selected by each query word; every word of a
+        # value such as crystal_caves selects the whole value
+        self.facet_words = {}
+        for facet, values in self.facets.items():
+            for value in values:
+                for word in set(words(value)) | {value}:
+                    self.facet_words.setdefault(word, []).append((facet, value))
+        for word, value in SYNONYMS.items():
+            for pair in self.facet_words.get(value, []):
+                self.facet_words.setdefault(word, []).append(pair)
+        self._prefixes = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def prefix(self, word):
+        """Bitset of entries containing a word that starts with `word`"""
+        if word not in self._prefixes:
+            start = bisect.bisect_left(self.vocabulary, word)
+            mask = 0
+            for known in self.vocabulary[start:]:
+                if not known.startswith(word):
+                    break
+                mask |= self.index[known]
+            self._prefixes[word] = mask
+        return self._prefixes[word]
+
+    def facet(self, facet, value):
+        """Bitset of a facet value, given as in the config, in words or as a synonym"""
+        value = value.lower().replace(" ", "_")
+        return self.facets[facet].get(SYNONYMS.get(value, value), 0)
+
+    def match(self, query="", **filters):
+        """
+        Bitset of entries matching a free-text query and facet filters.
+        Facet words in the query filter their facet; several values of one
+        facet are alternatives. Other words must prefix-match a word of the
+        entry. Stop words are ignored. A filter on a value no entry has
+        matches nothing.
+        """
+        selected = {}  # facet -> bitset of the values asked for
+        for facet, value in filters.items():
+            selected[facet] = selected.get(facet, 0) | self.facet(facet, value)
+        mask = self.all
+        for word in words(query):
+            if word in STOP_WORDS:
+                continue
+            pairs = self.facet_words.get(word)
+            if pairs:
+                for facet, value in pairs:
+                    selected[facet] = selected.get(facet, 0) | self.facets[facet][value]
+            else:
+                mask &= self.prefix(word)
+        for facet_mask in selected.values():
+            mask &= facet_mask
+        return mask
+
+    def search(self, query="", limit=None, **filters):
+        """Entries matching a query and facet filters, in name order"""
+        found = bits(self.match(query, **filters))
+        if limit is not None:
+            found = found[:limit]
+        return [self.entries[number] for number in found]
+
+    def counts(self, query="", **filters):
+        """Matching entries per value of every facet, for showing facet choices"""
+        mask = self.match(query, **filters)
+        return {facet: {value: bin(mask & value_mask).count("1") for value, value_mask in values.items()}
+                for facet, values in self.facets.items()}
+
+
+@lru_cache(maxsize=None)
+def encyclopedia():
+    """The encyclopedia of the loaded config, compiled on first use"""
+    return Encyclopedia(compile_entries(load_config("creature_spawns"), load_config("trap_types"),
+                                        load_config("capture_probabilities")))
@@ -0,0 +1,126 @@
+"""
+Array-backed entity storage for creatures roaming the overworld.
+
+Every component lives in its own contiguous NumPy array indexed by entity
+id: position, velocity, species id, temperament, home position, behavior
+state and sprite frame. An entity id is a slot in those arrays. Despawned
+slots go on a free list and are reused by the next spawn, and the arrays
+double in size when full. Systems work on whole arrays at once, so
+thousands of creatures move and are culled for drawing without per-object
+Python overhead.
+
+This module has no pygame dependency.
+"""
+
+import numpy as np
+
+DEFAULT_CAPACITY = 256
+ANIMATION_FPS = 4.0  # sprite frames per second
+ANIMATION_FRAMES = 2
+
+
+class EntityStore:
+    """
+    Component arrays for a set of entities, with free-list slot reuse
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = 0
+        self.alive = np.zeros(0, dtype=bool)
+        self.pos = np.zeros((0, 2), dtype=np.float32)
+        self.vel = np.zeros((0, 2), dtype=np.float32)
+        self.species = np.zeros(0, dtype=np.int16)
+        self.temperament = np.zeros(0, dtype=np.int8)  # index into behavior.TEMPERAMENTS
+        self.home = np.zeros((0, 2), dtype=np.float32)  # where the entity spawned
+        self.state = np.zeros(0, dtype=np.int8)
+        self.frame = np.zeros(0, dtype=np.uint8)
+        self.anim = np.zeros(0, dtype=np.float32)  # animation clock per entity, in seconds
+        self.free = []  # despawned slots, reused last-in first-out
+        self.size = 0  # one past the highest slot ever used; systems only look at [:size]
+        self.count = 0
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        """Resize every component array to a new capacity"""
+        def resized(array):
+            out = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            out[:len(array)] = array
+            return out
+
+        self.alive = resized(self.alive)
+        self.pos = resized(self.pos)
+        self.vel = resized(self.vel)
+        self.species = resized(self.species)
+        self.temperament = resized(self.temperament)
+        self.home = resized(self.home)
+        self.state = resized(self.state)
+        self.frame = resized(self.frame)
+        self.anim = resized(self.anim)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, entity):
+        return 0 <= entity < self.size and bool(self.alive[entity])
+
+    def spawn(self, x, y, species, vx=0.0, vy=0.0, state=0, temperament=0):
+        """Add an entity and return its id"""
+        if self.free:
+            entity = self.free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(max(1, self.capacity * 2))
+            entity = self.size
+            self.size += 1
+        self.alive[entity] = True
+        self.pos[entity] = (x, y)
+        self.vel[entity] = (vx, vy)
+        self.species[entity] = species
+        self.temperament[entity] = temperament
+        self.home[entity] = (x, y)
+        self.state[entity] = state
+        self.frame[entity] = 0
+        self.anim[entity] = 0.0
+        self.count += 1
+        return entity
+
+    def despawn(self, entity):
+        """Remove an entity; its slot is reused by a later spawn"""
+        if entity not in self:
+            raise KeyError(entity)
+        self.alive[entity] = False
+        self.vel[entity] = 0.0
+        self.free.append(entity)
+        self.count -= 1
+
+    def ids(self):
+        """Ids of all live entities"""
+        return np.flatnonzero(self.alive[:self.size])
+
+    def move(self, dt, width, height):
+        """Integrate velocities and bounce entities off the world edges"""
+        n = self.size
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        pos += vel * dt  # dead slots have zero velocity and stay put
+        bounds = np.array((width, height), dtype=np.float32)
+        out = (pos < 0) | (pos > bounds)
+        if out.any():
+            np.negative(vel, out=vel, where=out)
+            np.maximum(pos, 0, out=pos)
+            np.minimum(pos, bounds, out=pos)
+
+    def animate(self, dt, fps=ANIMATION_FPS, frames=ANIMATION_FRAMES):
+        """Advance every entity's animation clock by dt and set its sprite frame"""
+        n = self.size
+        self.anim[:n] += dt
+        self.frame[:n] = (self.anim[:n] * fps).astype(np.int64) % frames
+
+    def query_rect(self, x, y, w, h):
+        """Ids of live entities inside a world rect, for culling"""
+        n = self.size
+        pos = self.pos[:n]
+        inside = (self.alive[:n] & (pos[:, 0] >= x) & (pos[:, 0] < x + w)
+                  & (pos[:, 1] >= y) & (pos[:, 1] < y + h))
+        return np.flatnonzero(inside)
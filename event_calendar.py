@@ -0,0 +1,227 @@
+"""
+Calendar of seasons and scheduled events for Trapper-Mastering.
+
+Times are game hours since day 1 midnight, as kept by world_clock.WorldClock.
+A year is four seasons of DAYS_PER_SEASON days. The calendar holds:
+- the seasons themselves;
+- the special events of config/creature_spawns.yaml (blood moon, meteor
+  shower, solar eclipse), with a global spawn modifier and exclusive
+  creatures each;
+- the farming events of config/berry_types.yaml (berry festival, harvest
+  moon), with their effects, durations and frequencies.
+The config gives no dates, so EVENT_SCHEDULE says when each one starts
+and recurs. One-off events can be added with `EventCalendar.add`.
+
+Occurrences are stored in an interval tree: a balanced tree over the
+intervals sorted by start, where each node also knows the latest end in
+its subtree. "Which events are active at hour T" visits O(log n + k)
+nodes for k active events. Recurring events are expanded a year at a
+time as the clock gets there. `state(T)` combines the active events into
+one spawn multiplier and set of effects. It caches the result until the
+next start or end of an event, so the spawn and farming code pay for a
+lookup only at event boundaries.
+
+This module has no pygame dependency.
+"""
+
+import bisect
+import math
+
+from config_loader import load_config
+
+SEASONS = ["spring", "summer", "fall", "winter"]
+DAYS_PER_SEASON = 28
+SEASON_HOURS = DAYS_PER_SEASON * 24
+YEAR_HOURS = len(SEASONS) * SEASON_HOURS
+FREQUENCY_HOURS = {"seasonal": SEASON_HOURS, "annual": YEAR_HOURS}
+
+# name -> (frequency, first start in game hours, duration in hours); farming
+# events take their frequency and duration from config/berry_types.yaml
+EVENT_SCHEDULE = {
+    "blood_moon": ("seasonal", 13 * 24 + 19, 10),  # the night of the 14th of each season
+    "meteor_shower": ("seasonal", 20 * 24 + 21, 6),
+    "solar_eclipse": ("annual", SEASON_HOURS + 9 * 24 + 11, 3),  # midsummer
+    "berry_festival": ("seasonal", 3 * 24, 7 * 24),
+    "harvest_moon": ("annual", 2 * SEASON_HOURS + 14 * 24, 3 * 24),  # mid fall
+}
+
+
+class Event:
+    """One occurrence of an event over [start, end) game hours"""
+
+    def __init__(self, name, start, end, kind="special", spawn_multiplier=1.0, effects=(), creatures=()):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.kind = kind  # "season", "special" or "farming"
+        self.spawn_multiplier = spawn_multiplier
+        self.effects = tuple(effects)
+        self.creatures = tuple(creatures)  # exclusive creature entries from the config
+
+    def __repr__(self):
+        return f"Event({self.name!r}, {self.start}, {self.end})"
+
+
+class IntervalTree:
+    """
+    Intervals sorted by start, searched as a balanced tree whose nodes carry
+    the latest end below them. Built on first query after a change.
+    """
+
+    def __init__(self):
+        self.items = []
+        self._dirty = False
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        """Add an object with start and end attributes"""
+        self.items.append(item)
+        self._dirty = True
+
+    def _build(self):
+        self.items.sort(key=lambda item: item.start)
+        self.starts = [item.start for item in self.items]
+        self.max_end = [0.0] * len(self.items)  # node (the middle of a range) -> latest end in its range
+        self._fill(0, len(self.items))
+        self._dirty = False
+
+    def _fill(self, lo, hi):
+        if lo >= hi:
+            return -math.inf
+        mid = (lo + hi) // 2
+        latest = max(self.items[mid].end, self._fill(lo, mid), self._fill(mid + 1, hi))
+        self.max_end[mid] = latest
+        return latest
+
+    def stab(self, t):
+        """Intervals with start <= t < end, in start order"""
+        if self._dirty:
+            self._build()
+        found = []
+        self._stab(0, len(self.items), t, found)
+        return found
+
+    def _stab(self, lo, hi, t, found):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self.max_end[mid] <= t:
+            return  # everything below here is over by t
+        self._stab(lo, mid, t, found)
+        if self.starts[mid] > t:
+            return  # so does everything to the right
+        if self.items[mid].end > t:
+            found.append(self.items[mid])
+        self._stab(mid + 1, hi, t, found)
+
+
+class CalendarState:
+    """What the active events add up to, valid over [start, until) game hours"""
+
+    def __init__(self, events, start, until):
+        self.events = events
+        self.start = start
+        self.until = until
+        self.names = tuple(event.name for event in events)
+        self.season = next((event.name for event in events if event.kind == "season"), None)
+        self.spawn_multiplier = math.prod(event.spawn_multiplier for event in events)
+        self.effects = frozenset(effect for event in events for effect in event.effects)
+        self.creatures = [creature for event in events for creature in event.creatures]
+
+
+class EventCalendar:
+    """
+    Scheduled and recurring events, queried by game hour
+    """
+
+    def __init__(self):
+        self.tree = IntervalTree()
+        self.recurring = []  # (period hours, Event of the first occurrence)
+        self.expanded_until = 0.0  # recurring events are expanded over [0, expanded_until)
+        self._boundaries = []  # sorted starts and ends of every expanded occurrence
+        self._state = None
+        self.refresh_count = 0
+
+    def __len__(self):
+        return len(self.tree)
+
+    def add(self, event):
+        """Schedule a one-off event"""
+        self.tree.add(event)
+        bisect.insort(self._boundaries, event.start)
+        bisect.insort(self._boundaries, event.end)
+        self._state = None
+        return event
+
+    def add_recurring(self, event, period):
+        """Schedule an event to repeat every `period` hours from its first occurrence"""
+        self.recurring.append((period, event))
+        if self.expanded_until:
+            self._expand(event, period, 0.0, self.expanded_until)
+        self._state = None
+
+    def _expand(self, event, period, lo, hi):
+        """Add the occurrences of a recurring event that start in [lo, hi)"""
+        k = max(0, math.ceil((lo - event.start) / period))
+        while event.start + k * period < hi:
+            start = event.start + k * period
+            self.add(Event(event.name, start, start + (event.end - event.start), event.kind,
+                           event.spawn_multiplier, event.effects, event.creatures))
+            k += 1
+
+    def _extend(self, t):
+        """Expand recurring events a year at a time until a year past t"""
+        while self.expanded_until <= t + YEAR_HOURS:
+            lo, hi = self.expanded_until, self.expanded_until + YEAR_HOURS
+            for period, event in self.recurring:
+                self._expand(event, period, lo, hi)
+            self.expanded_until = hi
+
+    def active(self, t):
+        """Events going on at game hour t"""
+        self._extend(t)
+        return self.tree.stab(t)
+
+    def next_boundary(self, t):
+        """The first start or end of an event after game hour t, or infinity"""
+        self._extend(t)
+        i = bisect.bisect_right(self._boundaries, t)
+        return self._boundaries[i] if i < len(self._boundaries) else math.inf
+
+    def previous_boundary(self, t):
+        i = bisect.bisect_right(self._boundaries, t)
+        return self._boundaries[i - 1] if i else -math.inf
+
+    def state(self, t):
+        """The combined effect of the events at game hour t, recomputed only across event boundaries"""
+        state = self._state
+        if state is not None and state.start <= t < state.until:
+            return state
+        self._extend(t)
+        self._state = CalendarState(self.active(t), self.previous_boundary(t), self.next_boundary(t))
+        self.refresh_count += 1
+        return self._state
+
+    @classmethod
+    def from_config(cls, schedule=EVENT_SCHEDULE):
+        """A calendar of the seasons and the config's special and farming events"""
+        calendar = cls()
+        for i, season in enumerate(SEASONS):
+            calendar.add_recurring(Event(season, i * SEASON_HOURS, (i + 1) * SEASON_HOURS, "season"), YEAR_HOURS)
+        for name, event in load_config("creature_spawns").get("special_events", {}).items():
+            if name not in schedule:
+                continue
+            frequency, start, hours = schedule[name]
+            calendar.add_recurring(Event(name, start, start + hours, "special", event.get("global_modifier", 1.0),
+                                         creatures=event.get("exclusive_creatures", [])), FREQUENCY_HOURS[frequency])
+        for name, event in load_config("berry_types").get("events", {}).items():
+            if name not in schedule:
+                continue
+            frequency, start, hours = schedule[name]
+            frequency = event.get("frequency", frequency)
+            hours = event.get("duration_days", hours / 24) * 24
+            calendar.add_recurring(Event(name, start, start + hours, "farming", effects=event.get("effects", [])),
+                                   FREQUENCY_HOURS[frequency])
+        return calendar
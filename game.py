@@ -3,10 +3,10 @@ Main game module for Trapper-Mastering.
 A Pokemon-like game where you catch creatures using traps.
 """
 
-import random
 import json
 import os
 from creature import STARTER_CREATURES, get_random_wild_creature, Creature, Move
+from encounters import EncounterScheduler
 from player import Player
 from battle import Battle, BattleResult
 
@@ -37,6 +37,7 @@ class Game:
                 "wild_encounter_rate": 0.4,
             },
         }
+        self.encounter_schedule = EncounterScheduler()
         
     def start_new_game(self):
         """Start a new game"""
@@ -192,7 +193,9 @@ class Game:
         
         print("\nSearching for wild creatures...")
         
-        if random.random() < encounter_rate:
+        # each search is one step; the scheduler only redraws when the rate changes
+        self.encounter_schedule.set_rate(encounter_rate)
+        if self.encounter_schedule.step():
             wild_creature = get_random_wild_creature()
             print(f"\nA wild {wild_creature.name} (Lv.{wild_creature.level}) appeared!")
             self.start_battle(wild_creature)
@@ -8,15 +8,35 @@ This intentionally avoids invoking console-based battle flows. It's a thin UI wr
 that uses the existing `Player`, `Creature`, and `Game` model classes.
 """
 
+import os
 import sys
 import random
+import time
 import pygame
 from pygame import Rect
 
-from creature import STARTER_CREATURES, Creature, get_random_wild_creature
+from creature import STARTER_CREATURES, Creature, CreatureType
 from player import Player, TRAP_TYPES, HEAL_ITEMS
 from game import Game
 from battle import Battle, BattleResult
+from gui_render import DirtyRenderer
+from text_cache import TEXT_CACHE
+from terrain import BIOME_COLORS
+from world import World
+from tile_store import TileStore, bake_world
+from world_chunks import ChunkCache
+from simulation import FIXED_DT, FixedTimestep, Overworld
+from encounters import ENCOUNTERS
+from entities import ANIMATION_FRAMES
+from trap_field import NO_CATCH
+from quests import CAUGHT, TRAP_USED
+from encyclopedia import encyclopedia
+from world_clock import WorldConditions
+from event_calendar import EventCalendar
+from lighting import LightingCache, WeatherParticles
+from atlas import Atlas
+from ui import UI, Widget
+from profiler import PROFILER
 
 WIDTH, HEIGHT = 900, 640
 BG = (40, 80, 40)
@@ -31,11 +51,8 @@ MAP_COLS = 40
 MAP_ROWS = 30
 WORLD_W = TILE_SIZE * MAP_COLS
 WORLD_H = TILE_SIZE * MAP_ROWS
-TILE_COLORS = {
-    "grass": (100, 170, 100),
-    "water": (48, 120, 180),
-    "rock": (120, 110, 100),
-}
+WORLD_SEED = 1234
+MARKER_LABEL_MARGIN = 160  # widest marker label, so off-screen markers' labels still draw
 
 SCENE_TITLE = "title"
 SCENE_STARTER = "starter"
@@ -43,29 +60,60 @@ SCENE_MAP = "map"
 
 BUTTON_COLOR = (70, 120, 70)
 BUTTON_HOVER = (100, 160, 100)
+PROFILER_RECT = Rect(WIDTH - 340, 16, 324, 200)
+ENCYCLOPEDIA_RECT = Rect(WIDTH // 2 - 340, 40, 680, 420)
+ENCYCLOPEDIA_RESULTS = 14
+
+# Placeholder colors for roaming wild creatures without an atlas sprite
+ROAMER_COLORS = {
+    CreatureType.ROCK: (150, 130, 110),
+    CreatureType.ELECTRIC: (240, 220, 60),
+    CreatureType.GROUND: (190, 150, 90),
+    CreatureType.FLYING: (160, 190, 240),
+}
+PLACED_TRAP = "basic_net"  # the trap kind the T key sets on the map
+PLACED_BERRY = "razz_berry"  # the berry the B key puts out
+TRAP_COLOR = (120, 70, 30)
 
 
 def draw_text(surface, text, pos, font, color=TEXT):
-    surf = font.render(text, True, color)
-    surface.blit(surf, pos)
+    with PROFILER.stage("text"):
+        surf = TEXT_CACHE.render(font, text, color)
+        surface.blit(surf, pos)
 
 
-class Button:
-    def __init__(self, rect, label):
-        self.rect = Rect(rect)
+class Button(Widget):
+    def __init__(self, rect, label, action=None, color=BUTTON_COLOR, hover_color=BUTTON_HOVER):
+        super().__init__(rect, action)
         self.label = label
+        self.color = color
+        self.hover_color = hover_color
 
-    def draw(self, surf, font, mouse_pos):
-        hovering = self.rect.collidepoint(mouse_pos)
-        color = BUTTON_HOVER if hovering else BUTTON_COLOR
+    def highlight_state(self):
+        return (self.hovered, self.focused)
+
+    def draw(self, surf, font):
+        color = self.hover_color if self.hovered or self.focused else self.color
         pygame.draw.rect(surf, color, self.rect)
         pygame.draw.rect(surf, (0, 0, 0), self.rect, 2)
-        txt = font.render(self.label, True, (255, 255, 255))
+        txt = TEXT_CACHE.render(font, self.label, (255, 255, 255))
         txt_rect = txt.get_rect(center=self.rect.center)
         surf.blit(txt, txt_rect)
 
-    def clicked(self, mouse_pos, mouse_pressed):
-        return mouse_pressed[0] and self.rect.collidepoint(mouse_pos)
+
+def open_world(cache_dir):
+    """Open the baked tile map for the current world settings, baking it if needed"""
+    path = os.path.join(cache_dir, f"world_{WORLD_SEED}_{MAP_COLS}x{MAP_ROWS}.tmap")
+    try:
+        return World(MAP_COLS, MAP_ROWS, seed=WORLD_SEED, store=TileStore(path))
+    except (OSError, ValueError):
+        pass
+    try:
+        store = bake_world(path, MAP_COLS, MAP_ROWS, WORLD_SEED)
+    except OSError:
+        # read-only install: generate chunks on the fly instead
+        return World(MAP_COLS, MAP_ROWS, seed=WORLD_SEED)
+    return World(MAP_COLS, MAP_ROWS, seed=WORLD_SEED, store=store)
 
 
 def create_starter_copy(starter_template):
@@ -82,456 +130,706 @@ def create_starter_copy(starter_template):
     )
 
 
-def run():
-    pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Trapper-Mastering - GUI Integration")
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont(None, 22)
-    title_font = pygame.font.SysFont(None, 44)
-
-    # Ensure assets exist: generate simple placeholder sprites if missing
-    import os
-    assets_dir = os.path.join(os.path.dirname(__file__), "assets")
-    os.makedirs(assets_dir, exist_ok=True)
-
-    def ensure_image(path, size, draw_fn):
-        if not os.path.exists(path):
-            surf = pygame.Surface(size, pygame.SRCALPHA)
-            draw_fn(surf)
-            try:
-                pygame.image.save(surf, path)
-            except Exception:
-                # If saving fails (headless env), skip writing file
-                pass
-
-    # tile images
-    grass_path = os.path.join(assets_dir, "tile_grass.png")
-    water_path = os.path.join(assets_dir, "tile_water.png")
-    rock_path = os.path.join(assets_dir, "tile_rock.png")
-    player_path = os.path.join(assets_dir, "player.png")
-    creature_path = os.path.join(assets_dir, "creature.png")
-
-    ensure_image(grass_path, (TILE_SIZE, TILE_SIZE), lambda s: s.fill(TILE_COLORS['grass']))
-    ensure_image(water_path, (TILE_SIZE, TILE_SIZE), lambda s: s.fill(TILE_COLORS['water']))
-    def draw_rock(s):
-        s.fill(TILE_COLORS['rock'])
-        pygame.draw.circle(s, (160, 150, 140), (TILE_SIZE // 2, TILE_SIZE // 2), TILE_SIZE // 3)
-    ensure_image(rock_path, (TILE_SIZE, TILE_SIZE), draw_rock)
-
-    def draw_player(s):
-        s.fill((0, 0, 0, 0))
-        pygame.draw.ellipse(s, ACCENT, (6, 6, TILE_SIZE - 12, TILE_SIZE - 24))
-        pygame.draw.circle(s, (0, 0, 0), (TILE_SIZE // 2, 12), 4)
-    ensure_image(player_path, (TILE_SIZE, TILE_SIZE), draw_player)
-
-    def draw_creature(s):
-        s.fill((0, 0, 0, 0))
-        pygame.draw.rect(s, (220, 120, 100), (6, 10, TILE_SIZE - 12, TILE_SIZE - 18), border_radius=6)
-    ensure_image(creature_path, (TILE_SIZE, TILE_SIZE), draw_creature)
-
-    # Load images (fallback to simple surfaces if load fails)
-    try:
-        tile_grass_img = pygame.image.load(grass_path).convert()
-        tile_water_img = pygame.image.load(water_path).convert()
-        tile_rock_img = pygame.image.load(rock_path).convert()
-        player_img = pygame.image.load(player_path).convert_alpha()
-        creature_img = pygame.image.load(creature_path).convert_alpha()
-    except Exception:
-        tile_grass_img = pygame.Surface((TILE_SIZE, TILE_SIZE))
-        tile_grass_img.fill(TILE_COLORS['grass'])
-        tile_water_img = pygame.Surface((TILE_SIZE, TILE_SIZE))
-        tile_water_img.fill(TILE_COLORS['water'])
-        tile_rock_img = pygame.Surface((TILE_SIZE, TILE_SIZE))
-        tile_rock_img.fill(TILE_COLORS['rock'])
-        player_img = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
-        pygame.draw.ellipse(player_img, ACCENT, (6, 6, TILE_SIZE - 12, TILE_SIZE - 24))
-        creature_img = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
-        pygame.draw.rect(creature_img, (220, 120, 100), (6, 10, TILE_SIZE - 12, TILE_SIZE - 18), border_radius=6)
-
-    scene = SCENE_TITLE
-    message = ""
-
-    # UI elements
-    start_button = Button((WIDTH // 2 - 80, HEIGHT // 2 + 40, 160, 44), "Start Adventure")
-
-    # Starter buttons will be created when entering starter scene
-    starter_buttons = []
-
-    # Game model (lazily created when player chooses starter)
-    game = None
-    # Map / player movement state
-    player_px = None
-    player_py = None
-    player_speed = 180  # pixels per second
-    move_accum = 0.0
-    location_coords = {}
-    # world surface and tiles (created when entering map)
-    world_surf = None
-    tiles = None
-    # battle state for overlay
-    battle = None
-    in_battle = False
-    battle_message = ""
-    battle_mode = "action"  # action, moves, trap, item
-
-    running = True
-    while running:
-        dt = clock.tick(FPS) / 1000.0
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_pressed = pygame.mouse.get_pressed()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                running = False
-
-        screen.fill(BG)
-
-        if scene == SCENE_TITLE:
-            draw_text(screen, "TRAPPER-MASTERING", (40, 28), title_font, ACCENT)
-            draw_text(screen, "A minimal GUI integration prototype.", (40, 78), font)
-            draw_text(screen, "This demo covers starter selection and map/scene switching.", (40, 106), font)
-
-            start_button.draw(screen, font, mouse_pos)
-            if start_button.clicked(mouse_pos, mouse_pressed):
-                # build starter buttons from STARTER_CREATURES
-                starter_buttons = []
-                names = list(STARTER_CREATURES.keys())
-                w = 240
-                h = 120
-                gap = 24
-                total_w = len(names) * w + (len(names) - 1) * gap
-                start_x = WIDTH // 2 - total_w // 2
-                y = HEIGHT // 2 - h // 2
-                for i, name in enumerate(names):
-                    rect = (start_x + i * (w + gap), y, w, h)
-                    starter_buttons.append((rect, name))
-                scene = SCENE_STARTER
-                pygame.time.delay(150)
-
-        elif scene == SCENE_STARTER:
-            draw_text(screen, "Choose your starter:", (40, 28), title_font)
-
-            for rect, name in starter_buttons:
-                r = Rect(rect)
-                hovering = r.collidepoint(mouse_pos)
-                pygame.draw.rect(screen, PANEL if not hovering else (50, 90, 50), r)
-                pygame.draw.rect(screen, (0, 0, 0), r, 2)
+class GuiApp:
+    """
+    The GUI state and one frame of input, simulation and rendering
+
+    `run()` drives it from the real event queue and clock; scripts such as
+    render_benchmark.py feed it events directly through `frame()`. A world
+    and location markers can be passed in to replace the baked default map.
+    """
+
+    def __init__(self, screen, world=None, locations=None, assets_dir=None):
+        self.screen = screen
+        self.font = pygame.font.SysFont(None, 22)
+        self.title_font = pygame.font.SysFont(None, 44)
+        font = self.font
+        title_font = self.title_font
+
+        self.assets_dir = assets_dir or os.path.join(os.path.dirname(__file__), "assets")
+        os.makedirs(self.assets_dir, exist_ok=True)
+
+        # Sprites come from the packed atlas (see atlas.py); its sheets are only
+        # loaded when a sprite on them is first used. Sprites missing from the
+        # atlas fall back to simple placeholders drawn in memory.
+        atlas = Atlas.open(os.path.join(self.assets_dir, "atlas"))
+
+        def sprite(name, draw_fn):
+            img = atlas.get(name) if atlas is not None else None
+            if img is None:
+                img = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
+                img.fill((0, 0, 0, 0))
+                draw_fn(img)
+            return img
+
+        def draw_player(s):
+            pygame.draw.ellipse(s, ACCENT, (6, 6, TILE_SIZE - 12, TILE_SIZE - 24))
+            pygame.draw.circle(s, (0, 0, 0), (TILE_SIZE // 2, 12), 4)
+
+        def draw_creature(s):
+            pygame.draw.rect(s, (220, 120, 100), (6, 10, TILE_SIZE - 12, TILE_SIZE - 18), border_radius=6)
+
+        def draw_roamer(s, color, frame):
+            # a small body that squashes on alternate frames as it walks
+            squash = 4 * frame
+            pygame.draw.ellipse(s, color, (12 - squash // 2, 20 + squash, 24 + squash, 20 - squash))
+            pygame.draw.circle(s, (0, 0, 0), (20, 26 + squash), 2)
+            pygame.draw.circle(s, (0, 0, 0), (28, 26 + squash), 2)
+
+        self.player_img = sprite("player", draw_player)
+        self.creature_img = sprite("creature", draw_creature)
+        # roaming creature frames per species id, see Overworld.creatures
+        self.roamer_imgs = [
+            [sprite(f"wild_{species.name.lower()}_{frame}",
+                    lambda s, c=ROAMER_COLORS.get(species.type, (200, 200, 200)), f=frame: draw_roamer(s, c, f))
+             for frame in range(ANIMATION_FRAMES)]
+            for species in ENCOUNTERS.default_pool.species
+        ]
+        self.roamers_shown = set()  # (sprite, screen position) of the roamers drawn last frame
+
+        # Static UI labels never change, so rasterize them once up front
+        TEXT_CACHE.prerender(title_font, ["TRAPPER-MASTERING"], ACCENT)
+        TEXT_CACHE.prerender(title_font, ["Choose your starter:", "Player Info"], TEXT)
+        TEXT_CACHE.prerender(font, [
+            "A minimal GUI integration prototype.",
+            "This demo covers starter selection and map/scene switching.",
+            "Click any location to travel there.",
+            "Choose", "Party:", "Fight", "Trap", "Item", "Run",
+        ], TEXT)
+        TEXT_CACHE.prerender(font, ["Start Adventure", "Continue"], (255, 255, 255))
+
+        self.scene = SCENE_TITLE
+        self.message = ""
+        self.running = True
+
+        # Retained-mode renderer: only regions whose content changed are redrawn
+        # and pushed to the display each frame.
+        self.renderer = DirtyRenderer(screen)
+        self.screen_rect = screen.get_rect()
+
+        # Widgets receive clicks and key presses from the event queue; the tree is
+        # rebuilt whenever the set of controls on screen changes.
+        self.ui = UI()
+        self.ui_state = None
+
+        # UI elements
+        self.start_button = Button((WIDTH // 2 - 80, HEIGHT // 2 + 40, 160, 44), "Start Adventure", ("start",))
+
+        # one card per starter; clicking anywhere on a card chooses it
+        self.starter_buttons = []
+        names = list(STARTER_CREATURES.keys())
+        w = 240
+        h = 120
+        gap = 24
+        total_w = len(names) * w + (len(names) - 1) * gap
+        start_x = WIDTH // 2 - total_w // 2
+        y = HEIGHT // 2 - h // 2
+        for i, name in enumerate(names):
+            self.starter_buttons.append(Widget((start_x + i * (w + gap), y, w, h), ("starter", name)))
+
+        # map scene layout: left panel with the map, right panel with player info
+        self.panel = Rect(16, 16, 540, HEIGHT - 32)
+        self.map_area = Rect(self.panel.x + 12, self.panel.y + 96, self.panel.width - 24, self.panel.height - 112)
+        self.info = Rect(self.panel.right + 12, 16, WIDTH - self.panel.right - 28, HEIGHT - 32)
+        # cached day-night tints and pooled weather particles over the map view
+        self.lighting = LightingCache(self.map_area.size)
+        self.weather_fx = WeatherParticles(self.map_area.size, target_ms=1000.0 / FPS)
+        self.frame_dt = 0.0
+
+        # battle overlay layout
+        self.overlay = Rect(WIDTH // 2 - 340, HEIGHT // 2 - 200, 680, 400)
+        # left: wild creature
+        self.left = Rect(self.overlay.x + 12, self.overlay.y + 12, 320, 200)
+        # right: player creature and actions
+        self.right = Rect(self.overlay.x + 344, self.overlay.y + 12, 320, 200)
+        # battle log area
+        self.log_rect = Rect(self.overlay.x + 12, self.overlay.y + 224, self.overlay.width - 24, 148)
+        # moves / trap / item sub-menus
+        self.sub = Rect(self.overlay.x + 12, self.overlay.y + 12, self.overlay.width - 24, 200)
+        self.end_button = Button((self.overlay.right - 120, self.overlay.y + 352, 96, 36), "Continue",
+                                 ("end_battle",), (160, 80, 80), (190, 100, 100))
+
+        # action buttons
+        btn_w = 88
+        btn_h = 36
+        self.battle_buttons = []
+        for i, a in enumerate(["Fight", "Trap", "Item", "Run"]):
+            bx = self.right.x + 8 + (i % 2) * (btn_w + 8)
+            by = self.right.y + 100 + (i // 2) * (btn_h + 8)
+            self.battle_buttons.append(Button((bx, by, btn_w, btn_h), a, ("battle", a)))
+
+        # Game model (lazily created when player chooses starter)
+        self.game = None
+        # Overworld simulation, advanced in fixed ticks independent of the frame rate
+        self.overworld = None
+        self.stepper = FixedTimestep()
+        self.move = (0, 0)
+        # world tiles and chunk surfaces (created when entering map)
+        self.world = world
+        self.locations = locations
+        self.chunk_cache = None
+        # battle state for overlay
+        self.battle = None
+        self.in_battle = False
+        self.battle_message = ""
+        self.battle_mode = "action"  # action, moves, trap, item
+        self.sub_buttons = []
+        # encyclopedia search overlay (F2); typing goes to the query while it is open
+        self.search_open = False
+        self.search_query = ""
+        self.search_found = (None, [])  # (query, matching entries) of the last search
+
+        self.sync_ui()
+
+    def make_sub_buttons(self):
+        """Buttons for the open battle sub-menu"""
+        sub = self.sub
+        player = self.game.player
+        if self.battle_mode == 'moves':
+            return [Button((sub.x + 12 + (i % 2) * 160, sub.y + 8 + (i // 2) * 48, 152, 40),
+                           f"{mv.name} ({mv.type})", ("move", i), (60, 100, 60))
+                    for i, mv in enumerate(self.battle.player_creature.moves)]
+        if self.battle_mode == 'trap':
+            # show trap items from player inventory
+            inv_traps = [n for n in player.inventory.keys() if 'Trap' in n]
+            return [Button((sub.x + 12 + (i % 3) * 220, sub.y + 8 + (i // 3) * 44, 200, 36),
+                           f"{tname} x{player.get_item_count(tname)}", ("trap", tname), (80, 120, 80))
+                    for i, tname in enumerate(inv_traps)]
+        if self.battle_mode == 'item':
+            heal_items = [n for n in player.inventory.keys() if n in HEAL_ITEMS]
+            return [Button((sub.x + 12 + (i % 3) * 220, sub.y + 8 + (i // 3) * 44, 200, 36),
+                           f"{iname} x{player.get_item_count(iname)}", ("item", iname), (80, 80, 120))
+                    for i, iname in enumerate(heal_items)]
+        return []
+
+    def sync_ui(self):
+        """Point the widget tree at the controls of the current scene"""
+        battle = self.battle
+        battle_over = battle is not None and battle.result != BattleResult.ONGOING
+        state = (self.scene, self.in_battle, self.battle_mode, battle_over)
+        if state == self.ui_state:
+            return
+        self.ui_state = state
+        if self.in_battle and battle is not None:
+            # the battle overlay is modal
+            self.sub_buttons = [] if battle_over else self.make_sub_buttons()
+            widgets = [self.end_button] if battle_over else self.battle_buttons + self.sub_buttons
+        elif self.scene == SCENE_TITLE:
+            widgets = [self.start_button]
+        elif self.scene == SCENE_STARTER:
+            widgets = self.starter_buttons
+        else:
+            widgets = []
+        self.ui.set_widgets(widgets)
+
+    def start_battle(self, wild):
+        """Open the battle overlay against a wild creature"""
+        capture_modifier = 1.0
+        if self.overworld is not None:
+            capture_modifier = self.overworld.capture_modifier()
+        self.battle = Battle(self.game.player, wild, capture_modifier)
+        self.in_battle = True
+        self.battle_message = f"A wild {wild.name} appeared!"
+        self.sync_ui()
+
+    def handle_event(self, event):
+        """Process one pygame event"""
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F2:
+            self.search_open = not self.search_open
+        elif event.type == pygame.KEYDOWN and self.search_open:
+            self.handle_search_key(event)
+            return
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            self.running = False
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            PROFILER.show_overlay(not PROFILER.overlay_visible)
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+            if not PROFILER.trace:
+                self.message = "No frames recorded; open the profiler (F3) before exporting a trace"
+            else:
+                trace_path = os.path.abspath(f"trace_{int(time.time())}.json")
+                PROFILER.export_chrome_trace(trace_path)
+                self.message = f"Wrote frame trace to {trace_path}"
+        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_t, pygame.K_c, pygame.K_b) \
+                and self.overworld is not None and self.scene == SCENE_MAP and not self.in_battle:
+            self.handle_field_key(event.key)
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.renderer.invalidate()
+
+        widget = self.ui.handle_event(event)
+        if widget is not None:
+            self.handle_action(widget.action)
+            self.sync_ui()
+
+    def handle_field_key(self, key):
+        """
+        T sets a trap on the player's tile, B puts out a berry there and C
+        collects the catches of traps in reach
+        """
+        if key == pygame.K_b:
+            self.overworld.place_berry(PLACED_BERRY)
+            self.message = f"Put out a {PLACED_BERRY.replace('_', ' ')}."
+            return
+        if key == pygame.K_t:
+            self.overworld.place_trap(PLACED_TRAP)
+            self.message = f"Set a {PLACED_TRAP.replace('_', ' ')}."
+            return
+        caught = self.overworld.collect_traps()
+        if caught:
+            self.message = "Collected " + ", ".join(c.name for c in caught) + " from your traps."
+        else:
+            self.message = "No catches in reach."
+
+    def handle_search_key(self, event):
+        """Edit the encyclopedia query; Escape closes the search"""
+        if event.key == pygame.K_ESCAPE:
+            self.search_open = False
+        elif event.key == pygame.K_BACKSPACE:
+            self.search_query = self.search_query[:-1]
+        elif event.unicode and event.unicode.isprintable():
+            self.search_query += event.unicode
+
+    def handle_action(self, action):
+        """React to an activated widget"""
+        battle = self.battle
+        if action[0] == "start":
+            self.scene = SCENE_STARTER
+        elif action[0] == "starter":
+            # Create game and player
+            starter = STARTER_CREATURES[action[1]]
+            player_name = "Player"  # could prompt via a text field in future
+            player = Player(player_name)
+            starter_obj = create_starter_copy(starter)
+            player.add_creature(starter_obj)
+            self.game = Game()
+            self.game.player = player
+            self.message = f"You chose {starter.name}! Welcome, {player_name}."
+            self.scene = SCENE_MAP
+        elif action[0] == "battle":
+            if action[1] == 'Fight':
+                self.battle_mode = 'moves'
+            elif action[1] == 'Trap':
+                self.battle_mode = 'trap'
+            elif action[1] == 'Item':
+                self.battle_mode = 'item'
+            elif action[1] == 'Run':
+                if battle.attempt_run():
+                    self.battle_message = 'Ran away.'
+        elif action[0] == "move":
+            battle.player_attack(action[1])
+            self.battle_message = 'Player used move.'
+            self.battle_mode = 'action'
+        elif action[0] == "trap":
+            battle.attempt_catch(action[1])
+            self.battle_message = 'Tried catching.'
+            if self.overworld is not None:
+                self.overworld.notify(TRAP_USED, action[1])
+                if battle.result == BattleResult.CAUGHT:
+                    self.overworld.notify(CAUGHT, battle.wild_creature.name)
+            self.battle_mode = 'action'
+        elif action[0] == "item":
+            battle.use_heal_item(action[1])
+            self.battle_message = 'Used item.'
+            self.battle_mode = 'action'
+        elif action[0] == "end_battle":
+            # finalize battle: if caught or won, messages already applied in Battle
+            self.in_battle = False
+            self.battle = None
+            self.battle_mode = 'action'
+            self.message = ""  # clear map message
+
+    def enter_map(self):
+        """Load the world and start the overworld simulation"""
+        if self.world is None:
+            # the world is read from a baked, memory-mapped tile map and
+            # rasterized chunk by chunk around the camera
+            self.world = open_world(self.assets_dir)
+        self.chunk_cache = ChunkCache(self.world, BIOME_COLORS, TILE_SIZE)
+        self.overworld = Overworld(self.game, self.world, TILE_SIZE, locations=self.locations, rng=random,
+                                   conditions=WorldConditions(seed=random.randrange(2 ** 32),
+                                                              calendar=EventCalendar.from_config()))
+
+    def update(self, dt, keys):
+        """Advance the overworld simulation by one frame's worth of ticks"""
+        if self.scene != SCENE_MAP or self.game is None:
+            return
+        if self.overworld is None:
+            self.enter_map()
+
+        # handle player movement (keyboard)
+        mv_x = mv_y = 0
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            mv_x -= 1
+        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            mv_x += 1
+        if keys[pygame.K_UP] or keys[pygame.K_w]:
+            mv_y -= 1
+        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+            mv_y += 1
+        if self.search_open:
+            mv_x = mv_y = 0  # the keys are typing a query
+        self.move = (mv_x, mv_y)
+        self.overworld.set_input(mv_x, mv_y)
+
+        # run the simulation ticks that have accumulated since the last frame
+        with PROFILER.stage("simulation"):
+            for _ in range(self.stepper.advance(dt)):
+                self.overworld.encounters_enabled = not self.in_battle
+                for kind, value in self.overworld.step(FIXED_DT):
+                    if kind == "arrived":
+                        self.message = f"Traveled to {value}."
+                    elif kind == "encounter" and not self.game.player.has_usable_creatures():
+                        self.message = "All your creatures have fainted! Heal them first!"
+                    elif kind == "encounter":
+                        self.start_battle(value)
+                    elif kind == "calendar":
+                        self.message = "Now: " + ", ".join(name.replace('_', ' ') for name in value)
+                    elif kind == "quest_completed":
+                        self.message = f"Completed {value.name.replace('_', ' ')}!"
+
+    def draw_title(self):
+        font = self.font
+        title_font = self.title_font
+        start_button = self.start_button
+
+        def draw_title(s):
+            draw_text(s, "TRAPPER-MASTERING", (40, 28), title_font, ACCENT)
+            draw_text(s, "A minimal GUI integration prototype.", (40, 78), font)
+            draw_text(s, "This demo covers starter selection and map/scene switching.", (40, 106), font)
+
+        self.renderer.add_layer("title", Rect(0, 0, WIDTH, 140), (), draw_title)
+        self.renderer.add_layer("start_button", start_button.rect, start_button.highlight_state(),
+                                lambda s: start_button.draw(s, font))
+
+    def draw_starter(self):
+        font = self.font
+        title_font = self.title_font
+        self.renderer.add_layer("starter_title", Rect(0, 0, WIDTH, 80), (),
+                                lambda s: draw_text(s, "Choose your starter:", (40, 28), title_font))
+
+        for card in self.starter_buttons:
+            r = card.rect
+            hovering = card.hovered or card.focused
+            starter = STARTER_CREATURES[card.action[1]]
+            # choose button
+            choose_btn = Rect(r.right - 96, r.bottom - 36, 84, 28)
+
+            def draw_card(s, r=r, starter=starter, hovering=hovering, choose_btn=choose_btn):
+                pygame.draw.rect(s, PANEL if not hovering else (50, 90, 50), r)
+                pygame.draw.rect(s, (0, 0, 0), r, 2)
                 # draw creature info
-                starter = STARTER_CREATURES[name]
-                draw_text(screen, f"{starter.name} (Type: {starter.type})", (r.x + 12, r.y + 12), font)
-                draw_text(screen, f"HP: {starter.max_hp}  ATK: {starter.attack}  DEF: {starter.defense}", (r.x + 12, r.y + 36), font)
+                draw_text(s, f"{starter.name} (Type: {starter.type})", (r.x + 12, r.y + 12), font)
+                draw_text(s, f"HP: {starter.max_hp}  ATK: {starter.attack}  DEF: {starter.defense}", (r.x + 12, r.y + 36), font)
                 moves = ", ".join(m.name for m in starter.moves)
-                draw_text(screen, f"Moves: {moves}", (r.x + 12, r.y + 60), font)
-
-                # choose button
-                choose_btn = Rect(r.right - 96, r.bottom - 36, 84, 28)
-                pygame.draw.rect(screen, BUTTON_COLOR, choose_btn)
-                draw_text(screen, "Choose", (choose_btn.x + 12, choose_btn.y + 6), font)
-
-                if mouse_pressed[0] and (r.collidepoint(mouse_pos) or choose_btn.collidepoint(mouse_pos)):
-                    # Create game and player
-                    player_name = "Player"  # could prompt via a text field in future
-                    player = Player(player_name)
-                    starter_obj = create_starter_copy(starter)
-                    player.add_creature(starter_obj)
-                    game = Game()
-                    game.player = player
-                    message = f"You chose {starter.name}! Welcome, {player_name}."
-                    scene = SCENE_MAP
-                    pygame.time.delay(180)
-                    break
-
-        elif scene == SCENE_MAP:
-            if game is None:
-                draw_text(screen, "No game instance found.", (40, 40), font)
-            else:
-                # Left panel: map / locations
-                panel = Rect(16, 16, 540, HEIGHT - 32)
-                pygame.draw.rect(screen, PANEL, panel)
-                pygame.draw.rect(screen, (0, 0, 0), panel, 2)
-                draw_text(screen, f"Location: {game.current_location}", (panel.x + 12, panel.y + 12), title_font)
-                draw_text(screen, "Click any location to travel there.", (panel.x + 12, panel.y + 56), font)
-
-                # draw a simple tilemap area inside the left panel
-                map_area = Rect(panel.x + 12, panel.y + 96, panel.width - 24, panel.height - 112)
-                pygame.draw.rect(screen, (60, 110, 60), map_area)
-
-                # define location marker positions once
-                if not location_coords:
-                    # lazy-create a simple procedural tile map and location markers
-                    tiles = []
-                    random.seed(1234)
-                    for ry in range(MAP_ROWS):
-                        row = []
-                        for rx in range(MAP_COLS):
-                            r = random.random()
-                            if r < 0.1:
-                                row.append("water")
-                            elif r < 0.18:
-                                row.append("rock")
-                            else:
-                                row.append("grass")
-                        tiles.append(row)
-                    # create a world surface and paint tiles (use tile images when available)
-                    world_surf = pygame.Surface((WORLD_W, WORLD_H))
-                    for ry in range(MAP_ROWS):
-                        for rx in range(MAP_COLS):
-                            t = tiles[ry][rx]
-                            x = rx * TILE_SIZE
-                            y = ry * TILE_SIZE
-                            if t == 'water':
-                                world_surf.blit(tile_water_img, (x, y))
-                            elif t == 'rock':
-                                world_surf.blit(tile_rock_img, (x, y))
-                            else:
-                                world_surf.blit(tile_grass_img, (x, y))
-
-                    # distribute logical location markers across the world surface
-                    locs = list(game.locations.keys())
-                    n = len(locs)
-                    for i, loc in enumerate(locs):
-                        fx = 0.06 + 0.88 * (i / max(1, n - 1))
-                        fy = 0.12 + 0.76 * ((i % 4) / 3.0)
-                        cx = int(fx * WORLD_W)
-                        cy = int(fy * WORLD_H)
-                        location_coords[loc] = (cx, cy)
-
-                # initialize player position if needed (near current location) - world coords
-                if player_px is None or player_py is None:
-                    if game.current_location in location_coords:
-                        player_px, player_py = location_coords[game.current_location]
-                    else:
-                        player_px = WORLD_W // 2
-                        player_py = WORLD_H // 2
-
-                # camera centered on player (world coords) and blit visible world to map_area
-                cam_x = int(player_px - map_area.width // 2)
-                cam_y = int(player_py - map_area.height // 2)
-                cam_x = max(0, min(WORLD_W - map_area.width, cam_x))
-                cam_y = max(0, min(WORLD_H - map_area.height, cam_y))
-
-                # blit world surface portion
-                screen.blit(world_surf, (map_area.x, map_area.y), area=Rect(cam_x, cam_y, map_area.width, map_area.height))
-
-                # draw location markers in screen coords
-                for loc, (wx, wy) in location_coords.items():
+                draw_text(s, f"Moves: {moves}", (r.x + 12, r.y + 60), font)
+                pygame.draw.rect(s, BUTTON_COLOR, choose_btn)
+                draw_text(s, "Choose", (choose_btn.x + 12, choose_btn.y + 6), font)
+
+            self.renderer.add_layer(("starter", card.action[1]), r, (hovering,), draw_card)
+
+    def draw_map(self):
+        font = self.font
+        title_font = self.title_font
+        game = self.game
+        renderer = self.renderer
+        if game is None:
+            renderer.add_layer("no_game", Rect(0, 0, WIDTH, 80), (),
+                               lambda s: draw_text(s, "No game instance found.", (40, 40), font))
+            return
+
+        panel = self.panel
+        map_area = self.map_area
+        overworld = self.overworld
+        chunk_cache = self.chunk_cache
+        creature_img = self.creature_img
+        player_img = self.player_img
+
+        # draw the player between the last two ticks for smooth motion
+        player_px, player_py = overworld.position(self.stepper.alpha)
+
+        # camera centered on player (world coords)
+        cam_x = int(player_px - map_area.width // 2)
+        cam_y = int(player_py - map_area.height // 2)
+        cam_x = max(0, min(overworld.width - map_area.width, cam_x))
+        cam_y = max(0, min(overworld.height - map_area.height, cam_y))
+
+        # time and weather under the player, shared by the weather effects and the info panel
+        conditions = overworld.conditions
+        weather = None
+        if conditions is not None:
+            weather = conditions.weather_at(overworld.tile_under(player_px, player_py))
+
+        # warm up the chunks the camera is heading towards
+        chunk_cache.prefetch(Rect(cam_x, cam_y, map_area.width, map_area.height), *self.move)
+
+        def draw_panel(s):
+            pygame.draw.rect(s, PANEL, panel)
+            pygame.draw.rect(s, (0, 0, 0), panel, 2)
+            draw_text(s, f"Location: {game.current_location}", (panel.x + 12, panel.y + 12), title_font)
+            draw_text(s, "Click any location to travel there.", (panel.x + 12, panel.y + 56), font)
+
+        def draw_map(s, cam_x=cam_x, cam_y=cam_y):
+            # blit the visible part of the world from the chunk surfaces
+            with PROFILER.stage("world"):
+                chunk_cache.draw_view(s, map_area, cam_x, cam_y)
+            # draw the location markers near the view in screen coords; the
+            # query is widened so labels of markers just off-screen still show
+            with PROFILER.stage("markers"):
+                c_w, c_h = creature_img.get_size()
+                visible = overworld.location_index.query_rect(cam_x - MARKER_LABEL_MARGIN, cam_y - c_h,
+                                                              map_area.width + MARKER_LABEL_MARGIN + c_w,
+                                                              map_area.height + 2 * c_h)
+                for loc in visible:
+                    wx, wy = overworld.location_index.position(loc)
                     sx = map_area.x + (wx - cam_x)
                     sy = map_area.y + (wy - cam_y)
-                    # draw creature icon at marker
-                    c_w, c_h = creature_img.get_size()
-                    screen.blit(creature_img, (int(sx - c_w / 2), int(sy - c_h / 2)))
-                    draw_text(screen, loc, (sx + 16, sy - 8), font)
-
-                # handle player movement (keyboard)
-                mv_x = mv_y = 0
-                keys = pygame.key.get_pressed()
-                if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-                    mv_x -= 1
-                if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-                    mv_x += 1
-                if keys[pygame.K_UP] or keys[pygame.K_w]:
-                    mv_y -= 1
-                if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-                    mv_y += 1
-
-                if mv_x != 0 and mv_y != 0:
-                    mv_x *= 0.7071
-                    mv_y *= 0.7071
-
-                # move player in world coords and clamp
-                player_px += mv_x * player_speed * dt
-                player_py += mv_y * player_speed * dt
-                player_px = max(8, min(WORLD_W - 8, player_px))
-                player_py = max(8, min(WORLD_H - 8, player_py))
-
-                # simple animated player sprite (bobbing) using image
-                bob = int(3.0 * (1.0 + pygame.time.get_ticks() / 300.0) % 6 - 3)
-                psx = map_area.x + (player_px - cam_x)
-                psy = map_area.y + (player_py - cam_y) + bob
-                p_w, p_h = player_img.get_size()
-                screen.blit(player_img, (int(psx - p_w / 2), int(psy - p_h / 2)))
-
-                # check proximity to location markers to 'arrive' at that location
-                for loc, (wx, wy) in location_coords.items():
-                    dist2 = (player_px - wx) ** 2 + (player_py - wy) ** 2
-                    if dist2 <= (TILE_SIZE // 2) ** 2:
-                        if game.current_location != loc:
-                            game.current_location = loc
-                            message = f"Traveled to {loc}."
-                            move_accum = 0.0
-
-                # simple encounter trigger when moving in wild areas (not Starting Town)
-                move_happened = (abs(mv_x) > 0 or abs(mv_y) > 0)
-                if move_happened:
-                    move_accum += dt
-                if move_accum >= 1.0 and not in_battle:
-                    rate = game.locations.get(game.current_location, {}).get('wild_encounter_rate', 0.0)
-                    if rate > 0 and random.random() < rate * 0.12:
-                        # spawn a wild creature based on tile under player
-                        def spawn_wild_at(wx, wy):
-                            # determine tile type under player
-                            try:
-                                tx = int(wx // TILE_SIZE)
-                                ty = int(wy // TILE_SIZE)
-                                tile = tiles[ty][tx]
-                            except Exception:
-                                tile = "grass"
-
-                            # try to pick a creature whose type matches a simple habitat map
-                            habitat_map = {
-                                "water": ["Water", "Electric"],
-                                "rock": ["Rock", "Ground"],
-                                "grass": ["Grass", "Normal", "Flying", "Ground"],
-                            }
-
-                            preferred = habitat_map.get(tile, ["Normal"])
-                            for _ in range(8):
-                                c = get_random_wild_creature()
-                                if c.type in preferred:
-                                    return c
-                            return get_random_wild_creature()
-
-                        wild = spawn_wild_at(player_px, player_py)
-                        # start a Battle instance
-                        battle = Battle(game.player, wild)
-                        in_battle = True
-                        battle_message = f"A wild {wild.name} appeared!"
-                    move_accum = 0.0
-
-                # Right panel: player info
-                info = Rect(panel.right + 12, 16, WIDTH - panel.right - 28, HEIGHT - 32)
-                pygame.draw.rect(screen, PANEL, info)
-                pygame.draw.rect(screen, (0, 0, 0), info, 2)
-                draw_text(screen, "Player Info", (info.x + 12, info.y + 12), title_font)
-                if game.player:
-                    draw_text(screen, f"Name: {game.player.name}", (info.x + 12, info.y + 56), font)
-                    draw_text(screen, f"Money: ${game.player.money}", (info.x + 12, info.y + 80), font)
-                    draw_text(screen, "Party:", (info.x + 12, info.y + 110), font)
-                    for idx, c in enumerate(game.player.party):
-                        draw_text(screen, f"{idx+1}. {c.name} (Lv.{c.level}) HP:{c.current_hp}/{c.max_hp}", (info.x + 12, info.y + 136 + idx * 26), font)
+                    s.blit(creature_img, (int(sx - c_w / 2), int(sy - c_h / 2)))
+                    draw_text(s, loc, (sx + 16, sy - 8), font)
+
+        renderer.add_layer("map_panel", panel, (game.current_location,), draw_panel)
+        renderer.add_layer("map_view", map_area, (cam_x, cam_y), draw_map)
+
+        # placed traps in view; a trap holding a catch is drawn filled
+        traps = overworld.traps
+        shown = traps.ids()
+        if len(shown):
+            tiles = traps.tile[shown]
+            in_view = ((tiles[:, 0] + 1) * TILE_SIZE > cam_x) & (tiles[:, 0] * TILE_SIZE < cam_x + map_area.width) \
+                & ((tiles[:, 1] + 1) * TILE_SIZE > cam_y) & (tiles[:, 1] * TILE_SIZE < cam_y + map_area.height)
+            shown = shown[in_view]
+        if len(shown):
+            centers = ((traps.tile[shown] + 0.5) * TILE_SIZE + (map_area.x - cam_x, map_area.y - cam_y)).astype(int)
+            marks = tuple(zip(map(tuple, centers.tolist()), (traps.caught[shown] != NO_CATCH).tolist()))
+
+            def draw_traps(s):
+                with PROFILER.stage("creatures"):
+                    for center, full in marks:
+                        pygame.draw.circle(s, TRAP_COLOR, center, TILE_SIZE // 4, 0 if full else 2)
+
+            renderer.add_layer("traps", map_area, marks, draw_traps)
+
+        # roaming wild creatures: culled and drawn in one batch. Only the
+        # sprites that moved, changed frame, came into view or left it are
+        # marked dirty, so the rest of the map is not repainted for them.
+        creatures = overworld.creatures
+        half = TILE_SIZE // 2
+        visible = creatures.query_rect(cam_x - half, cam_y - half, map_area.width + TILE_SIZE, map_area.height + TILE_SIZE)
+        batch = []
+        if len(visible):
+            roamer_imgs = self.roamer_imgs
+            points = (creatures.pos[visible] + (map_area.x - cam_x - half, map_area.y - cam_y - half)).astype(int)
+            batch = [(roamer_imgs[species][frame], (x, y)) for species, frame, (x, y) in
+                     zip(creatures.species[visible].tolist(), creatures.frame[visible].tolist(), points.tolist())]
+        shown = set(batch)
+        for img, pos in shown.symmetric_difference(self.roamers_shown):
+            renderer.mark_dirty(Rect(pos, img.get_size()).clip(map_area))
+        self.roamers_shown = shown
+
+        def draw_roamers(s):
+            with PROFILER.stage("creatures"):
+                s.blits(batch, doreturn=False)
+
+        renderer.add_layer("roamers", map_area, None, draw_roamers)
+
+        # simple animated player sprite (bobbing) using image
+        bob = int(3.0 * (1.0 + pygame.time.get_ticks() / 300.0) % 6 - 3)
+        psx = map_area.x + (player_px - cam_x)
+        psy = map_area.y + (player_py - cam_y) + bob
+        p_w, p_h = player_img.get_size()
+        player_pos = (int(psx - p_w / 2), int(psy - p_h / 2))
+        player_rect = Rect(player_pos, (p_w, p_h)).clip(map_area)
+        renderer.add_layer("player", player_rect, (),
+                           lambda s, pos=player_pos: s.blit(player_img, pos))
+
+        # weather particles, then the day-night tint over the whole view
+        if conditions is not None:
+            weather_fx = self.weather_fx
+            with PROFILER.stage("weather"):
+                weather_fx.set_weather(weather)
+                weather_fx.update(self.frame_dt, cam_x, cam_y)
+            if weather_fx.active:
+                def draw_weather(s):
+                    with PROFILER.stage("weather"):
+                        weather_fx.draw(s, map_area.topleft)
+
+                renderer.add_layer("weather", map_area, (weather_fx.kind, weather_fx.active, weather_fx.steps),
+                                   draw_weather)
+            light_key = self.lighting.key(conditions.clock.hours, weather)
+            renderer.add_layer("lighting", map_area, (light_key,),
+                               lambda s, key=light_key: self.lighting.draw(s, map_area.topleft, key))
+
+        # Right panel: player info
+        info = self.info
+
+        def draw_info(s):
+            pygame.draw.rect(s, PANEL, info)
+            pygame.draw.rect(s, (0, 0, 0), info, 2)
+            draw_text(s, "Player Info", (info.x + 12, info.y + 12), title_font)
+            if game.player:
+                draw_text(s, f"Name: {game.player.name}", (info.x + 12, info.y + 56), font)
+                draw_text(s, f"Money: ${game.player.money}", (info.x + 12, info.y + 80), font)
+                draw_text(s, "Party:", (info.x + 12, info.y + 110), font)
+                for idx, c in enumerate(game.player.party):
+                    draw_text(s, f"{idx+1}. {c.name} (Lv.{c.level}) HP:{c.current_hp}/{c.max_hp}", (info.x + 12, info.y + 136 + idx * 26), font)
+            if conditions_text:
+                draw_text(s, conditions_text, (info.x + 12, info.bottom - 34), font)
+
+        # the conditions text changes at most once per game minute
+        conditions_text = ""
+        if conditions is not None:
+            conditions_text = f"{conditions.clock.time_string()} {conditions.period}, {weather.replace('_', ' ')}"
+        info_signature = None
+        if game.player:
+            info_signature = (game.player.name, game.player.money,
+                              tuple((c.name, c.level, c.current_hp, c.max_hp) for c in game.player.party))
+        renderer.add_layer("player_info", info, (info_signature, conditions_text), draw_info)
+
+    def draw_battle(self):
+        font = self.font
+        battle = self.battle
+        overlay, left, right, log_rect = self.overlay, self.left, self.right, self.log_rect
+        end_button = self.end_button
+        logs = battle.get_battle_state().get('log', [])
+        wild = battle.wild_creature
+        pc = battle.player_creature
+        buttons = [] if battle.result != BattleResult.ONGOING else self.battle_buttons + self.sub_buttons
+
+        def draw_battle(s, result=battle.result):
+            with PROFILER.stage("battle"):
+                pygame.draw.rect(s, (18, 28, 18), overlay)
+                pygame.draw.rect(s, (0, 0, 0), overlay, 3)
+
+                pygame.draw.rect(s, (28, 48, 28), left)
+                draw_text(s, f"Wild: {wild.name} (Lv.{wild.level})", (left.x + 8, left.y + 8), font)
+                draw_text(s, f"HP: {wild.current_hp}/{wild.max_hp}", (left.x + 8, left.y + 34), font)
+                draw_text(s, f"Type: {wild.type}", (left.x + 8, left.y + 58), font)
+
+                pygame.draw.rect(s, (28, 48, 28), right)
+                draw_text(s, f"Your: {pc.name} (Lv.{pc.level})", (right.x + 8, right.y + 8), font)
+                draw_text(s, f"HP: {pc.current_hp}/{pc.max_hp}", (right.x + 8, right.y + 34), font)
+                draw_text(s, f"Type: {pc.type}", (right.x + 8, right.y + 58), font)
+
+                pygame.draw.rect(s, (8, 18, 8), log_rect)
+                pygame.draw.rect(s, (0, 0, 0), log_rect, 2)
+                for i, msg in enumerate(reversed(logs)):
+                    draw_text(s, msg, (log_rect.x + 8, log_rect.y + 8 + i * 18), font)
+
+                for button in buttons:
+                    pygame.draw.rect(s, button.color, button.rect)
+                    draw_text(s, button.label, (button.rect.x + 8, button.rect.y + 8), font)
+                    if button.hovered or button.focused:
+                        pygame.draw.rect(s, ACCENT, button.rect, 2)
+
+                if result != BattleResult.ONGOING:
+                    draw_text(s, f"Result: {result}", (overlay.x + 12, overlay.y + 360), font, ACCENT)
+                    end_button.draw(s, font)
+
+        battle_signature = (
+            wild.name, wild.level, wild.current_hp, wild.max_hp,
+            pc.name, pc.level, pc.current_hp, pc.max_hp,
+            tuple(logs), battle.result,
+            tuple((b.label,) + b.highlight_state() for b in buttons), end_button.highlight_state(),
+        )
+        self.renderer.add_layer("battle", overlay, battle_signature, draw_battle)
+
+    def draw_encyclopedia(self):
+        font = self.font
+        rect = ENCYCLOPEDIA_RECT
+        query = self.search_query
+        # the index answers in well under a millisecond, so every keystroke
+        # reruns the query; frames without a new keystroke reuse its result
+        if self.search_found[0] != query:
+            self.search_found = (query, encyclopedia().search(query))
+        found = self.search_found[1]
+
+        def draw_search(s):
+            pygame.draw.rect(s, (18, 28, 18), rect)
+            pygame.draw.rect(s, (0, 0, 0), rect, 3)
+            draw_text(s, f"Search: {query}_", (rect.x + 12, rect.y + 10), font, ACCENT)
+            draw_text(s, f"{len(found)} creatures", (rect.right - 140, rect.y + 10), font)
+            for i, entry in enumerate(found[:ENCYCLOPEDIA_RESULTS]):
+                environments = ", ".join(e.replace("_", " ") for e in entry.environments)
+                draw_text(s, f"{entry.name} - {entry.rarity} {entry.type}, {environments}",
+                          (rect.x + 12, rect.y + 40 + i * 20), font)
+            if found:
+                draw_text(s, found[0].text()[:110], (rect.x + 12, rect.bottom - 28), font)
+
+        self.renderer.add_layer("encyclopedia", rect, (query,), draw_search)
+
+    def draw(self):
+        """Register this frame's layers and push the changed regions to the display"""
+        font = self.font
+        renderer = self.renderer
+        renderer.begin_frame()
+        renderer.add_layer("background", self.screen_rect, (), lambda s: s.fill(BG))
+
+        if self.scene == SCENE_TITLE:
+            self.draw_title()
+        elif self.scene == SCENE_STARTER:
+            self.draw_starter()
+        elif self.scene == SCENE_MAP:
+            self.draw_map()
 
         # Battle overlay (draw on top of everything)
-        if in_battle and battle is not None:
-            # overlay panel
-            overlay = Rect(WIDTH // 2 - 340, HEIGHT // 2 - 200, 680, 400)
-            pygame.draw.rect(screen, (18, 28, 18), overlay)
-            pygame.draw.rect(screen, (0, 0, 0), overlay, 3)
-
-            # left: wild creature
-            left = Rect(overlay.x + 12, overlay.y + 12, 320, 200)
-            pygame.draw.rect(screen, (28, 48, 28), left)
-            draw_text(screen, f"Wild: {battle.wild_creature.name} (Lv.{battle.wild_creature.level})", (left.x + 8, left.y + 8), font)
-            draw_text(screen, f"HP: {battle.wild_creature.current_hp}/{battle.wild_creature.max_hp}", (left.x + 8, left.y + 34), font)
-            draw_text(screen, f"Type: {battle.wild_creature.type}", (left.x + 8, left.y + 58), font)
-
-            # right: player creature and actions
-            right = Rect(overlay.x + 344, overlay.y + 12, 320, 200)
-            pygame.draw.rect(screen, (28, 48, 28), right)
-            pc = battle.player_creature
-            draw_text(screen, f"Your: {pc.name} (Lv.{pc.level})", (right.x + 8, right.y + 8), font)
-            draw_text(screen, f"HP: {pc.current_hp}/{pc.max_hp}", (right.x + 8, right.y + 34), font)
-            draw_text(screen, f"Type: {pc.type}", (right.x + 8, right.y + 58), font)
-
-            # action buttons
-            btn_w = 88
-            btn_h = 36
-            actions = ["Fight", "Trap", "Item", "Run"]
-            btns = []
-            for i, a in enumerate(actions):
-                bx = right.x + 8 + (i % 2) * (btn_w + 8)
-                by = right.y + 100 + (i // 2) * (btn_h + 8)
-                brect = Rect(bx, by, btn_w, btn_h)
-                pygame.draw.rect(screen, BUTTON_COLOR, brect)
-                draw_text(screen, a, (bx + 12, by + 8), font)
-                btns.append((a, brect))
-
-            # battle log area
-            log_rect = Rect(overlay.x + 12, overlay.y + 224, overlay.width - 24, 148)
-            pygame.draw.rect(screen, (8, 18, 8), log_rect)
-            pygame.draw.rect(screen, (0, 0, 0), log_rect, 2)
-            state = battle.get_battle_state()
-            logs = state.get('log', [])
-            for i, msg in enumerate(reversed(logs)):
-                draw_text(screen, msg, (log_rect.x + 8, log_rect.y + 8 + i * 18), font)
-
-            # handle button clicks
-            if mouse_pressed[0]:
-                for name, rect in btns:
-                    if rect.collidepoint(mouse_pos):
-                        if name == 'Fight':
-                            battle_mode = 'moves'
-                        elif name == 'Trap':
-                            battle_mode = 'trap'
-                        elif name == 'Item':
-                            battle_mode = 'item'
-                        elif name == 'Run':
-                            if battle.attempt_run():
-                                battle_message = 'Ran away.'
-                        pygame.time.delay(120)
-
-            # moves / trap / item sub-menus
-            sub = Rect(overlay.x + 12, overlay.y + 12, overlay.width - 24, 200)
-            if battle_mode == 'moves':
-                # list moves as buttons
-                for i, mv in enumerate(pc.moves):
-                    mrect = Rect(sub.x + 12 + (i % 2) * 160, sub.y + 8 + (i // 2) * 48, 152, 40)
-                    pygame.draw.rect(screen, (60, 100, 60), mrect)
-                    draw_text(screen, f"{mv.name} ({mv.type})", (mrect.x + 6, mrect.y + 8), font)
-                    if mouse_pressed[0] and mrect.collidepoint(mouse_pos):
-                        battle.player_attack(i)
-                        battle_message = 'Player used move.'
-                        battle_mode = 'action'
-                        pygame.time.delay(120)
-
-            elif battle_mode == 'trap':
-                # show trap items from player inventory
-                inv_traps = [n for n in game.player.inventory.keys() if 'Trap' in n]
-                for i, tname in enumerate(inv_traps):
-                    trect = Rect(sub.x + 12 + (i % 3) * 220, sub.y + 8 + (i // 3) * 44, 200, 36)
-                    pygame.draw.rect(screen, (80, 120, 80), trect)
-                    draw_text(screen, f"{tname} x{game.player.get_item_count(tname)}", (trect.x + 6, trect.y + 8), font)
-                    if mouse_pressed[0] and trect.collidepoint(mouse_pos):
-                        caught = battle.attempt_catch(tname)
-                        battle_message = 'Tried catching.'
-                        battle_mode = 'action'
-                        pygame.time.delay(120)
-
-            elif battle_mode == 'item':
-                heal_items = [n for n in game.player.inventory.keys() if n in HEAL_ITEMS]
-                for i, iname in enumerate(heal_items):
-                    irect = Rect(sub.x + 12 + (i % 3) * 220, sub.y + 8 + (i // 3) * 44, 200, 36)
-                    pygame.draw.rect(screen, (80, 80, 120), irect)
-                    draw_text(screen, f"{iname} x{game.player.get_item_count(iname)}", (irect.x + 6, irect.y + 8), font)
-                    if mouse_pressed[0] and irect.collidepoint(mouse_pos):
-                        used = battle.use_heal_item(iname)
-                        battle_message = 'Used item.'
-                        battle_mode = 'action'
-                        pygame.time.delay(120)
-
-            # if battle ended, show result and a button to close overlay
-            if battle.result != BattleResult.ONGOING:
-                res_text = f"Result: {battle.result}"
-                draw_text(screen, res_text, (overlay.x + 12, overlay.y + 360), font, ACCENT)
-                end_rect = Rect(overlay.right - 120, overlay.y + 352, 96, 36)
-                pygame.draw.rect(screen, (160, 80, 80), end_rect)
-                draw_text(screen, "Continue", (end_rect.x + 10, end_rect.y + 8), font)
-                if mouse_pressed[0] and end_rect.collidepoint(mouse_pos):
-                    # finalize battle: if caught or won, messages already applied in Battle
-                    in_battle = False
-                    battle = None
-                    battle_mode = 'action'
-                    message = ""  # clear map message
-                    pygame.time.delay(150)
+        if self.in_battle and self.battle is not None:
+            self.draw_battle()
+
+        # encyclopedia search (F2)
+        if self.search_open:
+            self.draw_encyclopedia()
 
         # draw footer message
-        if message:
-            pygame.draw.rect(screen, (0, 0, 0, 120), (0, HEIGHT - 36, WIDTH, 36))
-            draw_text(screen, message, (12, HEIGHT - 28), font, ACCENT)
+        if self.message:
+            def draw_footer(s, message=self.message):
+                pygame.draw.rect(s, (0, 0, 0, 120), (0, HEIGHT - 36, WIDTH, 36))
+                draw_text(s, message, (12, HEIGHT - 28), font, ACCENT)
+
+            renderer.add_layer("footer", Rect(0, HEIGHT - 36, WIDTH, 36), (self.message,), draw_footer)
+
+        # frame profiler overlay (F3)
+        if PROFILER.overlay_visible:
+            def draw_profiler(s):
+                with PROFILER.stage("overlay"):
+                    PROFILER.draw_overlay(s, PROFILER_RECT, font)
+
+            renderer.add_layer("profiler", PROFILER_RECT, (PROFILER.frame_count,), draw_profiler)
+
+        with PROFILER.stage("compose"):
+            dirty = renderer.end_frame(present=False)
+        with PROFILER.stage("flip"):
+            renderer.present(dirty)
+        return dirty
+
+    def frame(self, dt, events, keys):
+        """Run one frame: handle events, advance the simulation and draw"""
+        start = time.perf_counter()
+        self.frame_dt = dt
+        for event in events:
+            self.handle_event(event)
+        self.update(dt, keys)
+        dirty = self.draw()
+        # the weather particle budget follows the time spent on this frame's work
+        self.weather_fx.adapt((time.perf_counter() - start) * 1000.0)
+        return dirty
+
+
+def run():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Trapper-Mastering - GUI Integration")
+    clock = pygame.time.Clock()
+    app = GuiApp(screen)
+
+    while app.running:
+        dt = clock.tick(FPS) / 1000.0
 
-        pygame.display.flip()
+        PROFILER.begin_frame()
+        with PROFILER.stage("events"):
+            events = pygame.event.get()
+        app.frame(dt, events, pygame.key.get_pressed())
+        PROFILER.end_frame()
 
     pygame.quit()
 
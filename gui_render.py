@@ -0,0 +1,142 @@
+"""
+Retained-mode rendering helpers for the Trapper-Mastering GUI.
+
+Every frame the app registers its layers (a screen rect, a signature that
+describes what the layer currently shows, and a draw callback) in back-to-front
+order. Only layers that appeared, disappeared, moved or changed signature make
+the screen dirty. Each dirty rect is then recomposed by redrawing just the
+layers that overlap it, with the surface clip set to that rect, and the result
+is pushed with `pygame.display.update(rects)` instead of a full `flip()`.
+"""
+
+import pygame
+from pygame import Rect
+
+
+class Layer:
+    """A drawable region of the screen registered for one frame"""
+
+    def __init__(self, key, rect, signature, draw_fn):
+        self.key = key
+        self.rect = Rect(rect)
+        self.signature = signature
+        self.draw_fn = draw_fn
+
+
+def merge_rects(rects):
+    """Union overlapping rects so no screen pixel is composited twice"""
+    merged = []
+    for rect in rects:
+        rect = Rect(rect)
+        changed = True
+        while changed:
+            changed = False
+            for i, other in enumerate(merged):
+                if rect.colliderect(other):
+                    rect = rect.union(merged.pop(i))
+                    changed = True
+                    break
+        merged.append(rect)
+    return merged
+
+
+class DirtyRenderer:
+    """
+    Composites only the dirty regions of the screen each frame
+    """
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.screen_rect = surface.get_rect()
+        self._layers = []
+        self._extra = []
+        self._previous = {}  # layer key -> (rect, signature) from last frame
+        self._full = True
+        # Stats: pixels pushed to the display
+        self.pixels_pushed = 0
+        self.total_pixels_pushed = 0
+        self.frames = 0
+
+    def begin_frame(self):
+        """Start collecting layers for a new frame"""
+        self._layers = []
+        self._extra = []
+
+    def add_layer(self, key, rect, signature, draw_fn):
+        """Register a layer; later layers are drawn on top of earlier ones"""
+        self._layers.append(Layer(key, rect, signature, draw_fn))
+
+    def mark_dirty(self, rect):
+        """Force a region to be recomposed this frame"""
+        self._extra.append(Rect(rect))
+
+    def invalidate(self):
+        """Force a full-screen redraw on the next frame (e.g. scene change)"""
+        self._full = True
+
+    def dirty_rects(self):
+        """Compute the merged dirty rects for the layers registered so far"""
+        if self._full:
+            return [Rect(self.screen_rect)]
+
+        dirty = list(self._extra)
+        current = {}
+        for layer in self._layers:
+            current[layer.key] = layer
+            previous = self._previous.get(layer.key)
+            if previous is None:
+                dirty.append(layer.rect)
+                continue
+            prev_rect, prev_signature = previous
+            if prev_rect != layer.rect:
+                dirty.append(prev_rect)
+                dirty.append(layer.rect)
+            elif prev_signature != layer.signature:
+                dirty.append(layer.rect)
+
+        # Layers that went away leave a hole that must be recomposed
+        for key, (prev_rect, _) in self._previous.items():
+            if key not in current:
+                dirty.append(prev_rect)
+
+        clipped = [r.clip(self.screen_rect) for r in dirty]
+        return merge_rects([r for r in clipped if r.width > 0 and r.height > 0])
+
+    def end_frame(self, present=True):
+        """
+        Redraw the dirty regions, push them to the display and return them
+
+        With present=False the caller pushes the returned rects with `present`.
+        """
+        dirty = self.dirty_rects()
+
+        for region in dirty:
+            for layer in self._layers:
+                clip = region.clip(layer.rect)
+                if clip.width <= 0 or clip.height <= 0:
+                    continue
+                self.surface.set_clip(clip)
+                layer.draw_fn(self.surface)
+        self.surface.set_clip(None)
+
+        if present:
+            self.present(dirty)
+
+        self._previous = {layer.key: (layer.rect, layer.signature) for layer in self._layers}
+        self._full = False
+
+        self.pixels_pushed = sum(r.width * r.height for r in dirty)
+        self.total_pixels_pushed += self.pixels_pushed
+        self.frames += 1
+        return dirty
+
+    def present(self, dirty):
+        """Push redrawn regions to the display"""
+        if dirty:
+            pygame.display.update(dirty)
+
+    def average_pixels_pushed(self):
+        """Average number of pixels pushed per frame so far"""
+        if self.frames == 0:
+            return 0.0
+        return self.total_pixels_pushed / self.frames
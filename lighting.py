@@ -0,0 +1,196 @@
+"""
+Day-night lighting and weather effects for the Trapper-Mastering map view.
+
+Lighting is one flat tint over the map, blitted with surface alpha. The
+tint is looked up per time-of-day step (a quarter of a game hour by default)
+and weather type. Each distinct tint is filled into a surface once and kept
+in a small LRU cache, so a frame costs a single blit and never a per-pixel
+blend computed in Python or a fresh full-screen alpha surface.
+
+Weather particles (rain, snow, sand, ash) live in a fixed pool of NumPy
+arrays, are moved with one vectorized update per frame and drawn with one
+batched `Surface.blits` call of a small prerendered sprite. The number of
+live particles follows a budget that shrinks while frames run over the
+target time and recovers when there is headroom.
+"""
+
+from collections import OrderedDict
+from itertools import repeat
+
+import numpy as np
+import pygame
+
+STEPS_PER_HOUR = 4  # lighting changes every 15 game minutes
+MAX_CACHED_TINTS = 8
+
+# (hour, tint color, alpha) keyframes of the day, interpolated between
+DAYLIGHT_KEYS = [
+    (0.0, (20, 30, 80), 150),
+    (5.0, (20, 30, 80), 140),
+    (6.0, (255, 150, 80), 60),
+    (7.5, (255, 255, 255), 0),
+    (16.5, (255, 255, 255), 0),
+    (18.0, (255, 120, 60), 70),
+    (19.5, (30, 30, 90), 130),
+    (24.0, (20, 30, 80), 150),
+]
+
+# Haze laid over the daylight tint per weather type: (color, alpha)
+WEATHER_HAZE = {
+    "cloudy": ((120, 120, 130), 25),
+    "rainy": ((60, 70, 90), 45),
+    "stormy": ((30, 30, 50), 85),
+    "foggy": ((200, 200, 210), 95),
+    "snowy": ((230, 230, 245), 30),
+    "blizzard": ((235, 235, 245), 80),
+    "sandstorm": ((200, 160, 90), 70),
+    "ash_fall": ((90, 80, 80), 60),
+}
+
+# Particles per weather type: (count at full budget, velocity px/s, velocity jitter, sprite size, color)
+PARTICLE_KINDS = {
+    "rainy": (400, (-60, 700), 60, (1, 10), (170, 190, 230)),
+    "stormy": (900, (-220, 900), 90, (2, 14), (150, 170, 210)),
+    "snowy": (300, (20, 60), 25, (3, 3), (245, 245, 255)),
+    "blizzard": (900, (-260, 160), 80, (3, 3), (245, 245, 255)),
+    "sandstorm": (700, (-420, 30), 60, (2, 2), (215, 180, 120)),
+    "ash_fall": (250, (10, 40), 15, (3, 3), (110, 100, 100)),
+}
+MAX_PARTICLES = 1000
+MIN_PARTICLES = 50
+TARGET_FRAME_MS = 1000.0 / 60
+
+
+def daylight(hour):
+    """Interpolated (color, alpha) of the daylight tint at an hour of the day"""
+    hour %= 24.0
+    for (h0, c0, a0), (h1, c1, a1) in zip(DAYLIGHT_KEYS, DAYLIGHT_KEYS[1:]):
+        if h0 <= hour <= h1:
+            t = (hour - h0) / (h1 - h0)
+            color = tuple(int(round(x0 + (x1 - x0) * t)) for x0, x1 in zip(c0, c1))
+            return color, int(round(a0 + (a1 - a0) * t))
+    return DAYLIGHT_KEYS[0][1], DAYLIGHT_KEYS[0][2]
+
+
+def combine(lower, upper):
+    """Composite two (color, alpha) tints, upper over lower, into one"""
+    (c0, a0), (c1, a1) = lower, upper
+    f0, f1 = a0 / 255.0, a1 / 255.0
+    alpha = f1 + f0 * (1.0 - f1)
+    if alpha <= 0:
+        return (0, 0, 0), 0
+    color = tuple(int(round((x1 * f1 + x0 * f0 * (1.0 - f1)) / alpha)) for x0, x1 in zip(c0, c1))
+    return color, int(round(alpha * 255))
+
+
+class LightingCache:
+    """
+    Tint surfaces keyed by time-of-day step and weather
+    """
+
+    def __init__(self, size, steps_per_hour=STEPS_PER_HOUR, max_cached=MAX_CACHED_TINTS):
+        self.size = size
+        self.steps_per_hour = steps_per_hour
+        self.max_cached = max_cached
+        self._surfaces = OrderedDict()
+        self.builds = 0
+
+    def key(self, hours, weather):
+        """Cache key for a game time: the time-of-day step and the weather"""
+        return int(hours * self.steps_per_hour) % (24 * self.steps_per_hour), weather
+
+    def tint(self, key):
+        """The tint surface for a key, or None when it would be invisible"""
+        if key in self._surfaces:
+            self._surfaces.move_to_end(key)
+            return self._surfaces[key]
+        step, weather = key
+        color, alpha = daylight(step / self.steps_per_hour)
+        if weather in WEATHER_HAZE:
+            color, alpha = combine((color, alpha), WEATHER_HAZE[weather])
+        surface = None
+        if alpha > 0:
+            surface = pygame.Surface(self.size)
+            surface.fill(color)
+            surface.set_alpha(alpha)
+        self.builds += 1
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_cached:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def draw(self, surface, pos, key):
+        tint = self.tint(key)
+        if tint is not None:
+            surface.blit(tint, pos)
+
+
+class WeatherParticles:
+    """
+    A pooled particle buffer for the current weather, in view coordinates
+    """
+
+    def __init__(self, size, capacity=MAX_PARTICLES, rng=None, target_ms=TARGET_FRAME_MS):
+        self.size = np.array(size, dtype=np.float32)
+        self.capacity = capacity
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.budget = capacity
+        self.target_ms = target_ms
+        self.frame_ms = 0.0  # smoothed frame time fed to adapt()
+        self.kind = None
+        self.wanted = 0
+        self.sprite = None
+        self.steps = 0  # updates that moved particles, so the view knows when to redraw them
+        self._camera = None
+
+    @property
+    def active(self):
+        """Number of particles drawn this frame"""
+        return min(self.wanted, self.budget)
+
+    def set_weather(self, weather):
+        """Switch the pool to a weather type's particles; no-op if unchanged"""
+        if weather == self.kind:
+            return
+        self.kind = weather
+        spec = PARTICLE_KINDS.get(weather)
+        if spec is None:
+            self.wanted = 0
+            self.sprite = None
+            return
+        count, velocity, jitter, sprite_size, color = spec
+        self.wanted = min(count, self.capacity)
+        self.pos[:] = self.rng.random((self.capacity, 2)) * self.size
+        self.vel[:] = np.asarray(velocity, dtype=np.float32) + self.rng.normal(0, jitter, (self.capacity, 2))
+        self.sprite = pygame.Surface(sprite_size)
+        self.sprite.fill(color)
+
+    def update(self, dt, cam_x=0, cam_y=0):
+        """Move the live particles, keeping them fixed to the world as the camera scrolls"""
+        shift = (0.0, 0.0) if self._camera is None else (cam_x - self._camera[0], cam_y - self._camera[1])
+        self._camera = (cam_x, cam_y)
+        n = self.active
+        if n == 0 or (dt == 0 and shift == (0.0, 0.0)):
+            return
+        self.steps += 1
+        pos = self.pos[:n]
+        pos += self.vel[:n] * dt
+        pos -= np.asarray(shift, dtype=np.float32)
+        np.mod(pos, self.size, out=pos)
+
+    def adapt(self, frame_ms):
+        """Shrink the budget while frames run over target, grow it back when they are well under"""
+        self.frame_ms = 0.9 * self.frame_ms + 0.1 * frame_ms
+        if self.frame_ms > self.target_ms:
+            self.budget = max(MIN_PARTICLES, int(self.budget * 0.9))
+        elif self.frame_ms < 0.6 * self.target_ms and self.budget < self.capacity:
+            self.budget = min(self.capacity, self.budget + max(1, self.capacity // 100))
+
+    def draw(self, surface, origin):
+        n = self.active
+        if n == 0 or self.sprite is None:
+            return
+        points = (self.pos[:n] + np.asarray(origin, dtype=np.float32)).astype(np.int32).tolist()
+        surface.blits(zip(repeat(self.sprite), points), doreturn=False)
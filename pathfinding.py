@@ -0,0 +1,351 @@
+"""
+Hierarchical A* pathfinding over the Trapper-Mastering tile world.
+
+The world's chunks double as pathfinding clusters. Where two neighbouring
+chunks share a run of walkable border tiles there is an entrance, with one
+or two transition points. Transition points are the nodes of an abstract
+graph. Each node links to its twin across the border and, through a
+Dijkstra search confined to its chunk, to every node of the same chunk.
+A chunk's part of the graph is built the first time a search reaches it and
+is then kept. A query is answered in two stages:
+1. A* over the abstract graph, with the start and goal linked to the nodes
+   of their own chunks.
+2. Each abstract hop is refined into tiles from the stored Dijkstra parents.
+
+Finished paths are kept in an LRU cache, indexed by the chunks they cross.
+When terrain in a chunk changes, `invalidate_chunk` drops that chunk's
+graph, the entrances on its borders and every cached path through it.
+
+Movement is 8-directional without cutting corners: straight steps cost 1,
+diagonal steps cost sqrt(2). This module has no pygame dependency.
+"""
+
+import heapq
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from terrain import BIOME_IDS, BIOME_NAMES, BIOME_TERRAIN, TERRAIN_WATER
+
+SQRT2 = math.sqrt(2.0)
+# Biomes nobody can walk through: open water and sheer rock
+BLOCKED_BIOMES = [name for name, terrain in zip(BIOME_NAMES, BIOME_TERRAIN) if terrain == TERRAIN_WATER]
+BLOCKED_BIOMES += ["cliffs", "storm_peaks"]
+WIDE_ENTRANCE = 6  # entrances at least this long get a transition point at each end
+DEFAULT_CACHE_SIZE = 1024  # paths kept in the result cache
+
+STEPS = [(1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+         (1, 1, SQRT2), (1, -1, SQRT2), (-1, 1, SQRT2), (-1, -1, SQRT2)]
+
+
+def octile(ax, ay, bx, by):
+    """Distance between two tiles when moving in 8 directions"""
+    dx = abs(ax - bx)
+    dy = abs(ay - by)
+    return max(dx, dy) + (SQRT2 - 1.0) * min(dx, dy)
+
+
+def blocked_table(blocked=BLOCKED_BIOMES):
+    """Lookup array: True for biome ids that block movement"""
+    table = np.zeros(len(BIOME_NAMES), dtype=bool)
+    table[[BIOME_IDS[name] for name in blocked]] = True
+    return table
+
+
+def local_dijkstra(walkable, sx, sy):
+    """
+    Costs and parents of every tile reachable from (sx, sy) inside one chunk.
+
+    `walkable` is a (height, width) bool array. Returns two flat lists indexed
+    by y * width + x: the cost (inf if unreachable) and the previous tile
+    index on the cheapest path (-1 at the source and for unreachable tiles).
+    """
+    height, width = walkable.shape
+    open_tiles = walkable.ravel().tolist()
+    cost = [math.inf] * (width * height)
+    parent = [-1] * (width * height)
+    start = sy * width + sx
+    cost[start] = 0.0
+    heap = [(0.0, start)]
+    while heap:
+        c, i = heapq.heappop(heap)
+        if c > cost[i]:
+            continue
+        y, x = divmod(i, width)
+        for dx, dy, step in STEPS:
+            nx = x + dx
+            ny = y + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            j = ny * width + nx
+            if not open_tiles[j]:
+                continue
+            # no squeezing diagonally between two blocked tiles
+            if dx and dy and not (open_tiles[y * width + nx] and open_tiles[ny * width + x]):
+                continue
+            nc = c + step
+            if nc < cost[j]:
+                cost[j] = nc
+                parent[j] = i
+                heapq.heappush(heap, (nc, j))
+    return cost, parent
+
+
+class ChunkGraph:
+    """
+    One chunk's abstract nodes, their twins across borders and the searches between them
+    """
+
+    def __init__(self, origin, walkable):
+        self.origin = origin  # tile coordinate of the chunk's top-left tile
+        self.walkable = walkable
+        self.links = {}  # node (tx, ty) -> [(twin node in the neighbouring chunk, cost)]
+        self.searches = {}  # node -> (cost, parent) from local_dijkstra
+        self.edges = {}  # node -> [(other node in this chunk, cost)]
+
+    def local(self, tx, ty):
+        return tx - self.origin[0], ty - self.origin[1]
+
+    def search_from(self, tx, ty):
+        """Dijkstra from a tile of this chunk"""
+        return local_dijkstra(self.walkable, *self.local(tx, ty))
+
+    def connect(self):
+        """Link every pair of this chunk's nodes that can reach each other inside it"""
+        width = self.walkable.shape[1]
+        nodes = list(self.links)
+        for node in nodes:
+            self.searches[node] = self.search_from(*node)
+        for node in nodes:
+            cost = self.searches[node][0]
+            self.edges[node] = []
+            for other in nodes:
+                if other == node:
+                    continue
+                lx, ly = self.local(*other)
+                c = cost[ly * width + lx]
+                if c < math.inf:
+                    self.edges[node].append((other, c))
+
+    def trace(self, search, tx, ty):
+        """Tiles from a search's source to (tx, ty), excluding the source"""
+        _, parent = search
+        width = self.walkable.shape[1]
+        ox, oy = self.origin
+        lx, ly = self.local(tx, ty)
+        i = ly * width + lx
+        tiles = []
+        while parent[i] != -1:
+            y, x = divmod(i, width)
+            tiles.append((ox + x, oy + y))
+            i = parent[i]
+        tiles.reverse()
+        return tiles
+
+
+class Pathfinder:
+    """
+    Hierarchical A* over a World, with cached chunk graphs and paths
+    """
+
+    def __init__(self, world, blocked=BLOCKED_BIOMES, cache_size=DEFAULT_CACHE_SIZE):
+        self.world = world
+        self.size = world.chunk_tiles
+        self.blocked = blocked_table(blocked)
+        self.cache_size = cache_size
+        self._graphs = {}  # (cx, cy) -> ChunkGraph
+        self._entrances = {}  # (cx, cy, side) -> [(tile in this chunk, tile in the next chunk)]
+        self._paths = OrderedDict()  # (start, goal) -> path, least recently used first
+        self._paths_by_chunk = {}  # (cx, cy) -> set of cached path keys crossing the chunk
+        self._unreachable = set()  # cached keys with no path; any terrain change may open one
+        self.hits = 0
+        self.misses = 0
+
+    def chunk_of(self, tx, ty):
+        return tx // self.size, ty // self.size
+
+    def walkable(self, cx, cy):
+        """(height, width) bool array of walkable tiles in a chunk"""
+        return ~self.blocked[self.world.chunk(cx, cy)]
+
+    def is_walkable(self, tx, ty):
+        if not self.world.in_bounds(tx, ty):
+            return False
+        return not self.blocked[self.world.tile_at(tx, ty)]
+
+    def entrances(self, cx, cy, side):
+        """
+        Transition tile pairs between chunk (cx, cy) and its east ("E") or
+        south ("S") neighbour
+        """
+        key = (cx, cy, side)
+        if key in self._entrances:
+            return self._entrances[key]
+        pairs = []
+        nx, ny = (cx + 1, cy) if side == "E" else (cx, cy + 1)
+        if self.world.has_chunk(nx, ny):
+            here = self.walkable(cx, cy)
+            there = self.walkable(nx, ny)
+            if side == "E":
+                open_border = here[:, -1] & there[:, 0]
+                x0 = cx * self.size + here.shape[1] - 1
+                y0 = cy * self.size
+                tile = lambda i: ((x0, y0 + i), (x0 + 1, y0 + i))
+            else:
+                open_border = here[-1, :] & there[0, :]
+                x0 = cx * self.size
+                y0 = cy * self.size + here.shape[0] - 1
+                tile = lambda i: ((x0 + i, y0), (x0 + i, y0 + 1))
+            run_start = None
+            for i, is_open in enumerate(open_border.tolist() + [False]):
+                if is_open and run_start is None:
+                    run_start = i
+                elif not is_open and run_start is not None:
+                    if i - run_start >= WIDE_ENTRANCE:
+                        pairs += [tile(run_start), tile(i - 1)]
+                    else:
+                        pairs.append(tile((run_start + i - 1) // 2))
+                    run_start = None
+        self._entrances[key] = pairs
+        return pairs
+
+    def graph(self, cx, cy):
+        """The abstract graph part of a chunk, built on first use"""
+        key = (cx, cy)
+        graph = self._graphs.get(key)
+        if graph is not None:
+            return graph
+        graph = ChunkGraph((cx * self.size, cy * self.size), self.walkable(cx, cy))
+        for inside, outside in self.entrances(cx, cy, "E") + self.entrances(cx, cy, "S"):
+            graph.links.setdefault(inside, []).append((outside, 1.0))
+        for outside, inside in self.entrances(cx - 1, cy, "E") + self.entrances(cx, cy - 1, "S"):
+            graph.links.setdefault(inside, []).append((outside, 1.0))
+        graph.connect()
+        self._graphs[key] = graph
+        return graph
+
+    def invalidate_chunk(self, cx, cy):
+        """Forget everything derived from a chunk's tiles, after its terrain changed"""
+        for key in ((cx, cy), (cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+            self._graphs.pop(key, None)
+        for key in ((cx, cy, "E"), (cx, cy, "S"), (cx - 1, cy, "E"), (cx, cy - 1, "S")):
+            self._entrances.pop(key, None)
+        for path_key in self._paths_by_chunk.pop((cx, cy), set()) | self._unreachable:
+            self._paths.pop(path_key, None)
+        self._unreachable.clear()
+
+    def invalidate_tile(self, tx, ty):
+        self.invalidate_chunk(*self.chunk_of(tx, ty))
+
+    def find_path(self, start, goal):
+        """
+        Tiles from start to goal, both included, or None if there is no way.
+        Both are (tx, ty) tile coordinates.
+        """
+        start = tuple(start)
+        goal = tuple(goal)
+        key = (start, goal)
+        if key in self._paths:
+            self._paths.move_to_end(key)
+            self.hits += 1
+            return self._paths[key]
+        self.misses += 1
+        path = self._search(start, goal)
+        self._remember(key, path)
+        return path
+
+    def _remember(self, key, path):
+        self._paths[key] = path
+        if path is None:
+            self._unreachable.add(key)
+        else:
+            for chunk in {self.chunk_of(*tile) for tile in path}:
+                self._paths_by_chunk.setdefault(chunk, set()).add(key)
+        while len(self._paths) > self.cache_size:
+            old_key, old_path = self._paths.popitem(last=False)
+            self._unreachable.discard(old_key)
+            for chunk in {self.chunk_of(*tile) for tile in old_path or ()}:
+                self._paths_by_chunk.get(chunk, set()).discard(old_key)
+
+    def _search(self, start, goal):
+        if not (self.is_walkable(*start) and self.is_walkable(*goal)):
+            return None
+        if start == goal:
+            return [start]
+        start_graph = self.graph(*self.chunk_of(*start))
+        goal_graph = self.graph(*self.chunk_of(*goal))
+        start_search = start_graph.search_from(*start)
+        goal_search = goal_graph.search_from(*goal)
+
+        # in the same chunk, the local search may already reach the goal
+        direct = math.inf
+        if start_graph is goal_graph:
+            lx, ly = start_graph.local(*goal)
+            direct = start_search[0][ly * start_graph.walkable.shape[1] + lx]
+
+        def links_from_search(graph, search):
+            width = graph.walkable.shape[1]
+            out = []
+            for node in graph.links:
+                lx, ly = graph.local(*node)
+                c = search[0][ly * width + lx]
+                if c < math.inf:
+                    out.append((node, c))
+            return out
+
+        to_goal = dict(links_from_search(goal_graph, goal_search))
+        to_goal.pop(goal, None)  # the goal itself is reached through its neighbours
+
+        # A* over the abstract graph, with the goal's parent kept apart
+        best = {start: 0.0}
+        came_from = {start: None}
+        heap = [(octile(*start, *goal), 0.0, start)]
+        goal_cost = direct
+        goal_parent = start if direct < math.inf else None
+        while heap:
+            f, g, node = heapq.heappop(heap)
+            if f >= goal_cost:
+                break
+            if g > best[node]:
+                continue
+            if node == start:
+                neighbours = links_from_search(start_graph, start_search) + start_graph.links.get(start, [])
+            else:
+                graph = self.graph(*self.chunk_of(*node))
+                neighbours = graph.edges[node] + graph.links[node]
+                if node in to_goal and g + to_goal[node] < goal_cost:
+                    goal_cost = g + to_goal[node]
+                    goal_parent = node
+            for other, cost in neighbours:
+                ng = g + cost
+                if other == goal:
+                    if ng < goal_cost:
+                        goal_cost = ng
+                        goal_parent = node
+                elif ng < best.get(other, math.inf):
+                    best[other] = ng
+                    came_from[other] = node
+                    heapq.heappush(heap, (ng + octile(*other, *goal), ng, other))
+        if goal_parent is None:
+            return None
+
+        # refine the abstract route into tiles
+        route = [goal, goal_parent]
+        while route[-1] != start:
+            route.append(came_from[route[-1]])
+        route.reverse()
+        path = [start]
+        for a, b in zip(route, route[1:]):
+            if self.chunk_of(*a) != self.chunk_of(*b):
+                path.append(b)  # a step across a chunk border
+            elif b == goal and a != start:
+                # the goal's search runs from the goal, so walk it backwards from a
+                back = goal_graph.trace(goal_search, *a)
+                path += list(reversed(back[:-1])) + [goal]
+            elif a == start:
+                path += start_graph.trace(start_search, *b)
+            else:
+                graph = self.graph(*self.chunk_of(*a))
+                path += graph.trace(graph.searches[a], *b)
+        return path
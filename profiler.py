@@ -0,0 +1,196 @@
+"""
+Per-stage frame profiler for the Trapper-Mastering GUI.
+
+Code marks named stages of a frame with `with PROFILER.stage("world"):`.
+Stages may nest. Each stage is charged its self time (its duration minus the
+stages nested in it), so the per-frame breakdown adds up to the frame time.
+The last few hundred frames feed a rolling stacked-bar overlay, and the raw
+stage spans can be exported as a Chrome trace (open it in chrome://tracing or
+https://ui.perfetto.dev) to find frame spikes on slow machines.
+
+The GUI's profiler only records while its overlay is shown. Otherwise
+`stage` hands back one shared do-nothing context, so the many text and layer
+stages cost a method call and no allocation or clock read.
+"""
+
+import json
+import os
+from collections import deque
+from contextlib import nullcontext
+from time import perf_counter
+
+from text_cache import TEXT_CACHE
+
+DEFAULT_HISTORY = 240  # frames kept for the overlay
+DEFAULT_TRACE_EVENTS = 200000  # stage spans kept for trace export
+OVERLAY_BUDGET_MS = 1000.0 / 30  # full height of the overlay graph
+TARGET_FRAME_MS = 1000.0 / 60
+
+# Fixed colors so a stage keeps its color across runs
+STAGE_COLORS = {
+    "events": (90, 160, 230),
+    "simulation": (120, 220, 120),
+    "world": (60, 140, 60),
+    "markers": (220, 200, 80),
+    "creatures": (200, 140, 80),
+    "weather": (160, 200, 240),
+    "text": (230, 120, 200),
+    "battle": (230, 90, 70),
+    "compose": (150, 150, 150),
+    "flip": (250, 250, 250),
+    "overlay": (100, 100, 220),
+    "other": (70, 70, 70),
+}
+FALLBACK_COLOR = (180, 120, 60)
+_IDLE_STAGE = nullcontext()  # shared by every stage while nothing is recorded
+
+
+class _Stage:
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._stack.append([self.name, perf_counter(), 0.0])
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._pop(perf_counter())
+        return False
+
+
+class FrameProfiler:
+    """
+    Times named stages of each frame
+    """
+
+    def __init__(self, history=DEFAULT_HISTORY, max_trace_events=DEFAULT_TRACE_EVENTS, enabled=True):
+        self.t0 = perf_counter()
+        self.enabled = enabled  # when off, frames and stages cost one attribute check
+        self.frames = deque(maxlen=history)  # (frame total seconds, {stage: self seconds})
+        self.trace = deque(maxlen=max_trace_events)  # (name, start, duration, depth)
+        self.overlay_visible = False
+        self.frame_count = 0
+        self._stack = []
+        self._current = {}
+        self._frame_start = None
+
+    def show_overlay(self, visible):
+        """Show or hide the overlay; frames are only recorded while it is shown"""
+        self.overlay_visible = visible
+        self.enabled = visible
+        self._frame_start = None
+
+    def begin_frame(self):
+        """Start timing a frame"""
+        if not self.enabled:
+            return
+        self._current = {}
+        self._stack = []
+        self._frame_start = perf_counter()
+
+    def stage(self, name):
+        """Context manager timing one stage of the current frame"""
+        if self._frame_start is None:
+            return _IDLE_STAGE
+        return _Stage(self, name)
+
+    def _pop(self, now):
+        name, start, children = self._stack.pop()
+        duration = now - start
+        self._current[name] = self._current.get(name, 0.0) + duration - children
+        if self._stack:
+            self._stack[-1][2] += duration
+        self.trace.append((name, start, duration, len(self._stack)))
+
+    def end_frame(self):
+        """Finish the frame and add it to the history"""
+        if self._frame_start is None:
+            return
+        now = perf_counter()
+        total = now - self._frame_start
+        other = total - sum(self._current.values())
+        if other > 0:
+            self._current["other"] = other
+        self.frames.append((total, self._current))
+        self.trace.append(("frame", self._frame_start, total, -1))
+        self.frame_count += 1
+        self._frame_start = None
+
+    def averages(self):
+        """Average self time per stage over the history, in milliseconds"""
+        if not self.frames:
+            return {}
+        sums = {}
+        for _, stages in self.frames:
+            for name, seconds in stages.items():
+                sums[name] = sums.get(name, 0.0) + seconds
+        return {name: 1000.0 * total / len(self.frames) for name, total in sums.items()}
+
+    def percentile(self, q):
+        """Frame time percentile (0..100) over the history, in milliseconds"""
+        if not self.frames:
+            return 0.0
+        totals = sorted(total for total, _ in self.frames)
+        i = min(len(totals) - 1, int(round(q / 100.0 * (len(totals) - 1))))
+        return 1000.0 * totals[i]
+
+    def export_chrome_trace(self, path):
+        """Write the recorded stage spans as a Chrome trace event JSON file"""
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": 1, "args": {"name": "main loop"}}]
+        for name, start, duration, depth in self.trace:
+            events.append({
+                "name": name,
+                "cat": "frame" if depth < 0 else "stage",
+                "ph": "X",
+                "ts": (start - self.t0) * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": 1,
+            })
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events) - 1
+
+    def draw_overlay(self, surface, rect, font):
+        """Draw a rolling stacked bar graph of stage times and the averages"""
+        import pygame
+
+        pygame.draw.rect(surface, (12, 12, 12), rect)
+        pygame.draw.rect(surface, (0, 0, 0), rect, 1)
+        graph_h = rect.height - 18 * 4
+        scale = graph_h / OVERLAY_BUDGET_MS
+        base = rect.y + graph_h
+        bar_w = max(1, rect.width // max(1, self.frames.maxlen))
+        x = rect.right - bar_w
+        for total, stages in reversed(self.frames):
+            if x < rect.x:
+                break
+            y = base
+            for name, seconds in stages.items():
+                h = min(y - rect.y, int(seconds * 1000.0 * scale))
+                if h > 0:
+                    y -= h
+                    pygame.draw.rect(surface, STAGE_COLORS.get(name, FALLBACK_COLOR), (x, y, bar_w, h))
+            x -= bar_w
+        target_y = base - int(TARGET_FRAME_MS * scale)
+        pygame.draw.line(surface, (200, 60, 60), (rect.x, target_y), (rect.right - 1, target_y))
+
+        # legend: average ms per stage, slowest first
+        avg = sorted(self.averages().items(), key=lambda item: -item[1])
+        for i, (name, ms) in enumerate(avg[:6]):
+            color = STAGE_COLORS.get(name, FALLBACK_COLOR)
+            # stage names repeat every frame and are cached; the numbers change
+            # every frame and would only churn the shared text cache
+            label = TEXT_CACHE.render(font, name, color)
+            lx, ly = rect.x + 4 + (i % 2) * (rect.width // 2), base + 4 + (i // 2) * 18
+            surface.blit(label, (lx, ly))
+            surface.blit(font.render(f"{ms:.2f}", True, color), (lx + label.get_width() + 6, ly))
+        surface.blit(font.render(f"p50 {self.percentile(50):.1f}  p99 {self.percentile(99):.1f} ms",
+                                 True, (240, 240, 240)), (rect.x + 4, base + 4 + 3 * 18))
+
+
+PROFILER = FrameProfiler(enabled=False)  # the GUI turns it on with the overlay (F3)
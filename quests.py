@@ -0,0 +1,253 @@
+"""
+Quests, achievements and the trigger engine that advances them.
+
+A quest is a list of goals. Each goal declares the event type it counts and,
+optionally, the key it cares about:
+- Goal("caught", "Sparkrat", 3) counts three Sparkrats caught;
+- Goal("caught", count=50) counts any 50 catches;
+- SetGoal("caught", names) needs each of the names caught once.
+Events are reported as (type, key, amount), for example ("arrived",
+"Forest", 1) or ("trap_set", "basic_net", 1); EVENT_TYPES lists the ones
+the game reports.
+
+The engine keeps a subscription table from (type, key) and (type, ANY) to
+the goals listening there. `emit` looks up just those two entries, so an
+event costs time in proportion to the goals it advances, not to the number
+of active quests. Goal counters are kept incrementally, a finished goal
+unsubscribes itself, and a quest is complete when its count of open goals
+reaches zero. Lifetime totals per (type, key) let a goal added late start
+from what the player has already done, as achievements do.
+
+Achievements come from `achievements_bonuses` in
+config/capture_probabilities.yaml. Each completed one is worth its capture
+odds multiplier; the best one earned applies. The "catch every ..."
+achievements are mapped onto the species the game can actually catch
+(creature.WILD_SPECIES), which the encyclopedia does not list: "catch every
+rare creature" needs each catchable species whose type some rare
+encyclopedia entry has, and "perfect encyclopedia" needs every catchable
+species. An achievement that still maps to no species is logged and left
+out, since it could never be earned.
+
+This module has no pygame dependency.
+"""
+
+import logging
+import re
+
+from config_loader import load_config
+from creature import WILD_SPECIES
+from encyclopedia import encyclopedia
+
+ANY = None  # a goal key matching every key of its event type
+CAUGHT, ARRIVED, TRAP_SET, TRAP_USED = "caught", "arrived", "trap_set", "trap_used"
+EVENT_TYPES = [CAUGHT, ARRIVED, TRAP_SET, TRAP_USED]
+
+log = logging.getLogger(__name__)
+
+
+class Goal:
+    """Count events of a type, optionally for one key, up to a target"""
+
+    def __init__(self, event, key=ANY, count=1, description=None):
+        self.event = event
+        self.key = key
+        self.count = count
+        self.progress = 0
+        self.description = description or f"{event} {key if key is not ANY else 'anything'} x{count}"
+
+    def subscriptions(self):
+        """The (event, key) pairs this goal still listens to"""
+        return [] if self.done else [(self.event, self.key)]
+
+    def start_from(self, totals):
+        """Take the progress already made from lifetime event totals"""
+        self.progress = min(self.count, totals.get((self.event, self.key), 0))
+
+    def record(self, key, amount):
+        """Count an event; returns the subscriptions to drop"""
+        self.progress = min(self.count, self.progress + amount)
+        return [(self.event, self.key)] if self.done else []
+
+    @property
+    def done(self):
+        return self.progress >= self.count
+
+
+class SetGoal(Goal):
+    """Have an event happen once for each of a set of keys, such as every species of a rarity"""
+
+    def __init__(self, event, keys, description=None):
+        super().__init__(event, ANY, len(set(keys)), description or f"{event} each of {len(set(keys))}")
+        self.missing = set(keys)
+
+    def subscriptions(self):
+        return [(self.event, key) for key in self.missing]
+
+    def start_from(self, totals):
+        self.missing = {key for key in self.missing if not totals.get((self.event, key))}
+        self.progress = self.count - len(self.missing)
+
+    def record(self, key, amount):
+        self.missing.discard(key)
+        self.progress = self.count - len(self.missing)
+        return [(self.event, key)]
+
+
+class Quest:
+    """Goals to finish, and what finishing them is worth"""
+
+    def __init__(self, name, goals, reward=None, kind="side"):
+        self.name = name
+        self.goals = goals
+        self.reward = reward
+        self.kind = kind  # "npc", "faction", "side" or "achievement"
+        self.open_goals = sum(not goal.done for goal in goals)
+
+    @property
+    def complete(self):
+        return self.open_goals == 0
+
+    def __repr__(self):
+        return f"Quest({self.name!r}, {len(self.goals) - self.open_goals}/{len(self.goals)} goals)"
+
+
+def quest_from_spec(spec):
+    """
+    A Quest from a dict such as
+    {"name": ..., "kind": "npc", "reward": ..., "goals": [{"event": "caught", "key": "Sparkrat", "count": 3}]};
+    a goal with "keys" instead of "key" needs each key once
+    """
+    goals = []
+    for goal in spec["goals"]:
+        if "keys" in goal:
+            goals.append(SetGoal(goal["event"], goal["keys"], goal.get("description")))
+        else:
+            goals.append(Goal(goal["event"], goal.get("key", ANY), goal.get("count", 1), goal.get("description")))
+    return Quest(spec["name"], goals, spec.get("reward"), spec.get("kind", "side"))
+
+
+def achievement_goal(name, species_by_rarity, roster=()):
+    """
+    The goal an `achievements_bonuses` name stands for, or None if it is not
+    understood or has no species to catch. `roster` is every catchable species.
+    """
+    if name == "first_capture":
+        return Goal(CAUGHT, count=1, description="Catch a creature")
+    match = re.fullmatch(r"capture_(\d+)_creatures", name)
+    if match:
+        return Goal(CAUGHT, count=int(match.group(1)), description=f"Catch {match.group(1)} creatures")
+    match = re.fullmatch(r"capture_all_(\w+)", name)
+    if match and species_by_rarity.get(match.group(1)):
+        return SetGoal(CAUGHT, species_by_rarity[match.group(1)], f"Catch every {match.group(1)} creature")
+    if name == "perfect_encyclopedia" and roster:
+        return SetGoal(CAUGHT, roster, "Catch every kind of creature")
+    return None
+
+
+def load_achievements(species=WILD_SPECIES):
+    """
+    Achievement quests from config, with their capture odds multiplier as
+    reward. "Catch every <rarity> ..." goals need each of `species` whose
+    type an encyclopedia entry of that rarity has.
+    """
+    types_by_rarity = {}
+    for entry in encyclopedia().entries:
+        types_by_rarity.setdefault(entry.rarity, set()).add(entry.type)
+    species_by_rarity = {rarity: [s.name for s in species if s.type.lower() in types]
+                         for rarity, types in types_by_rarity.items()}
+    roster = [s.name for s in species]
+    achievements = []
+    for name, bonus in load_config("capture_probabilities").get("achievements_bonuses", {}).items():
+        goal = achievement_goal(name, species_by_rarity, roster)
+        if goal is None:
+            log.warning("achievement %s left out: no catchable species or unknown goal", name)
+        else:
+            achievements.append(Quest(name, [goal], bonus, kind="achievement"))
+    return achievements
+
+
+class QuestEngine:
+    """
+    Active quests, indexed by the events their open goals subscribe to
+    """
+
+    def __init__(self):
+        self.quests = {}  # name -> Quest
+        self.completed = []  # quests in the order they were completed
+        self.totals = {}  # (event, key) and (event, ANY) -> lifetime amount
+        self._subscribers = {}  # (event, key) -> {id(goal): (quest, goal)}
+        self.evaluated = 0  # goals advanced by emit(), for checking the index does its job
+
+    def __len__(self):
+        return len(self.quests)
+
+    def __contains__(self, name):
+        return name in self.quests
+
+    def add(self, quest, count_past=False):
+        """
+        Start a quest. With count_past, goals start from the lifetime totals,
+        so "catch 50 creatures" counts catches made before it was added.
+        Returns the quest, which may already be complete.
+        """
+        if quest.name in self.quests:
+            raise ValueError(f"quest {quest.name!r} is already active")
+        if count_past:
+            for goal in quest.goals:
+                goal.start_from(self.totals)
+            quest.open_goals = sum(not goal.done for goal in quest.goals)
+        self.quests[quest.name] = quest
+        for goal in quest.goals:
+            for subscription in goal.subscriptions():
+                self._subscribers.setdefault(subscription, {})[id(goal)] = (quest, goal)
+        if quest.complete:
+            self._finish(quest)
+        return quest
+
+    def remove(self, name):
+        """Abandon an active quest"""
+        quest = self.quests.pop(name)
+        for goal in quest.goals:
+            for subscription in goal.subscriptions():
+                self._unsubscribe(subscription, goal)
+        return quest
+
+    def _unsubscribe(self, subscription, goal):
+        listeners = self._subscribers.get(subscription)
+        if listeners is not None:
+            listeners.pop(id(goal), None)
+            if not listeners:
+                del self._subscribers[subscription]
+
+    def _finish(self, quest):
+        del self.quests[quest.name]
+        self.completed.append(quest)
+
+    def emit(self, event, key=ANY, amount=1):
+        """
+        Report that something happened, e.g. emit("caught", "Sparkrat").
+        Advances only the goals subscribed to this event and key or to any
+        key of it. Returns the quests this completed.
+        """
+        self.totals[(event, key)] = self.totals.get((event, key), 0) + amount
+        if key is not ANY:
+            self.totals[(event, ANY)] = self.totals.get((event, ANY), 0) + amount
+        listening = list(self._subscribers.get((event, key), {}).values())
+        if key is not ANY:
+            listening += self._subscribers.get((event, ANY), {}).values()
+        finished = []
+        for quest, goal in listening:
+            self.evaluated += 1
+            was_done = goal.done
+            for subscription in goal.record(key, amount):
+                self._unsubscribe(subscription, goal)
+            if goal.done and not was_done:
+                quest.open_goals -= 1
+                if quest.complete:
+                    self._finish(quest)
+                    finished.append(quest)
+        return finished
+
+    def capture_bonus(self):
+        """Capture odds multiplier of the best achievement earned, 1 if none"""
+        return max((q.reward for q in self.completed if q.kind == "achievement"), default=1.0)
@@ -0,0 +1,296 @@
+"""
+Headless rendering benchmark for the Trapper-Mastering GUI.
+
+Drives `gui_app.GuiApp` under the SDL dummy video driver with scripted input
+through the title screen, starter selection, the map at several world sizes
+and marker counts, and the battle overlay with a long log. Each scenario is
+run twice: once for frame times (p50/p95/p99) and once under tracemalloc for
+the memory allocated per frame, since tracing slows frames down. Results are
+written to a JSON file, and can be compared against a saved baseline:
+
+    python render_benchmark.py --out bench.json
+    python render_benchmark.py --out new.json --baseline bench.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tracemalloc
+from time import perf_counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import gui_app
+from creature import WILD_CREATURES
+from game import Game
+from simulation import layout_locations
+from world import World
+from world_clock import WEATHER_IDS
+
+FRAME_DT = 1.0 / gui_app.FPS
+DEFAULT_FRAMES = 300
+DEFAULT_WARMUP = 30
+DEFAULT_ALLOC_FRAMES = 60
+MAP_SIZES = [(40, 30), (256, 256), (1024, 1024)]
+MARKER_COUNTS = [4, 1000, 20000]
+BATTLE_LOG_LINES = 200
+
+
+class Keys:
+    """A pygame.key.get_pressed() stand-in holding a set of pressed keys"""
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+NO_KEYS = Keys()
+
+
+def motion(pos):
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))
+
+
+def click(pos):
+    return [motion(pos),
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1),
+            pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1)]
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (0..100) of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    i = min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))
+    return ordered[i]
+
+
+class Scenario:
+    """
+    A named UI state to benchmark
+
+    setup(app) brings a fresh app into the state; script(app, i) returns the
+    events and keys for frame i.
+    """
+
+    def __init__(self, name, setup, script, world=None, locations=None):
+        self.name = name
+        self.setup = setup
+        self.script = script
+        self.world = world
+        self.locations = locations
+
+
+def enter_map(app):
+    app.frame(FRAME_DT, click(app.start_button.rect.center), NO_KEYS)
+    app.frame(FRAME_DT, click(app.starter_buttons[0].rect.center), NO_KEYS)
+    app.frame(FRAME_DT, [], NO_KEYS)
+
+
+def hover_script(points, every=8):
+    """Move the mouse between points, changing hover state every few frames"""
+    def script(app, i):
+        return [motion(points[(i // every) % len(points)])], NO_KEYS
+    return script
+
+
+def walk_script(app, i):
+    """Walk the map in a slow square so the camera keeps scrolling"""
+    side = (i // 120) % 4
+    key = (pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT, pygame.K_UP)[side]
+    return [], Keys([key])
+
+
+def storm_setup(app):
+    """Enter the map at night with every region stormy, so particles and tints draw each frame"""
+    enter_map(app)
+    conditions = app.overworld.conditions
+    conditions.weather.state[:] = WEATHER_IDS["stormy"]
+    conditions.clock.hours = 21.0
+    conditions.refresh()
+
+
+def battle_setup(app):
+    enter_map(app)
+    app.overworld.encounters_enabled = False
+    app.start_battle(WILD_CREATURES[0]())
+    for i in range(BATTLE_LOG_LINES):
+        app.battle.add_log(f"Turn {i}: the battle log keeps growing")
+
+
+def battle_script(app, i):
+    # a new log line every few frames forces the overlay to redraw
+    if i % 4 == 0:
+        app.battle.add_log(f"Frame {i}: something happened")
+    buttons = app.battle_buttons
+    return [motion(buttons[(i // 8) % len(buttons)].rect.center)], NO_KEYS
+
+
+def map_locations(cols, rows, markers, seed):
+    """The game's locations plus random extra markers spread over the world"""
+    width = cols * gui_app.TILE_SIZE
+    height = rows * gui_app.TILE_SIZE
+    locations = layout_locations(list(Game().locations), width, height)
+    rng = random.Random(seed)
+    for i in range(max(0, markers - len(locations))):
+        locations[f"Marker {i}"] = (rng.randrange(width), rng.randrange(height))
+    return locations
+
+
+def default_scenarios(sizes=MAP_SIZES, marker_counts=MARKER_COUNTS, seed=gui_app.WORLD_SEED):
+    def title_setup(app):
+        pass
+
+    def starter_setup(app):
+        app.frame(FRAME_DT, click(app.start_button.rect.center), NO_KEYS)
+
+    scenarios = [
+        Scenario("title", title_setup, hover_script([(gui_app.WIDTH // 2, gui_app.HEIGHT // 2 + 62), (20, 20)])),
+        Scenario("starter", starter_setup, hover_script([(186, 320), (450, 320), (714, 320), (20, 20)])),
+    ]
+    for cols, rows in sizes:
+        world = World(cols, rows, seed=seed)
+        for markers in marker_counts:
+            scenarios.append(Scenario(f"map_{cols}x{rows}_{markers}_markers", enter_map, walk_script,
+                                      world=world, locations=map_locations(cols, rows, markers, seed)))
+    scenarios.append(Scenario("map_storm_night", storm_setup, walk_script,
+                              world=World(*sizes[0], seed=seed), locations=map_locations(*sizes[0], 4, seed)))
+    # every map scene gets an in-memory world, so benchmarks never bake a tile map into assets/
+    scenarios.append(Scenario(f"battle_{BATTLE_LOG_LINES}_log_lines", battle_setup, battle_script,
+                              world=World(*sizes[0], seed=seed), locations=map_locations(*sizes[0], 4, seed)))
+    return scenarios
+
+
+def run_scenario(screen, scenario, frames, warmup, alloc_frames):
+    """Time a scenario, then measure its allocations, and return the stats"""
+    random.seed(0)
+    app = gui_app.GuiApp(screen, world=scenario.world, locations=scenario.locations)
+    scenario.setup(app)
+    for i in range(warmup):
+        events, keys = scenario.script(app, i)
+        app.frame(FRAME_DT, events, keys)
+
+    times = []
+    pixels = []
+    for i in range(warmup, warmup + frames):
+        events, keys = scenario.script(app, i)
+        start = perf_counter()
+        app.frame(FRAME_DT, events, keys)
+        times.append((perf_counter() - start) * 1000.0)
+        pixels.append(app.renderer.pixels_pushed)
+
+    peak_bytes = []
+    net_bytes = []
+    tracemalloc.start()
+    try:
+        for i in range(warmup + frames, warmup + frames + alloc_frames):
+            events, keys = scenario.script(app, i)
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            app.frame(FRAME_DT, events, keys)
+            after, peak = tracemalloc.get_traced_memory()
+            peak_bytes.append(peak - before)
+            net_bytes.append(after - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "frames": frames,
+        "mean_ms": sum(times) / len(times),
+        "p50_ms": percentile(times, 50),
+        "p95_ms": percentile(times, 95),
+        "p99_ms": percentile(times, 99),
+        "max_ms": max(times),
+        "pixels_per_frame": sum(pixels) / len(pixels),
+        "alloc_peak_bytes_p50": percentile(peak_bytes, 50),
+        "alloc_peak_bytes_p95": percentile(peak_bytes, 95),
+        "alloc_net_bytes_per_frame": sum(net_bytes) / max(1, len(net_bytes)),
+    }
+
+
+def run_benchmarks(scenarios, frames=DEFAULT_FRAMES, warmup=DEFAULT_WARMUP,
+                   alloc_frames=DEFAULT_ALLOC_FRAMES, log=None):
+    """Run scenarios in a dummy-driver window and return the results document"""
+    pygame.init()
+    screen = pygame.display.set_mode((gui_app.WIDTH, gui_app.HEIGHT))
+    results = {}
+    try:
+        for scenario in scenarios:
+            results[scenario.name] = run_scenario(screen, scenario, frames, warmup, alloc_frames)
+            if log is not None:
+                stats = results[scenario.name]
+                log(f"{scenario.name:36s} p50 {stats['p50_ms']:6.2f}  p95 {stats['p95_ms']:6.2f}  "
+                    f"p99 {stats['p99_ms']:6.2f} ms  peak alloc {stats['alloc_peak_bytes_p50'] / 1024:7.1f} KiB")
+    finally:
+        pygame.quit()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "sdl": ".".join(str(v) for v in pygame.get_sdl_version()),
+            "video_driver": os.environ.get("SDL_VIDEODRIVER"),
+            "platform": platform.platform(),
+            "frames": frames,
+            "warmup": warmup,
+            "alloc_frames": alloc_frames,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(results, baseline, tolerance, metric="p95_ms"):
+    """Scenarios whose metric got worse than baseline by more than tolerance (a fraction)"""
+    regressions = []
+    for name, stats in results["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None or old.get(metric, 0) <= 0:
+            continue
+        if stats[metric] > old[metric] * (1.0 + tolerance):
+            regressions.append((name, old[metric], stats[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GUI rendering headless")
+    parser.add_argument("--out", default="render_benchmark.json")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--alloc-frames", type=int, default=DEFAULT_ALLOC_FRAMES)
+    parser.add_argument("--quick", action="store_true", help="only the smallest map size and marker count")
+    parser.add_argument("--only", default="", help="run scenarios whose name contains this text")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown vs baseline")
+    args = parser.parse_args()
+
+    if args.quick:
+        scenarios = default_scenarios(sizes=MAP_SIZES[:1], marker_counts=MARKER_COUNTS[:1])
+    else:
+        scenarios = default_scenarios()
+    scenarios = [s for s in scenarios if args.only in s.name]
+
+    results = run_benchmarks(scenarios, args.frames, args.warmup, args.alloc_frames, log=print)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, old, new in regressions:
+            print(f"REGRESSION {name}: p95 {old:.2f} -> {new:.2f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
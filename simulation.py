@@ -0,0 +1,405 @@
+"""
+Fixed-timestep overworld simulation for Trapper-Mastering.
+
+Player movement, arrival at locations and wild encounter timing are advanced
+in fixed ticks of FIXED_DT seconds, independent of how often frames are drawn.
+The GUI feeds frame time into a `FixedTimestep`, runs as many ticks as have
+accumulated and draws the player interpolated between the last two ticks, so
+game speed no longer depends on the frame rate or on having a window at all.
+
+This module has no pygame dependency. `run_headless` drives the same
+simulation with no display, thousands of ticks per second, for tests and bots:
+    python simulation.py --ticks 100000
+"""
+
+import argparse
+import copy
+import math
+import random
+import time
+
+import numpy as np
+
+from creature import STARTER_CREATURES
+from encounters import ENCOUNTERS, EncounterScheduler
+from event_calendar import EventCalendar
+from behavior import TEMPERAMENTS, BehaviorEngine
+from berry_lures import LureField
+from entities import ANIMATION_FPS, EntityStore
+from game import Game
+from player import Player
+from quests import ARRIVED, CAUGHT, TRAP_SET, QuestEngine, load_achievements
+from spatial_hash import SpatialHash
+from trap_field import TrapField
+from world import World
+from world_clock import SECONDS_PER_HOUR, START_HOUR, WorldConditions
+
+TICK_RATE = 60
+FIXED_DT = 1.0 / TICK_RATE
+MAX_STEPS_PER_FRAME = 5  # after a long stall, drop time rather than spiral
+PLAYER_SPEED = 180  # pixels per second
+EDGE_MARGIN = 8  # closest the player gets to the world edge, in pixels
+ENCOUNTER_INTERVAL = 1.0  # seconds of movement per encounter step
+ENCOUNTER_RATE_SCALE = 0.12  # per-step chance is wild_encounter_rate times this
+ROAMING_CREATURES = 80  # visible wild creatures kept around the player
+ROAM_RADIUS = 20  # tiles; roaming creatures farther from the player are replaced
+ROAM_SPEED = 40  # pixels per second
+ANIMATE_EVERY = int(TICK_RATE / ANIMATION_FPS)  # ticks between roaming creature sprite frame updates
+TRAP_CONTACT_EVERY = 6  # ticks between checks for roaming creatures stepping on traps
+TRAP_REACH = 1  # tiles from the player at which trap catches are collected
+
+
+def layout_locations(names, world_w, world_h):
+    """Spread location markers across the world, in world pixel coords"""
+    n = len(names)
+    coords = {}
+    for i, name in enumerate(names):
+        fx = 0.06 + 0.88 * (i / max(1, n - 1))
+        fy = 0.12 + 0.76 * ((i % 4) / 3.0)
+        coords[name] = (int(fx * world_w), int(fy * world_h))
+    return coords
+
+
+class FixedTimestep:
+    """
+    Accumulates frame time and hands it out as whole fixed-size ticks
+    """
+
+    def __init__(self, dt=FIXED_DT, max_steps=MAX_STEPS_PER_FRAME):
+        self.dt = dt
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.ticks = 0
+
+    def advance(self, frame_dt):
+        """Add one frame's elapsed time and return the number of ticks to run"""
+        self.accumulator += frame_dt
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = steps * self.dt
+        self.accumulator -= steps * self.dt
+        self.ticks += steps
+        return steps
+
+    @property
+    def alpha(self):
+        """How far the current frame lies between the last tick and the next (0..1)"""
+        return self.accumulator / self.dt
+
+
+class Overworld:
+    """
+    The player walking the tile world: movement, arrivals and encounter rolls
+    """
+
+    def __init__(self, game, world, tile_size, locations=None, rng=random, speed=PLAYER_SPEED,
+                 encounters=ENCOUNTERS, conditions=None, roamers=ROAMING_CREATURES):
+        self.game = game
+        self.world = world
+        self.tile_size = tile_size
+        self.width = world.cols * tile_size
+        self.height = world.rows * tile_size
+        self.rng = rng
+        self.encounters = encounters
+        self.conditions = conditions  # world_clock.WorldConditions, or None for no time or weather
+        self.speed = speed
+        if locations is None:
+            locations = layout_locations(list(game.locations), self.width, self.height)
+        self.locations = locations
+        self.location_index = SpatialHash(tile_size * 8)
+        for name, (x, y) in locations.items():
+            self.location_index.insert(name, x, y)
+
+        # start on the current location, or in the middle of the world
+        self.x, self.y = locations.get(game.current_location, (self.width // 2, self.height // 2))
+        self.prev_x, self.prev_y = self.x, self.y
+        self.move_x = self.move_y = 0
+        self.move_accum = 0.0
+        self.encounters_enabled = True
+        self.lures = LureField(world.cols, world.rows)  # berries put out by the player
+        self.schedule = EncounterScheduler(rng, self.encounter_rate())
+        # wild creatures roaming near the player, species ids index encounters.default_pool.species
+        self.creatures = EntityStore()
+        self.behavior = BehaviorEngine(self.creatures, tile_size, np.random.default_rng(rng.randrange(2 ** 32)))
+        self.roaming_target = roamers
+        self.refresh_roamers(initial=True)
+        # traps within roaming range spring on roaming creatures; the rest resolve once per game hour
+        self.traps = TrapField(encounters, rng=np.random.default_rng(rng.randrange(2 ** 32)))
+        self.trap_seconds = 0.0
+        self.seconds = 0.0  # game time run so far, for lure expiry without world conditions
+        # quests and achievements, advanced by the events they subscribe to
+        self.quests = QuestEngine()
+        for achievement in load_achievements():
+            self.quests.add(achievement)
+        self.finished_quests = []  # completed since the last tick, reported by step()
+        self.ticks = 0
+
+    def set_input(self, dx, dy):
+        """Set the movement direction from -1/0/1 axis inputs"""
+        if dx and dy:
+            dx *= 0.7071
+            dy *= 0.7071
+        self.move_x = dx
+        self.move_y = dy
+
+    def position(self, alpha=1.0):
+        """Player position interpolated between the previous and current tick"""
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
+
+    def tile_under(self, x, y):
+        """Biome id of the tile at a world pixel position"""
+        return self.world.tile_at(int(x // self.tile_size), int(y // self.tile_size))
+
+    def encounter_rate(self):
+        """Chance of an encounter per step at the current location"""
+        rate = self.game.locations.get(self.game.current_location, {}).get('wild_encounter_rate', 0.0)
+        if self.conditions is not None:
+            rate *= self.conditions.spawn_modifier(self.tile_under(self.x, self.y))
+        rate *= self.lures.spawn_multiplier(*self.player_tile())
+        return min(1.0, rate * ENCOUNTER_RATE_SCALE)
+
+    def capture_modifier(self):
+        """Capture odds multiplier for a battle at the player's position"""
+        modifier = self.lures.capture_multiplier(*self.player_tile()) * self.quests.capture_bonus()
+        if self.conditions is not None:
+            modifier *= self.conditions.capture_modifier(self.tile_under(self.x, self.y))
+        return modifier
+
+    def hours(self):
+        """Game hours since day 1 midnight"""
+        if self.conditions is not None:
+            return self.conditions.clock.hours
+        return START_HOUR + self.seconds / SECONDS_PER_HOUR
+
+    def notify(self, event, key=None, amount=1):
+        """Report a quest event such as ("caught", species name); completed quests show up in the next step()"""
+        finished = self.quests.emit(event, key, amount)
+        self.finished_quests.extend(finished)
+        return finished
+
+    def place_berry(self, kind):
+        """Put out a berry of a kind from config/berry_types.yaml on the player's tile; returns its id"""
+        berry = self.lures.place(*self.player_tile(), kind, self.hours())
+        self.behavior.set_lures(*self.lures.lures(self.tile_size))
+        return berry
+
+    def spawn_wild_at(self, x, y):
+        """Pick a wild creature suited to the tile at a world pixel position"""
+        return self.encounters.spawn(self.tile_under(x, y), self.rng)
+
+    def spawn_roamer(self, x, y):
+        """Add a roaming wild creature at a world pixel position, of a species suited to the tile"""
+        x = max(0.0, min(self.width - 1.0, x))
+        y = max(0.0, min(self.height - 1.0, y))
+        species = self.encounters.pool(self.tile_under(x, y)).sample_index(self.rng)
+        angle = self.rng.uniform(0.0, 2.0 * math.pi)
+        speed = ROAM_SPEED * self.rng.uniform(0.5, 1.0)
+        return self.creatures.spawn(x, y, species, speed * math.cos(angle), speed * math.sin(angle),
+                                    temperament=self.rng.randrange(len(TEMPERAMENTS)))
+
+    def player_tile(self):
+        return int(self.x // self.tile_size), int(self.y // self.tile_size)
+
+    def place_trap(self, kind):
+        """Set a trap of a kind from config/trap_types.yaml on the player's tile; returns its id"""
+        tx, ty = self.player_tile()
+        trap = self.traps.place(tx, ty, self.world.tile_at(tx, ty), kind)
+        self.notify(TRAP_SET, kind)
+        return trap
+
+    def collect_traps(self):
+        """Move the catches of traps within reach of the player to the player; returns the creatures"""
+        ready = self.traps.ready()
+        ready = ready[self.traps.near(*self.player_tile(), TRAP_REACH)[ready]]
+        creatures = []
+        for trap in ready:
+            creature = self.traps.collect(int(trap), self.rng)
+            self.game.player.add_creature(creature)
+            self.notify(CAUGHT, creature.name)
+            creatures.append(creature)
+        return creatures
+
+    def resolve_traps(self, dt):
+        """
+        Spring traps near the player on roaming creatures, and settle the
+        rest in one batch per game hour. Returns trap events.
+        """
+        events = []
+        seconds_per_hour = self.conditions.clock.seconds_per_hour if self.conditions is not None else SECONDS_PER_HOUR
+        self.trap_seconds += dt
+        hours = int(self.trap_seconds // seconds_per_hour)
+        contacts = self.ticks % TRAP_CONTACT_EVERY == 0 and len(self.creatures)
+        if not (contacts or hours):
+            return events
+        capture = self.conditions.capture_modifiers if self.conditions is not None else None
+        near = self.traps.near(*self.player_tile(), ROAM_RADIUS)
+        if contacts and near.any():
+            entities = self.creatures.ids()
+            tiles = (self.creatures.pos[entities] // self.tile_size).astype(np.int32)
+            catches, broken = self.traps.resolve_contacts(
+                np.flatnonzero(near), tiles, entities, self.creatures.species[entities].astype(np.int64),
+                self.creatures.temperament[entities].astype(np.int64), capture, self.lures)
+            for trap, entity in catches:
+                self.creatures.despawn(entity)  # it is in the trap now
+                events.append(("trapped", trap))
+            events.extend(("trap_broken", int(trap)) for trap in broken)
+        if hours:
+            self.trap_seconds -= hours * seconds_per_hour
+            spawn = self.conditions.spawn_modifiers if self.conditions is not None else None
+            far = np.flatnonzero(self.traps.alive[:self.traps.size] & ~near)
+            caught, broken = self.traps.resolve_hours(far, hours, spawn, capture, self.lures)
+            events.extend(("trapped", int(trap)) for trap in caught)
+            events.extend(("trap_broken", int(trap)) for trap in broken)
+        return events
+
+    def refresh_roamers(self, initial=False):
+        """
+        Replace roaming creatures that strayed out of range of the player.
+
+        New creatures appear in the outer part of the range, out of view,
+        except on the first fill, which covers the whole range.
+        """
+        radius = ROAM_RADIUS * self.tile_size
+        ids = self.creatures.ids()
+        offsets = self.creatures.pos[ids] - (self.x, self.y)
+        for entity in ids[(offsets ** 2).sum(axis=1) > radius * radius]:
+            self.creatures.despawn(int(entity))
+        while len(self.creatures) < self.roaming_target:
+            distance = radius * (math.sqrt(self.rng.random()) if initial else self.rng.uniform(0.6, 1.0))
+            angle = self.rng.uniform(0.0, 2.0 * math.pi)
+            self.spawn_roamer(self.x + distance * math.cos(angle), self.y + distance * math.sin(angle))
+
+    def step(self, dt=FIXED_DT):
+        """
+        Advance one tick.
+
+        Returns a list of events: ("arrived", location name),
+        ("encounter", wild creature), ("trapped", trap id),
+        ("trap_broken", trap id), ("berry_expired", berry id) and
+        ("quest_completed", quest), and with world conditions also
+        ("period", period name), ("weather", changed region ids) and
+        ("calendar", active event names).
+        """
+        events = []
+        self.ticks += 1
+        self.seconds += dt
+        if self.conditions is not None:
+            events.extend(self.conditions.advance(dt))
+        if len(self.lures):
+            expired = self.lures.expire(self.hours())
+            if expired:
+                self.behavior.set_lures(*self.lures.lures(self.tile_size))
+                events.extend(("berry_expired", berry) for berry in expired)
+        if len(self.creatures):
+            self.behavior.update(dt, self.x, self.y, self.ticks)
+            self.creatures.move(dt, self.width, self.height)
+            # sprite frames only change a few times a second, so animate in batches of ticks
+            if self.ticks % ANIMATE_EVERY == 0:
+                self.creatures.animate(dt * ANIMATE_EVERY)
+        if len(self.traps):
+            events.extend(self.resolve_traps(dt))
+        if self.ticks % TICK_RATE == 0:
+            self.refresh_roamers()
+        self.prev_x, self.prev_y = self.x, self.y
+        self.x += self.move_x * self.speed * dt
+        self.y += self.move_y * self.speed * dt
+        self.x = max(EDGE_MARGIN, min(self.width - EDGE_MARGIN, self.x))
+        self.y = max(EDGE_MARGIN, min(self.height - EDGE_MARGIN, self.y))
+
+        # arrive at a location when standing on its marker
+        nearby = self.location_index.query_radius(self.x, self.y, self.tile_size // 2)
+        if nearby and self.game.current_location != nearby[0]:
+            self.game.current_location = nearby[0]
+            self.move_accum = 0.0
+            self.schedule.set_rate(self.encounter_rate())
+            events.append(("arrived", nearby[0]))
+            self.notify(ARRIVED, nearby[0])
+
+        # each second of walking in the wild is one step towards the next encounter
+        if self.move_x or self.move_y:
+            self.move_accum += dt
+        if self.move_accum >= ENCOUNTER_INTERVAL and self.encounters_enabled:
+            # the biome, time of day or weather may have changed the rate
+            self.schedule.set_rate(self.encounter_rate())
+            if self.schedule.step():
+                events.append(("encounter", self.spawn_wild_at(self.x, self.y)))
+            self.move_accum = 0.0
+        if self.finished_quests:
+            events.extend(("quest_completed", quest) for quest in self.finished_quests)
+            self.finished_quests = []
+        return events
+
+
+def random_walk(rng, turn_every=30):
+    """A bot policy that picks a new random direction every turn_every ticks"""
+    state = {"dir": (0, 0), "left": 0}
+
+    def policy(overworld):
+        if state["left"] <= 0:
+            state["dir"] = (rng.choice((-1, 0, 1)), rng.choice((-1, 0, 1)))
+            state["left"] = turn_every
+        state["left"] -= 1
+        return state["dir"]
+    return policy
+
+
+def run_headless(overworld, ticks, policy=None, dt=FIXED_DT):
+    """Run the overworld for a number of ticks with no display and collect its events"""
+    events = []
+    for _ in range(ticks):
+        if policy is not None:
+            overworld.set_input(*policy(overworld))
+        events.extend(overworld.step(dt))
+    return events
+
+
+def new_headless_game(starter="Flamepup"):
+    """A Game with a player and starter, ready for the overworld"""
+    player = Player("Bot")
+    player.add_creature(copy.deepcopy(STARTER_CREATURES[starter]))
+    game = Game()
+    game.player = player
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the overworld simulation headless")
+    parser.add_argument("--ticks", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--cols", type=int, default=40)
+    parser.add_argument("--rows", type=int, default=30)
+    parser.add_argument("--tile-size", type=int, default=48)
+    parser.add_argument("--no-weather", action="store_true", help="run without the world clock and weather")
+    parser.add_argument("--roamers", type=int, default=ROAMING_CREATURES, help="roaming creatures near the player")
+    parser.add_argument("--traps", type=int, default=0, help="traps of random kinds scattered over the map")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    conditions = None if args.no_weather else WorldConditions(seed=args.seed, calendar=EventCalendar.from_config())
+    overworld = Overworld(new_headless_game(), World(args.cols, args.rows, seed=args.seed),
+                          args.tile_size, rng=rng, conditions=conditions, roamers=args.roamers)
+    for _ in range(args.traps):
+        tx, ty = rng.randrange(args.cols), rng.randrange(args.rows)
+        overworld.traps.place(tx, ty, overworld.world.tile_at(tx, ty), rng.choice(overworld.traps.kinds))
+    start = time.perf_counter()
+    events = run_headless(overworld, args.ticks, policy=random_walk(rng))
+    elapsed = time.perf_counter() - start
+
+    arrivals = sum(1 for kind, _ in events if kind == "arrived")
+    encounters = sum(1 for kind, _ in events if kind == "encounter")
+    print(f"{args.ticks} ticks ({args.ticks * FIXED_DT:.0f}s game time) in {elapsed:.2f}s "
+          f"= {args.ticks / elapsed:.0f} ticks/s")
+    print(f"{arrivals} arrivals, {encounters} encounters")
+    if args.traps:
+        trapped = sum(1 for kind, _ in events if kind == "trapped")
+        broken = sum(1 for kind, _ in events if kind == "trap_broken")
+        print(f"{trapped} creatures trapped, {broken} traps broken, {len(overworld.traps.ready())} catches waiting")
+    if conditions is not None:
+        print(f"ended at {conditions.clock.time_string()} ({conditions.period}, "
+              f"{', '.join(conditions.events.names)}), {conditions.refresh_count} modifier table refreshes")
+
+
+if __name__ == "__main__":
+    main()
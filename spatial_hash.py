@@ -0,0 +1,106 @@
+"""
+Uniform-grid spatial hash for overworld entities.
+
+Towns, location markers, NPCs, berry bushes and hazards are bucketed by the
+grid cell their world position falls in. Viewport culling and radius checks
+then only visit the handful of cells that overlap the query, so per-frame
+work scales with what is near the camera rather than with world size.
+"""
+
+import math
+
+
+class SpatialHash:
+    """
+    Buckets point entities into square cells of cell_size world units
+    """
+
+    def __init__(self, cell_size):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self._cells = {}  # (cx, cy) -> set of items
+        self._positions = {}  # item -> (x, y)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, item):
+        return item in self._positions
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def position(self, item):
+        """Get the stored position of an item"""
+        return self._positions[item]
+
+    def insert(self, item, x, y):
+        """Add an item at (x, y); re-inserting an existing item moves it"""
+        if item in self._positions:
+            self.move(item, x, y)
+            return
+        self._positions[item] = (x, y)
+        self._cells.setdefault(self._cell(x, y), set()).add(item)
+
+    def remove(self, item):
+        """Remove an item"""
+        x, y = self._positions.pop(item)
+        cell = self._cell(x, y)
+        bucket = self._cells[cell]
+        bucket.discard(item)
+        if not bucket:
+            del self._cells[cell]
+
+    def move(self, item, x, y):
+        """Update an item's position, re-bucketing only when it changes cell"""
+        old = self._positions[item]
+        self._positions[item] = (x, y)
+        old_cell = self._cell(*old)
+        new_cell = self._cell(x, y)
+        if old_cell != new_cell:
+            bucket = self._cells[old_cell]
+            bucket.discard(item)
+            if not bucket:
+                del self._cells[old_cell]
+            self._cells.setdefault(new_cell, set()).add(item)
+
+    def _cells_overlapping(self, x0, y0, x1, y1):
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        # Sparse grids: walk whichever is smaller, the cell range or the occupied cells
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self._cells):
+            for (cx, cy), bucket in self._cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    yield bucket
+            return
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = self._cells.get((cx, cy))
+                if bucket:
+                    yield bucket
+
+    def query_rect(self, x, y, width, height):
+        """Items whose position lies inside the rect (x, y, width, height)"""
+        x1 = x + width
+        y1 = y + height
+        found = []
+        for bucket in self._cells_overlapping(x, y, x1, y1):
+            for item in bucket:
+                px, py = self._positions[item]
+                if x <= px < x1 and y <= py < y1:
+                    found.append(item)
+        return found
+
+    def query_radius(self, x, y, radius):
+        """Items within radius of (x, y), nearest first"""
+        r2 = radius * radius
+        found = []
+        for bucket in self._cells_overlapping(x - radius, y - radius, x + radius, y + radius):
+            for item in bucket:
+                px, py = self._positions[item]
+                d2 = (px - x) ** 2 + (py - y) ** 2
+                if d2 <= r2:
+                    found.append((d2, item))
+        found.sort(key=lambda pair: pair[0])
+        return [item for _, item in found]
@@ -0,0 +1,200 @@
+"""
+Procedural terrain generation for the Trapper-Mastering overworld.
+
+Terrain is built from layered value noise evaluated with NumPy over whole
+blocks of tiles at once. Three noise fields (elevation, temperature and
+moisture) pick one of the 27 environment biomes from the design document, and
+a fourth, sparse "anomaly" field places the exotic biomes (caves, gas vents,
+floating islands, ...). Noise is a pure function of the world seed and the
+global tile coordinate, so any chunk can be generated on its own, in any
+order or in parallel, and neighbouring chunks still line up seamlessly.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Coarse terrain classes used for habitat lookups
+TERRAIN_GRASS = "grass"
+TERRAIN_WATER = "water"
+TERRAIN_ROCK = "rock"
+
+# The 27 environments from the design document: (name, color, terrain class).
+# A biome's id is its index in this list.
+BIOMES = [
+    ("forest", (60, 130, 60), TERRAIN_GRASS),
+    ("lake", (60, 130, 190), TERRAIN_WATER),
+    ("mountain", (125, 115, 105), TERRAIN_ROCK),
+    ("desert", (220, 195, 130), TERRAIN_ROCK),
+    ("ocean", (35, 85, 160), TERRAIN_WATER),
+    ("sky", (170, 205, 235), TERRAIN_GRASS),
+    ("plains", (120, 180, 95), TERRAIN_GRASS),
+    ("canyon", (175, 105, 70), TERRAIN_ROCK),
+    ("volcano", (95, 55, 45), TERRAIN_ROCK),
+    ("swamp", (80, 105, 70), TERRAIN_GRASS),
+    ("glacier", (215, 235, 245), TERRAIN_ROCK),
+    ("tundra", (175, 190, 170), TERRAIN_GRASS),
+    ("obsidian_wastes", (45, 40, 55), TERRAIN_ROCK),
+    ("floating_islands", (150, 205, 150), TERRAIN_GRASS),
+    ("crystal_caves", (140, 120, 190), TERRAIN_ROCK),
+    ("mineshafts", (100, 85, 70), TERRAIN_ROCK),
+    ("caves", (80, 75, 75), TERRAIN_ROCK),
+    ("ravines", (140, 100, 80), TERRAIN_ROCK),
+    ("salt_flats", (230, 230, 215), TERRAIN_ROCK),
+    ("estuaries", (90, 150, 150), TERRAIN_WATER),
+    ("dunes", (235, 205, 145), TERRAIN_ROCK),
+    ("plateaus", (165, 140, 100), TERRAIN_ROCK),
+    ("badlands", (185, 120, 85), TERRAIN_ROCK),
+    ("gas_vents", (150, 160, 90), TERRAIN_ROCK),
+    ("storm_peaks", (105, 110, 130), TERRAIN_ROCK),
+    ("lava_tubes", (160, 60, 35), TERRAIN_ROCK),
+    ("cliffs", (145, 140, 130), TERRAIN_ROCK),
+]
+
+BIOME_NAMES = [name for name, _, _ in BIOMES]
+BIOME_IDS = {name: i for i, name in enumerate(BIOME_NAMES)}
+BIOME_TERRAIN = [terrain for _, _, terrain in BIOMES]
+# (N, 3) uint8 palette for rasterizing tile-id arrays
+BIOME_COLORS = np.array([color for _, color, _ in BIOMES], dtype=np.uint8)
+
+# Field thresholds: elevation bands (ocean, shore, lowland, upland, highland,
+# peak), temperature levels (cold, temperate, hot), moisture levels (dry,
+# medium, wet) and the anomaly cut-off for exotic biomes.
+ELEVATION_BANDS = [0.30, 0.36, 0.55, 0.66, 0.76]
+TEMPERATURE_LEVELS = [0.42, 0.58]
+MOISTURE_LEVELS = [0.42, 0.58]
+ANOMALY_THRESHOLD = 0.76
+# Octave sums cluster around 0.5; fields are stretched by this factor
+FIELD_CONTRAST = 1.8
+
+
+def _table(rows):
+    return np.array([[[BIOME_IDS[name] for name in cell] for cell in row] for row in rows], dtype=np.uint8)
+
+
+# BIOME_TABLE[elevation band][temperature][moisture]
+BIOME_TABLE = _table([
+    [["ocean"] * 3, ["ocean"] * 3, ["ocean"] * 3],
+    [["tundra", "lake", "lake"], ["plains", "estuaries", "swamp"], ["salt_flats", "estuaries", "swamp"]],
+    [["tundra", "tundra", "forest"], ["plains", "forest", "swamp"], ["dunes", "desert", "swamp"]],
+    [["glacier", "tundra", "forest"], ["badlands", "plains", "forest"], ["desert", "badlands", "plateaus"]],
+    [["glacier", "cliffs", "mountain"], ["plateaus", "cliffs", "mountain"], ["canyon", "ravines", "plateaus"]],
+    [["glacier", "storm_peaks", "storm_peaks"], ["mountain", "mountain", "storm_peaks"], ["volcano", "volcano", "mountain"]],
+])
+
+# ANOMALY_TABLE[elevation band][temperature] replaces the regular biome
+# wherever the anomaly field is above ANOMALY_THRESHOLD
+ANOMALY_TABLE = np.array([[BIOME_IDS[name] for name in row] for row in [
+    ["ocean", "ocean", "ocean"],
+    ["lake", "gas_vents", "gas_vents"],
+    ["caves", "crystal_caves", "caves"],
+    ["mineshafts", "mineshafts", "obsidian_wastes"],
+    ["crystal_caves", "caves", "lava_tubes"],
+    ["sky", "floating_islands", "floating_islands"],
+]], dtype=np.uint8)
+
+# Per-field (seed salt, feature size in tiles, octaves)
+ELEVATION_NOISE = (101, 96.0, 5)
+TEMPERATURE_NOISE = (202, 160.0, 3)
+MOISTURE_NOISE = (303, 72.0, 4)
+ANOMALY_NOISE = (404, 24.0, 2)
+
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+def _lattice(seed, ix, iy):
+    """Hash integer lattice coordinates to floats in [0, 1)"""
+    h = (ix.astype(np.uint64) * np.uint64(374761393)
+         + iy.astype(np.uint64) * np.uint64(668265263)
+         + np.uint64(seed & 0xFFFFFFFF) * np.uint64(2246822519)) & _MASK32
+    h = ((h ^ (h >> np.uint64(13))) * np.uint64(1274126177)) & _MASK32
+    h ^= h >> np.uint64(16)
+    return h.astype(np.float64) / 4294967296.0
+
+
+def _smooth_coords(start, count, scale):
+    coords = (start + np.arange(count, dtype=np.float64)) / scale
+    cell = np.floor(coords).astype(np.int64)
+    t = coords - cell
+    return cell, t * t * (3.0 - 2.0 * t)
+
+
+def value_noise(seed, x0, y0, width, height, scale):
+    """
+    Smooth value noise for the tile block at (x0, y0) of size width x height.
+    Lattice values are hashed on a coarse grid and interpolated separably,
+    first along x for each lattice row and then along y.
+    """
+    cx, sx = _smooth_coords(x0, width, scale)
+    cy, sy = _smooth_coords(y0, height, scale)
+    lx = np.arange(cx[0], cx[-1] + 2, dtype=np.int64)
+    ly = np.arange(cy[0], cy[-1] + 2, dtype=np.int64)
+    lattice = _lattice(seed, lx[None, :], ly[:, None])
+
+    ix = cx - lx[0]
+    left = lattice[:, ix]
+    rows = left + (lattice[:, ix + 1] - left) * sx
+
+    iy = cy - ly[0]
+    top = rows[iy]
+    return top + (rows[iy + 1] - top) * sy[:, None]
+
+
+def fbm(seed, x0, y0, width, height, scale, octaves, persistence=0.5):
+    """Fractal sum of value-noise octaves, normalized to [0, 1]"""
+    total = np.zeros((height, width), dtype=np.float64)
+    amplitude = 1.0
+    norm = 0.0
+    for octave in range(octaves):
+        total += amplitude * value_noise(seed * 31 + octave, x0, y0, width, height, scale)
+        norm += amplitude
+        amplitude *= persistence
+        scale = max(1.0, scale / 2.0)
+    return total / norm
+
+
+def _field(seed, params, x0, y0, width, height):
+    salt, scale, octaves = params
+    values = fbm(seed * 1009 + salt, x0, y0, width, height, scale, octaves)
+    return np.clip((values - 0.5) * FIELD_CONTRAST + 0.5, 0.0, 1.0)
+
+
+def generate_region(seed, x0, y0, width, height):
+    """Generate a (height, width) uint8 array of biome ids for a block of tiles"""
+    elevation = _field(seed, ELEVATION_NOISE, x0, y0, width, height)
+    temperature = _field(seed, TEMPERATURE_NOISE, x0, y0, width, height)
+    moisture = _field(seed, MOISTURE_NOISE, x0, y0, width, height)
+    anomaly = _field(seed, ANOMALY_NOISE, x0, y0, width, height)
+
+    band = np.digitize(elevation, ELEVATION_BANDS)
+    temp = np.digitize(temperature, TEMPERATURE_LEVELS)
+    moist = np.digitize(moisture, MOISTURE_LEVELS)
+
+    biomes = BIOME_TABLE[band, temp, moist]
+    exotic = anomaly > ANOMALY_THRESHOLD
+    biomes[exotic] = ANOMALY_TABLE[band[exotic], temp[exotic]]
+    return biomes
+
+
+def generate_chunk(seed, cx, cy, chunk_tiles, width=None, height=None):
+    """Generate the biome ids of one chunk; depends only on (seed, cx, cy)"""
+    width = chunk_tiles if width is None else width
+    height = chunk_tiles if height is None else height
+    return generate_region(seed, cx * chunk_tiles, cy * chunk_tiles, width, height)
+
+
+def _generate_chunk_job(args):
+    seed, cx, cy, chunk_tiles = args
+    return (cx, cy), generate_chunk(seed, cx, cy, chunk_tiles)
+
+
+def generate_chunks(seed, coords, chunk_tiles, workers=None):
+    """
+    Generate many chunks, in a process pool when workers > 1.
+    Returns a dict mapping (cx, cy) to biome-id arrays.
+    """
+    jobs = [(seed, cx, cy, chunk_tiles) for cx, cy in coords]
+    if not workers or workers <= 1:
+        return dict(map(_generate_chunk_job, jobs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(_generate_chunk_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
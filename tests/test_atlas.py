@@ -0,0 +1,92 @@
+"""
+Tests for sprite atlas packing and lazy loading
+"""
+
+import os
+import tempfile
+import unittest
+
+from atlas import pack_rects
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+try:
+    import pygame
+    from atlas import Atlas, build_atlas
+except ImportError:  # pygame is optional for the console game
+    pygame = None
+
+
+class TestPackRects(unittest.TestCase):
+    """Test the shelf packer"""
+
+    def test_rects_do_not_overlap(self):
+        """Test packed rects stay on the sheet and never overlap"""
+        sizes = [(64, 64), (32, 32), (128, 128), (48, 20)] * 20
+        placements = pack_rects(sizes, sheet_size=512, padding=1)
+        rects = {}
+        for (w, h), (sheet, x, y) in zip(sizes, placements):
+            self.assertLessEqual(x + w, 512)
+            self.assertLessEqual(y + h, 512)
+            for ox, oy, ow, oh in rects.setdefault(sheet, []):
+                self.assertFalse(x < ox + ow and ox < x + w and y < oy + oh and oy < y + h)
+            rects[sheet].append((x, y, w, h))
+        self.assertGreater(len(rects), 1)
+
+    def test_oversized_sprite_rejected(self):
+        """Test a sprite larger than a sheet is an error"""
+        with self.assertRaises(ValueError):
+            pack_rects([(600, 10)], sheet_size=512)
+
+
+@unittest.skipIf(pygame is None, "pygame not installed")
+class TestAtlas(unittest.TestCase):
+    """Test building and lazily loading an atlas"""
+
+    def test_round_trip_and_lazy_sheets(self):
+        """Test sprites come back pixel-identical and sheets load on first use"""
+        with tempfile.TemporaryDirectory() as src:
+            os.makedirs(os.path.join(src, "creatures", "forest"))
+            os.makedirs(os.path.join(src, "berries"))
+            colors = {
+                "creatures/forest/wolf": (200, 10, 10, 255),
+                "creatures/forest/owl": (10, 200, 10, 128),
+                "berries/oran": (10, 10, 200, 255),
+            }
+            for name, color in colors.items():
+                img = pygame.Surface((40, 30), pygame.SRCALPHA)
+                img.fill(color)
+                pygame.image.save(img, os.path.join(src, *name.split("/")) + ".png")
+            out = os.path.join(src, "atlas")
+            build_atlas(src, out, sheet_size=64)
+            # packing again must not pick up the generated sheets
+            index = build_atlas(src, out, sheet_size=64)
+            self.assertEqual(set(index["sprites"]), set(colors))
+
+            atlas = Atlas.open(out)
+            self.assertEqual(atlas.names("creatures/"), ["creatures/forest/owl", "creatures/forest/wolf"])
+            self.assertEqual(atlas.sheets_loaded, 0)
+            wolf = atlas.get("creatures/forest/wolf")
+            self.assertEqual(atlas.sheets_loaded, 1)
+            self.assertEqual(wolf.get_size(), (40, 30))
+            self.assertEqual(tuple(wolf.get_at((39, 29))), colors["creatures/forest/wolf"])
+            self.assertIs(atlas.get("creatures/forest/wolf"), wolf)
+            self.assertIsNone(atlas.get("missing"))
+            self.assertIsNone(Atlas.open(os.path.join(src, "nowhere")))
+
+    def test_repack_removes_stale_sheets(self):
+        """Test sheets from an earlier, larger pack are deleted"""
+        with tempfile.TemporaryDirectory() as src:
+            for i in range(3):
+                img = pygame.Surface((40, 40), pygame.SRCALPHA)
+                img.fill((i * 80, 0, 0, 255))
+                pygame.image.save(img, os.path.join(src, f"sprite{i}.png"))
+            out = os.path.join(src, "atlas")
+            self.assertEqual(len(build_atlas(src, out, sheet_size=64)["sheets"]), 3)
+            index = build_atlas(src, out, sheet_size=128)
+            self.assertEqual(index["sheets"], ["atlas_0.png"])
+            self.assertEqual(sorted(os.listdir(out)), ["atlas.json", "atlas_0.png"])
+
+
+if __name__ == '__main__':
+    unittest.main()
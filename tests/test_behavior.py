@@ -0,0 +1,128 @@
+"""
+Tests for level-of-detail overworld creature behavior
+"""
+
+import unittest
+
+import numpy as np
+
+from behavior import (APPROACH, DEFEND, FAR_INTERVAL, FLEE, MID_INTERVAL, NEAR_RADIUS, SPEEDS, TEMPERAMENTS,
+                      WANDER, WATCH, BehaviorEngine)
+from config_loader import load_config
+from entities import EntityStore
+
+TILE = 48
+
+
+def engine_with(**overrides):
+    """An engine over an empty store, with some temperament parameters replaced"""
+    store = EntityStore()
+    engine = BehaviorEngine(store, TILE, rng=np.random.default_rng(0))
+    engine.params = dict(engine.params)
+    for key, value in overrides.items():
+        engine.params[key] = np.full(len(TEMPERAMENTS), value)
+    return store, engine
+
+
+class TestBehavior(unittest.TestCase):
+    """Test reactions to the player and to lures"""
+
+    def test_temperaments_come_from_config(self):
+        """Test the temperaments are the config's behavior_modifiers"""
+        self.assertEqual(TEMPERAMENTS, list(load_config("capture_probabilities")["behavior_modifiers"]))
+
+    def test_flee_from_player(self):
+        """Test a creature that rolls to flee runs directly away from the player"""
+        store, engine = engine_with(flee_chance=1.0, confronts=False)
+        e = store.spawn(100, 0, 0, vx=10, temperament=0)
+        engine.update(1 / 60, 0, 0, tick=1)
+        self.assertEqual(store.state[e], FLEE)
+        self.assertGreater(store.vel[e, 0], 0)
+        self.assertAlmostEqual(float(np.hypot(*store.vel[e])), SPEEDS[FLEE], places=3)
+
+    def test_watch_rolls_only_once(self):
+        """Test a creature that stays calm keeps watching instead of re-rolling each tick"""
+        store, engine = engine_with(flee_chance=0.0, defend_chance=0.0, confronts=False)
+        e = store.spawn(100, 0, 0, temperament=0)
+        engine.update(1 / 60, 0, 0, tick=1)
+        self.assertEqual(store.state[e], WATCH)
+        engine.params["flee_chance"][:] = 1.0
+        engine.update(1 / 60, 0, 0, tick=2)
+        self.assertEqual(store.state[e], WATCH)
+        # the player leaving range calms it down
+        engine.update(1 / 60, 100, 350, tick=3)
+        self.assertEqual(store.state[e], WANDER)
+
+    def test_defend_territory(self):
+        """Test a territorial creature moves at a player inside its territory"""
+        store, engine = engine_with(flee_chance=0.0, defend_chance=1.0, confronts=False)
+        e = store.spawn(0, 100, 0, temperament=0)
+        engine.update(1 / 60, 0, 0, tick=1)
+        self.assertEqual(store.state[e], DEFEND)
+        self.assertLess(store.vel[e, 1], 0)
+
+    def test_calming_lure_prevents_fleeing(self):
+        """Test a fully calming lure in reach keeps a creature from fleeing"""
+        store, engine = engine_with(flee_chance=1.0, defend_chance=0.0, confronts=False)
+        e = store.spawn(100, 0, 0, temperament=0)
+        engine.set_lures([(100, 50)], [200], calm=[1.0])
+        engine.update(1 / 60, 0, 0, tick=1)
+        self.assertEqual(store.state[e], WATCH)
+
+    def test_lure_attracts_and_holds(self):
+        """Test a creature in reach of a lure walks to it and stops there"""
+        store, engine = engine_with(berry_effectiveness=100.0)
+        e = store.spawn(1000, 1000, 0, temperament=0)
+        engine.set_lures([(1000, 1100)], [300])
+        for tick in range(1, 200):
+            engine.update(1 / 60, 1000, 630, tick)  # close by, but outside detection range
+            store.move(1 / 60, 10000, 10000)
+        self.assertEqual(store.state[e], APPROACH)
+        self.assertLess(abs(store.pos[e, 1] - 1100), 10)
+        self.assertEqual(tuple(store.vel[e]), (0.0, 0.0))
+
+    def test_lure_pull_follows_preference(self):
+        """Test only creatures whose temperament likes a lure are drawn to it"""
+        store, engine = engine_with(berry_effectiveness=100.0)
+        liked = store.spawn(1000, 1000, 0, temperament=0)
+        ignored = store.spawn(1010, 1000, 0, temperament=1)
+        preference = np.ones((1, len(TEMPERAMENTS)))
+        preference[0, 1] = 0.0
+        engine.set_lures([(1000, 1100)], [300], preference=preference)
+        for tick in range(1, 60):
+            engine.update(1 / 60, 1000, 630, tick)
+        self.assertEqual(store.state[liked], APPROACH)
+        self.assertNotEqual(store.state[ignored], APPROACH)
+
+
+class TestLevelOfDetail(unittest.TestCase):
+    """Test how often creatures at each distance are updated"""
+
+    def test_update_rates_by_distance(self):
+        """Test near creatures update every tick, mid every few ticks, far in one batch"""
+        store, engine = engine_with()
+        for i in range(8):
+            store.spawn(2 * TILE, i, 0)  # near
+            store.spawn((NEAR_RADIUS + 2) * TILE, i, 0)  # mid
+            store.spawn(100 * TILE, i, 0)  # far
+        counts = {"near": 0, "mid": 0, "far": 0}
+        for tick in range(1, FAR_INTERVAL * 2 + 1):
+            engine.update(1 / 60, 0, 0, tick)
+            for key in counts:
+                counts[key] += engine.updated[key]
+        ticks = FAR_INTERVAL * 2
+        self.assertEqual(counts["near"], 8 * ticks)
+        self.assertEqual(counts["mid"], 8 * ticks // MID_INTERVAL)
+        self.assertEqual(counts["far"], 8 * 2)
+
+    def test_far_update_forgets_reactions(self):
+        """Test the aggregate far update returns creatures to wandering at wander speed"""
+        store, engine = engine_with()
+        e = store.spawn(100 * TILE, 0, 0, vx=SPEEDS[FLEE], state=FLEE)
+        engine.update(1 / 60, 0, 0, tick=FAR_INTERVAL)
+        self.assertEqual(store.state[e], WANDER)
+        self.assertAlmostEqual(float(np.hypot(*store.vel[e])), SPEEDS[WANDER], places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Tests for the event-queue berry farm
+"""
+
+import random
+import unittest
+
+from berry_farm import RIPE, SEEDED, SPROUTED, BerryFarm, load_mutations, parse_yield
+
+
+class FixedRandom(random.Random):
+    """A Random whose random() always returns the same value"""
+
+    def __init__(self, value):
+        super().__init__(0)
+        self.value = value
+
+    def random(self):
+        return self.value
+
+
+class TestBerryFarm(unittest.TestCase):
+    """Test growth timing, watering, harvests, festivals and mutations"""
+
+    def setUp(self):
+        self.farm = BerryFarm(4, 3, rng=random.Random(1))
+
+    def test_parse_yield(self):
+        """Test yield ranges and single numbers from the config"""
+        self.assertEqual(parse_yield("1-3"), (1, 3))
+        self.assertEqual(parse_yield(4), (4, 4))
+
+    def test_stages_follow_growth_time(self):
+        """Test an oran berry (24 h) sprouts, flowers and ripens on schedule"""
+        plot = self.farm.plant(0, 0, "oran_berry", now=100.0)
+        self.assertEqual(self.farm.advance(105.9), [])
+        self.assertEqual(plot.stage, SEEDED)
+        self.assertEqual(self.farm.advance(106.0), [(106.0, 0, 0, "sprout")])
+        self.assertEqual(plot.stage, SPROUTED)
+        events = self.farm.advance(1000.0)
+        self.assertEqual([(round(h, 6), e) for h, _, _, e in events], [(112.0, "flower"), (124.0, "ripen")])
+        self.assertEqual(plot.stage, RIPE)
+        self.assertEqual(len(self.farm), 0)
+
+    def test_soil_and_fertilizer_speed_growth(self):
+        """Test rich soil and fertilizer shorten the growth time"""
+        self.farm.plant(0, 0, "oran_berry", now=0.0, soil="rich_soil", fertilizer="basic_fertilizer")
+        ripe = [h for h, _, _, e in self.farm.advance(100.0) if e == "ripen"]
+        self.assertAlmostEqual(ripe[0], 24 * 0.8 * 0.8)
+
+    def test_watering_speeds_growth_until_dry(self):
+        """Test a watered plot grows faster for frequency_hours, then dries out"""
+        plot = self.farm.plant(1, 1, "oran_berry", now=0.0)
+        self.farm.water(1, 1, now=0.0)
+        events = self.farm.advance(100.0)
+        self.assertIn((12.0, 1, 1, "dry"), events)
+        ripe = [h for h, _, _, e in events if e == "ripen"][0]
+        self.assertAlmostEqual(ripe, 12.0 + (1.0 - 12 * 1.15 / 24) * 24)
+        self.assertEqual(plot.stage, RIPE)
+
+    def test_only_due_events_are_processed(self):
+        """Test advancing pops only what is due, skipping superseded entries"""
+        for plot in self.farm.plots:
+            self.farm.plant(plot.x, plot.y, "razz_berry", now=0.0)
+        self.farm.advance(1.0)
+        self.assertEqual(self.farm.processed, 0)
+        for _ in range(3):
+            self.farm.water(0, 0, now=1.0)  # each watering supersedes the last one's events
+        events = self.farm.advance(500.0)
+        self.assertEqual(sum(1 for e in events if e[3] == "ripen"), 12)
+        self.assertEqual([e[0] for e in events], sorted(e[0] for e in events))
+        self.assertGreater(self.farm.processed, len(events))
+
+    def test_harvest_and_festival(self):
+        """Test harvests yield the soil's range, doubled during the festival, which also halves growth"""
+        self.farm.set_festival("berry_festival", now=0.0)
+        self.farm.plant(0, 0, "oran_berry", now=0.0)
+        self.assertIsNone(self.farm.harvest(0, 0))
+        ripe = [h for h, _, _, e in self.farm.advance(100.0) if e == "ripen"]
+        self.assertAlmostEqual(ripe[0], 12.0)
+        berry, amount = self.farm.harvest(0, 0)
+        self.assertEqual(berry, "oran_berry")
+        self.assertIn(amount, (2, 4, 6))
+        self.farm.plant(0, 0, "oran_berry", now=100.0)  # the plot is free again
+
+    def test_festival_change_reschedules_growing_plots(self):
+        """Test a festival starting mid-growth speeds up the rest of it"""
+        self.farm.plant(0, 0, "oran_berry", now=0.0)
+        self.farm.advance(12.0)
+        self.farm.set_festival("berry_festival", now=12.0)
+        ripe = [h for h, _, _, e in self.farm.advance(100.0) if e == "ripen"]
+        self.assertAlmostEqual(ripe[0], 18.0)
+
+    def test_mutation_between_neighbours(self):
+        """Test oran next to sitrus can flower into a leppa berry"""
+        farm = BerryFarm(3, 1, rng=FixedRandom(0.0))
+        farm.plant(0, 0, "oran_berry", now=0.0)
+        farm.plant(1, 0, "sitrus_berry", now=0.0)
+        farm.plant(2, 0, "golden_razz_berry", now=0.0)
+        events = farm.advance(20.0)
+        self.assertIn("mutate", [e for _, x, _, e in events if x in (0, 1)])
+        self.assertEqual(farm.plot(0, 0).berry, "leppa_berry")
+
+    def test_mutation_requirements(self):
+        """Test a mutation that needs miracle soil never happens in basic soil"""
+        farm = BerryFarm(2, 1, rng=FixedRandom(0.0))
+        farm.plant(0, 0, "golden_razz_berry", now=0.0)
+        farm.plant(1, 0, "lum_berry", now=0.0)
+        events = farm.advance(1000.0)
+        self.assertNotIn("mutate", [e for _, _, _, e in events])
+        self.assertEqual(farm.plot(0, 0).stage, RIPE)
+
+    def test_required_mutation_happens(self):
+        """Test a mutation that needs miracle soil happens once the plot has it"""
+        farm = BerryFarm(2, 1, rng=FixedRandom(0.0))
+        farm.plant(0, 0, "golden_razz_berry", now=0.0, soil="miracle_soil")
+        farm.plant(1, 0, "lum_berry", now=0.0)
+        events = farm.advance(1000.0)
+        self.assertIn("mutate", [e for _, x, _, e in events if x == 0])
+        self.assertEqual(farm.plot(0, 0).berry, "enigma_berry")
+
+    def test_unknown_requirement_refused(self):
+        """Test a mutation requiring something that is no soil, fertilizer or event is a config error"""
+        mutations = {"oran_x_sitrus": {"result": "leppa_berry", "chance": 0.5, "requires": "moon_dust"}}
+        with self.assertRaises(ValueError):
+            load_mutations(["oran_berry", "sitrus_berry"], mutations, {"basic_soil"})
+
+    def test_planting_rules(self):
+        """Test occupied plots and unplantable berries are refused"""
+        self.farm.plant(0, 0, "oran_berry", now=0.0)
+        with self.assertRaises(ValueError):
+            self.farm.plant(0, 0, "razz_berry", now=0.0)
+        with self.assertRaises(ValueError):
+            self.farm.plant(1, 0, "enigma_berry", now=0.0)
+        self.assertFalse(self.farm.water(2, 2, now=0.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Tests for the berry lure influence field
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+from behavior import TEMPERAMENTS
+from berry_lures import BERRIES, BERRY_PARAMS, COMBO_MULTIPLIERS, LureField, combo_table
+from config_loader import load_config
+from simulation import Overworld, new_headless_game
+from world import World
+
+
+def bits(*names):
+    return sum(1 << BERRIES.index(name) for name in names)
+
+
+class TestComboTable(unittest.TestCase):
+    """Test combination lookups by bitmask"""
+
+    def test_full_sets_match(self):
+        """Test a combination applies only when all its berries are present"""
+        self.assertAlmostEqual(COMBO_MULTIPLIERS[bits("oran_berry", "sitrus_berry", "pomeg_berry")], 1.35, places=5)
+        self.assertEqual(COMBO_MULTIPLIERS[bits("oran_berry", "sitrus_berry")], 1.0)
+        self.assertAlmostEqual(COMBO_MULTIPLIERS[bits("figy_berry", "razz_berry", "oran_berry")], 1.45, places=5)
+        self.assertEqual(COMBO_MULTIPLIERS[0], 1.0)
+
+    def test_best_combination_wins(self):
+        """Test overlapping combinations give the largest multiplier"""
+        names = ["a", "b", "c"]
+        table = combo_table(names, {"x": {"berries": ["a", "b"], "effectiveness_multiplier": 1.5},
+                                    "y": {"berries": ["b", "c"], "effectiveness_multiplier": 2.0}})
+        self.assertEqual(list(table), [1.0, 1.0, 1.0, 1.5, 1.0, 1.0, 2.0, 2.0])
+
+
+class TestLureField(unittest.TestCase):
+    """Test incremental updates of the influence field"""
+
+    def test_boost_inside_radius_only(self):
+        """Test a berry boosts spawns in its radius and nowhere else"""
+        field = LureField(100, 100)
+        field.place(50, 50, "razz_berry", now=8.0)
+        self.assertAlmostEqual(field.spawn_multiplier(50, 50), 1.3, places=5)
+        self.assertAlmostEqual(field.spawn_multiplier(50 + 20, 50), 1.3, places=5)
+        self.assertEqual(field.spawn_multiplier(50 + 30, 50), 1.0)
+        self.assertEqual(field.capture_multiplier(50, 50), 1.0)
+
+    def test_incremental_matches_rebuild(self):
+        """Test placing and expiring berries leaves the same field as building it from scratch"""
+        rng = random.Random(2)
+        field = LureField(120, 90)
+        for _ in range(60):
+            field.place(rng.randrange(120), rng.randrange(90), rng.choice(BERRIES), now=rng.uniform(0, 1))
+        expired = field.expire(1.05)
+        self.assertGreater(len(expired), 0)
+        self.assertEqual(len(field) + len(expired), 60)
+
+        rebuilt = LureField(120, 90)
+        for tx, ty, k, expiry in field.berries.values():
+            rebuilt.place(tx, ty, BERRIES[k], expiry - BERRY_PARAMS["minutes"][k] / 60.0)
+        np.testing.assert_array_equal(field.counts, rebuilt.counts)
+        np.testing.assert_array_equal(field.mask, rebuilt.mask)
+        np.testing.assert_allclose(field.spawn, rebuilt.spawn, atol=1e-5)
+        np.testing.assert_allclose(field.capture, rebuilt.capture, atol=1e-5)
+        np.testing.assert_allclose(field.calm, rebuilt.calm, atol=1e-5)
+
+    def test_expire_everything_clears_the_field(self):
+        """Test the field returns to neutral once every berry has run out"""
+        field = LureField(64, 64)
+        for i, name in enumerate(BERRIES):
+            field.place(i * 4, 32, name, now=0.0)
+        field.expire(24.0)
+        self.assertEqual(len(field), 0)
+        self.assertFalse(field.counts.any())
+        self.assertTrue((field.spawn == 1.0).all() and (field.capture == 1.0).all())
+        self.assertFalse(field.calm.any())
+
+    def test_combo_multiplies_boosts(self):
+        """Test berries of a combination together multiply the cell's boosts"""
+        field = LureField(64, 64)
+        field.place(30, 30, "figy_berry", now=0.0)
+        field.place(31, 30, "razz_berry", now=0.0)
+        spawn = 1.0 + BERRY_PARAMS["spawn"][BERRIES.index("figy_berry")] + 0.3
+        self.assertAlmostEqual(field.spawn_multiplier(30, 30), spawn * 1.45, places=5)
+        spawn_boost, capture_boost = field.boosts(np.array([[30, 30], [0, 63]]))
+        self.assertAlmostEqual(float(capture_boost[0]), 1.45, places=5)
+        self.assertEqual(float(spawn_boost[1]), 1.0)
+
+    def test_lures_carry_temperament_preferences(self):
+        """Test each lure handed to creature behavior carries its berry's preferences by temperament"""
+        field = LureField(64, 64)
+        field.place(10, 10, "oran_berry", now=0.0)
+        _, _, _, preference = field.lures(16)
+        config = load_config("berry_types")["berries"]["oran_berry"]["creature_preferences"]
+        self.assertEqual(preference.shape, (1, len(TEMPERAMENTS)))
+        self.assertEqual(preference[0, TEMPERAMENTS.index("skittish")], config["skittish"])
+
+
+class TestOverworldLures(unittest.TestCase):
+    """Test berries put out in the overworld"""
+
+    def test_berry_boosts_encounters_until_it_expires(self):
+        """Test a berry raises the encounter rate and lures creatures until it runs out"""
+        game = new_headless_game()
+        game.current_location = "Forest Path"
+        overworld = Overworld(game, World(40, 30, seed=2), 16, rng=random.Random(4))
+        base = overworld.encounter_rate()
+        berry = overworld.place_berry("golden_razz_berry")
+        self.assertGreater(overworld.encounter_rate(), base)
+        self.assertAlmostEqual(overworld.capture_modifier(), 1.5, places=5)
+        self.assertEqual(len(overworld.behavior.lure_pos), 1)
+
+        events = []
+        for _ in range(int(15 / 60 * 30 * 60) + 2):  # 15 game minutes at 30 s per hour
+            events.extend(overworld.step())
+        self.assertIn(("berry_expired", berry), events)
+        self.assertEqual(len(overworld.behavior.lure_pos), 0)
+        self.assertEqual(overworld.encounter_rate(), base)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Tests for breeding, inheritance and the pedigree
+"""
+
+import copy
+import itertools
+import random
+import unittest
+
+import numpy as np
+
+from breeding import (HATCH_LEVEL, INBREEDING_DEPRESSION, MAX_MOVES, Breeder, Pedigree, genome_of, hybrid_name,
+                      inherit, inherit_moves)
+from creature import STARTER_CREATURES, WILD_SPECIES, Creature, CreatureType, Move
+
+
+class FixedRandom(random.Random):
+    """A Random whose random() always returns the same value"""
+
+    def __init__(self, value):
+        super().__init__(0)
+        self.value = value
+
+    def random(self):
+        return self.value
+
+
+class TestPedigree(unittest.TestCase):
+    """Test kinship and inbreeding coefficients on known pedigrees"""
+
+    def setUp(self):
+        self.pedigree = Pedigree()
+        p = self.pedigree
+        self.a, self.b, self.x = p.add(), p.add(), p.add()
+        self.c = p.add(self.a, self.b)
+        self.d = p.add(self.a, self.b)
+        self.half = p.add(self.a, self.x)
+        self.e = p.add(self.c, self.d)
+
+    def test_kinship_coefficients(self):
+        """Test the textbook values for selves, parents, full and half siblings"""
+        p = self.pedigree
+        self.assertEqual(p.kinship(self.a, self.a), 0.5)
+        self.assertEqual(p.kinship(self.a, self.b), 0.0)
+        self.assertEqual(p.kinship(self.a, self.c), 0.25)
+        self.assertEqual(p.kinship(self.c, self.d), 0.25)
+        self.assertEqual(p.kinship(self.c, self.half), 0.125)
+        self.assertEqual(p.kinship(self.d, self.c), p.kinship(self.c, self.d))
+
+    def test_inbreeding_and_ancestors(self):
+        """Test offspring of full siblings are inbred and know all their ancestors"""
+        p = self.pedigree
+        self.assertEqual(p.inbreeding(self.e), 0.25)
+        self.assertEqual(p.inbreeding(self.c), 0.0)
+        self.assertEqual(p.kinship(self.e, self.e), 0.625)
+        self.assertEqual(p.ancestors(self.e), {self.a, self.b, self.c, self.d})
+        self.assertEqual(p.ancestors(self.a), frozenset())
+
+    def test_kinship_matches_definition(self):
+        """Test kinship kept at registration agrees with the recursive definition on a random pedigree"""
+        rng = random.Random(8)
+        p = Pedigree(capacity=2)
+        for _ in range(30):
+            p.add()
+        for _ in range(60):
+            n = len(p)
+            p.add(rng.randrange(n), rng.randrange(n))
+
+        def reference(a, b):
+            if a == b:
+                parents = p.parents[a]
+                return 0.5 * (1.0 + (0.0 if parents is None else reference(*parents)))
+            if a < b:
+                a, b = b, a
+            if p.parents[a] is None:
+                return 0.0
+            mother, father = p.parents[a]
+            return 0.5 * (reference(mother, b) + reference(father, b))
+
+        members = rng.sample(range(len(p)), 20)
+        matrix = p.kinship_matrix(members)
+        for i, a in enumerate(members):
+            for j, b in enumerate(members):
+                self.assertAlmostEqual(matrix[i, j], reference(a, b))
+                self.assertEqual(matrix[i, j], p.kinship(a, b))
+
+    def test_only_bred_creatures_take_table_rows(self):
+        """Test founders that never bred stay out of the kinship table"""
+        p = Pedigree()
+        loners = [p.add() for _ in range(500)]
+        a, b = p.add(), p.add()
+        child = p.add(a, b)
+        self.assertEqual(p.size, 3)
+        self.assertEqual(p.kinship(loners[0], loners[0]), 0.5)
+        self.assertEqual(p.kinship(loners[0], child), 0.0)
+        self.assertEqual(p.kinship_matrix([loners[1], a, child])[1, 2], 0.25)
+
+    def test_deep_pedigree_does_not_recurse(self):
+        """Test thousands of generations of close inbreeding need no recursion"""
+        p = Pedigree()
+        a, b = p.add(), p.add()
+        for _ in range(2000):
+            a, b = b, p.add(a, b)
+        self.assertEqual(len(p.ancestors(b)), 2001)
+        self.assertGreater(p.inbreeding(b), 0.99)
+
+    def test_parents_must_come_in_pairs(self):
+        """Test a single parent is refused"""
+        with self.assertRaises(ValueError):
+            self.pedigree.add(self.a)
+
+
+class TestInheritance(unittest.TestCase):
+    """Test vectorized gene and move inheritance"""
+
+    def test_default_stats_give_average_genes(self):
+        """Test a creature with default stats has genes of 1"""
+        np.testing.assert_allclose(genome_of(Creature("Blob", CreatureType.NORMAL, level=12)), 1.0)
+
+    def test_offspring_genes_center_on_the_parents(self):
+        """Test many offspring average the parents' genes, less inbreeding depression"""
+        rng = np.random.default_rng(0)
+        n = 20000
+        mother = np.tile([1.2, 0.8, 1.0, 1.4], (n, 1))
+        father = np.tile([0.8, 1.0, 1.0, 1.0], (n, 1))
+        inbreeding = np.r_[np.zeros(n // 2), np.full(n // 2, 0.25)]
+        genes = inherit(mother, father, inbreeding, rng)
+        expected = (mother[0] + father[0]) / 2
+        np.testing.assert_allclose(genes[:n // 2].mean(axis=0), expected, atol=0.01)
+        np.testing.assert_allclose(genes[n // 2:].mean(axis=0), expected * (1 - INBREEDING_DEPRESSION * 0.25),
+                                   atol=0.01)
+
+    def test_moves_prefer_shared_then_strong(self):
+        """Test shared moves come first and the list is capped"""
+        mother = Creature("M", CreatureType.FIRE, moves=[Move("Tackle", CreatureType.NORMAL, 40),
+                                                         Move("Ember", CreatureType.FIRE, 40),
+                                                         Move("Flare", CreatureType.FIRE, 90)])
+        father = Creature("F", CreatureType.WATER, moves=[Move("Tackle", CreatureType.NORMAL, 40),
+                                                          Move("Surf", CreatureType.WATER, 90),
+                                                          Move("Bubble", CreatureType.WATER, 20)])
+        names = [m.name for m in inherit_moves(mother, father)]
+        self.assertEqual(len(names), MAX_MOVES)
+        self.assertEqual(names[0], "Tackle")
+        self.assertEqual(set(names[1:3]), {"Flare", "Surf"})
+
+
+class TestBreeder(unittest.TestCase):
+    """Test breeding creatures and ranking pairings"""
+
+    def setUp(self):
+        self.breeder = Breeder(np.random.default_rng(1), FixedRandom(0.9))
+        self.flamepup = copy.deepcopy(STARTER_CREATURES["Flamepup"])
+        self.aquatail = copy.deepcopy(STARTER_CREATURES["Aquatail"])
+
+    def test_breed_registers_offspring(self):
+        """Test an offspring hatches at HATCH_LEVEL, takes a parent's type and joins the pedigree"""
+        child = self.breeder.breed(self.flamepup, self.aquatail)
+        self.assertEqual(child.level, HATCH_LEVEL)
+        self.assertEqual((child.name, child.type), ("Flamepup", CreatureType.FIRE))
+        member = self.breeder.ids[id(child)]
+        self.assertEqual(self.breeder.pedigree.parents[member],
+                         (self.breeder.ids[id(self.flamepup)], self.breeder.ids[id(self.aquatail)]))
+        with self.assertRaises(ValueError):
+            self.breeder.breed(child, child)
+
+    def test_hybrid_of_two_species(self):
+        """Test crossing species can give a hybrid named after both"""
+        breeder = Breeder(np.random.default_rng(1), FixedRandom(0.0))
+        child = breeder.breed(self.flamepup, self.aquatail)
+        self.assertEqual(child.name, hybrid_name("Flamepup", "Aquatail"))
+        self.assertEqual(child.name, "Flamtail")
+        self.assertEqual(child.type, CreatureType.WATER)
+
+    def test_rank_pairings_matches_brute_force(self):
+        """Test the ranking equals scoring each pair on its own, inbred pairs penalized"""
+        creatures = [s.create(random.Random(i)) for i, s in enumerate(WILD_SPECIES * 5)]
+        creatures.append(self.breeder.breed(creatures[0], creatures[1]))
+        creatures.append(self.breeder.breed(creatures[0], creatures[1]))
+        ranked = self.breeder.rank_pairings(creatures, top=len(creatures) ** 2)
+        self.assertEqual(len(ranked), len(creatures) * (len(creatures) - 1) // 2)
+
+        def score(a, b):
+            ia, ib = self.breeder.ids[id(a)], self.breeder.ids[id(b)]
+            kinship = self.breeder.pedigree.kinship(ia, ib)
+            return 0.5 * (self.breeder.genes[ia].sum() + self.breeder.genes[ib].sum()) * (
+                1 - INBREEDING_DEPRESSION * kinship)
+
+        brute = sorted((score(a, b) for a, b in itertools.combinations(creatures, 2)), reverse=True)
+        np.testing.assert_allclose([s for s, _, _ in ranked], brute)
+        top = self.breeder.rank_pairings(creatures, top=3)
+        self.assertEqual([s for s, _, _ in top], [s for s, _, _ in ranked[:3]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Tests for precomputed wild encounter spawn pools
+"""
+
+import random
+import unittest
+
+from creature import WILD_SPECIES
+from encounters import (EncounterScheduler, EncounterService, SpawnPool, TILE_HABITAT_TYPES, HABITAT_WEIGHT,
+                        steps_until_encounter)
+from terrain import BIOMES
+
+
+class TestSpawnPool(unittest.TestCase):
+    """Test weighted species pools"""
+
+    def test_probabilities_follow_weights(self):
+        """Test each species' chance is its weight over the total"""
+        pool = SpawnPool(WILD_SPECIES, [1, 2, 3, 4])
+        self.assertAlmostEqual(pool.probability("Rockbug"), 0.1)
+        self.assertAlmostEqual(pool.probability("Windbird"), 0.4)
+
+    def test_sample_frequencies(self):
+        """Test sampled species frequencies match the pool probabilities"""
+        pool = SpawnPool(WILD_SPECIES, [1, 1, 1, 5])
+        rng = random.Random(3)
+        draws = [pool.sample(rng).name for _ in range(8000)]
+        self.assertAlmostEqual(draws.count("Windbird") / len(draws), 5 / 8, delta=0.03)
+
+
+class TestEncounterService(unittest.TestCase):
+    """Test per-tile pools and spawning"""
+
+    def setUp(self):
+        self.service = EncounterService()
+
+    def test_pool_per_tile(self):
+        """Test every biome has a pool that favors its habitat types"""
+        self.assertEqual(len(self.service.tile_pools), len(BIOMES))
+        for tile, preferred in enumerate(TILE_HABITAT_TYPES):
+            pool = self.service.pool(tile)
+            for species, weight in zip(pool.species, pool.weights):
+                self.assertEqual(weight, HABITAT_WEIGHT if species.type in preferred else 1.0)
+
+    def test_tiles_with_same_habitat_share_a_pool(self):
+        """Test pools are built once per distinct habitat"""
+        distinct = {tuple(sorted(p)) for p in TILE_HABITAT_TYPES}
+        self.assertEqual(len({id(p) for p in self.service.tile_pools}), len(distinct))
+
+    def test_spawn_is_deterministic_with_seeded_rng(self):
+        """Test the same seed spawns the same creatures"""
+        first = [self.service.spawn(0, random.Random(9)) for _ in range(3)]
+        second = [self.service.spawn(0, random.Random(9)) for _ in range(3)]
+        self.assertEqual([(c.name, c.level) for c in first], [(c.name, c.level) for c in second])
+
+    def test_spawn_levels_in_species_range(self):
+        """Test spawned creatures are within their species' level range"""
+        ranges = {s.name: (s.min_level, s.max_level) for s in WILD_SPECIES}
+        rng = random.Random(1)
+        for _ in range(200):
+            creature = self.service.spawn(None, rng)
+            low, high = ranges[creature.name]
+            self.assertTrue(low <= creature.level <= high)
+
+
+class CountingRandom(random.Random):
+    """A seeded RNG that counts calls to random()"""
+
+    calls = 0
+
+    def random(self):
+        self.calls += 1
+        return super().random()
+
+
+class TestEncounterScheduler(unittest.TestCase):
+    """Test geometric step scheduling of encounters"""
+
+    def test_mean_steps_matches_rate(self):
+        """Test the mean countdown is 1 / rate, as for per-step rolls"""
+        rng = random.Random(4)
+        samples = [steps_until_encounter(0.2, rng) for _ in range(20000)]
+        self.assertGreaterEqual(min(samples), 1)
+        self.assertAlmostEqual(sum(samples) / len(samples), 5.0, delta=0.15)
+
+    def test_impossible_and_certain_rates(self):
+        """Test a zero rate never schedules and a rate of one triggers every step"""
+        self.assertIsNone(steps_until_encounter(0.0))
+        self.assertEqual(steps_until_encounter(1.0), 1)
+        schedule = EncounterScheduler(random.Random(1), 0.0)
+        self.assertFalse(any(schedule.step() for _ in range(100)))
+
+    def test_encounter_frequency(self):
+        """Test the long-run fraction of steps with an encounter equals the rate"""
+        schedule = EncounterScheduler(random.Random(8), 0.1)
+        hits = sum(schedule.step() for _ in range(50000))
+        self.assertAlmostEqual(hits / 50000, 0.1, delta=0.01)
+
+    def test_one_draw_per_encounter(self):
+        """Test random numbers are only drawn when an encounter happens or the rate changes"""
+        rng = CountingRandom(2)
+        schedule = EncounterScheduler(rng, 0.05)
+        hits = sum(schedule.step() for _ in range(1000))
+        self.assertEqual(rng.calls, hits + 1)
+        schedule.set_rate(0.05)
+        self.assertEqual(rng.calls, hits + 1)
+        schedule.set_rate(0.2)
+        self.assertEqual(rng.calls, hits + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Tests for the encyclopedia index and its search
+"""
+
+import unittest
+
+from config_loader import load_config
+from encyclopedia import ENVIRONMENT_TYPES, PREFERRED, bits, compile_entries, encyclopedia, words
+
+
+def brute_force(entries, rarity=None, creature_type=None, time=None, weather=None):
+    """Names of the entries matching the filters, found by checking every entry"""
+    return [e.name for e in entries
+            if (rarity is None or e.rarity == rarity) and (creature_type is None or e.type == creature_type)
+            and (time is None or time in e.times) and (weather is None or weather in e.weathers)]
+
+
+class TestEncyclopedia(unittest.TestCase):
+    """Test compiling entries and answering searches from the index"""
+
+    def setUp(self):
+        self.book = encyclopedia()
+        self.spawns = load_config("creature_spawns")
+
+    def test_every_spawn_creature_has_one_entry(self):
+        """Each creature of the spawn config gets exactly one entry with all its environments"""
+        environments = {}
+        for environment, table in self.spawns["environments"].items():
+            for creature in table.get("creatures", []):
+                environments.setdefault(creature["name"], []).append(environment)
+        self.assertEqual([e.name for e in self.book.entries], sorted(environments))
+        for entry in self.book.entries:
+            self.assertEqual(entry.environments, environments[entry.name])
+            self.assertEqual(entry.type, ENVIRONMENT_TYPES[entry.environments[0]])
+            self.assertEqual(len(entry.best_traps), 3)
+
+    def test_preferences_come_from_modifiers(self):
+        """An entry prefers a time or weather when its modifier reaches PREFERRED"""
+        by_name = {e.name: e for e in self.book.entries}
+        for environment, table in self.spawns["environments"].items():
+            for creature in table.get("creatures", []):
+                entry = by_name[creature["name"]]
+                for period, modifier in creature.get("time_modifiers", {}).items():
+                    if modifier >= PREFERRED:
+                        self.assertIn(period, entry.times)
+
+    def test_facet_query_matches_brute_force(self):
+        """Natural language facet queries give what checking every entry gives"""
+        entries = self.book.entries
+        cases = [
+            ("rare water creatures active at dusk in rain", dict(rarity="rare", creature_type="water",
+                                                                  time="dusk", weather="rainy")),
+            ("legendary", dict(rarity="legendary")),
+            ("fire at night", dict(creature_type="fire", time="night")),
+            ("common creatures in the morning", dict(rarity="common", time="dawn")),
+        ]
+        for query, filters in cases:
+            self.assertEqual([e.name for e in self.book.search(query)], brute_force(entries, **filters), query)
+        self.assertTrue(self.book.search("rare water creatures active at dusk in rain"))
+
+    def test_values_of_one_facet_are_alternatives(self):
+        """Two rarities in one query match either, while different facets narrow"""
+        either = {e.name for e in self.book.search("rare legendary")}
+        self.assertEqual(either, {e.name for e in self.book.entries if e.rarity in ("rare", "legendary")})
+        self.assertEqual(self.book.search("rare legendary water"),
+                         [e for e in self.book.search("water") if e.name in either])
+
+    def test_multi_word_facet_values(self):
+        """Each word of a value such as crystal_caves selects that value, as does the whole phrase"""
+        for value, phrase in [("crystal_caves", "crystal caves"), ("floating_islands", "floating islands")]:
+            expected = [e for e in self.book.entries if value in e.environments]
+            self.assertTrue(expected)
+            self.assertLess(len(expected), len(self.book))
+            for query in (phrase, phrase.split()[0], phrase.split()[1]):
+                self.assertEqual(self.book.search(query), expected, query)
+            self.assertEqual(self.book.search(environment=phrase), expected)
+        ash = [e for e in self.book.entries if "ash_fall" in e.weathers]
+        self.assertEqual(self.book.search("ash fall"), ash)
+
+    def test_unknown_filter_value_matches_nothing(self):
+        """A keyword filter on a value no entry has gives no results rather than no filter"""
+        self.assertEqual(self.book.search(type="dragon"), [])
+        self.assertEqual(self.book.search("water", rarity="mythical"), [])
+
+    def test_keyword_filters_match_query_words(self):
+        """Facet filters given as keywords select the same entries as query words"""
+        self.assertEqual(self.book.search(rarity="rare", weather="rain"), self.book.search("rare rain"))
+
+    def test_prefixes_while_typing(self):
+        """Each prefix of a name finds that creature, and the full name narrows to it"""
+        entry = self.book.entries[0]
+        name = words(entry.name)[0]
+        for end in range(1, len(name) + 1):
+            self.assertIn(entry, self.book.search(name[:end]))
+        self.assertEqual(self.book.search(entry.name)[0], entry)
+
+    def test_unknown_word_matches_nothing(self):
+        """A word in no entry empties the result, and an empty query lists everything"""
+        self.assertEqual(self.book.search("zzzz"), [])
+        self.assertEqual(len(self.book.search("")), len(self.book))
+        self.assertEqual(len(self.book.search("the")), len(self.book))
+
+    def test_trap_words_are_searchable(self):
+        """Trapping tips are indexed, so searching a trap finds the creatures it suits"""
+        suited = [e for e in self.book.entries if "inferno_trap" in e.best_traps]
+        self.assertTrue(suited)
+        found = self.book.search("inferno trap")
+        for entry in suited:
+            self.assertIn(entry, found)
+
+    def test_counts_per_facet(self):
+        """Facet counts add up to the matches for single-valued facets"""
+        counts = self.book.counts("water")
+        matches = len(self.book.search("water"))
+        self.assertEqual(sum(counts["rarity"].values()), matches)
+        self.assertEqual(counts["type"]["water"], matches)
+
+    def test_bits(self):
+        """Set bits come back in order"""
+        self.assertEqual(bits(0b101001), [0, 3, 5])
+        self.assertEqual(bits(0), [])
+
+    def test_compile_from_tables(self):
+        """A small table compiles with the environment type and rarity capture modifier"""
+        spawns = {"environments": {"lake": {"creatures": [
+            {"name": "Pond Newt", "base_probability": 0.5, "rarity": "rare",
+             "time_modifiers": {"night": 1.5, "day": 0.5}, "weather_modifiers": {"rainy": 2.0}}]}}}
+        traps = {"trap_types": {
+            "net": {"base_effectiveness": 0.5, "effectiveness_multipliers": {"creature_type": {"water": 2.0}}},
+            "cage": {"base_effectiveness": 0.8},
+            "quest": {"base_effectiveness": 1.0, "obtain_method": "special_quest_reward"},
+        }}
+        capture = {"creature_modifiers": {"by_rarity": {"rare": 0.65}}}
+        (entry,) = compile_entries(spawns, traps, capture)
+        self.assertEqual((entry.type, entry.rarity, entry.capture_modifier), ("water", "rare", 0.65))
+        self.assertEqual(entry.times, {"night"})
+        self.assertEqual(entry.weathers, {"rainy"})
+        self.assertEqual(entry.best_traps, ["net", "cage"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Tests for the array-backed entity store and roaming overworld creatures
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+from entities import EntityStore
+from simulation import ROAM_RADIUS, Overworld, new_headless_game, run_headless
+from world import World
+
+
+class TestEntityStore(unittest.TestCase):
+    """Test spawning, slot reuse and vectorized systems"""
+
+    def test_despawned_slots_are_reused(self):
+        """Test a spawn after a despawn takes the freed slot"""
+        store = EntityStore(capacity=4)
+        ids = [store.spawn(i, i, 0) for i in range(3)]
+        store.despawn(ids[1])
+        self.assertNotIn(ids[1], store)
+        self.assertEqual(store.spawn(9, 9, 2), ids[1])
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.size, 3)
+        with self.assertRaises(KeyError):
+            store.despawn(7)
+
+    def test_grows_keeping_components(self):
+        """Test the arrays grow past capacity without losing data"""
+        store = EntityStore(capacity=2)
+        for i in range(5):
+            store.spawn(i * 10, i, i % 3, vx=1.0)
+        self.assertGreaterEqual(store.capacity, 5)
+        np.testing.assert_array_equal(store.pos[:5, 0], [0, 10, 20, 30, 40])
+        np.testing.assert_array_equal(store.species[:5], [0, 1, 2, 0, 1])
+
+    def test_move_bounces_off_edges(self):
+        """Test entities move by their velocity and reflect at the world edge"""
+        store = EntityStore()
+        a = store.spawn(5, 50, 0, vx=-10)
+        b = store.spawn(50, 50, 0, vx=10, vy=20)
+        store.move(1.0, 100, 100)
+        self.assertEqual(tuple(store.pos[a]), (0.0, 50.0))
+        self.assertGreater(store.vel[a, 0], 0)
+        self.assertEqual(tuple(store.pos[b]), (60.0, 70.0))
+
+    def test_dead_slots_do_not_move_or_show(self):
+        """Test despawned entities stay out of queries"""
+        store = EntityStore()
+        a = store.spawn(10, 10, 0, vx=5)
+        b = store.spawn(20, 20, 0)
+        store.despawn(a)
+        store.move(1.0, 100, 100)
+        self.assertEqual(list(store.query_rect(0, 0, 100, 100)), [b])
+
+    def test_animation_frames(self):
+        """Test sprite frames advance with the animation clock"""
+        store = EntityStore()
+        e = store.spawn(0, 0, 0, vx=1)
+        store.animate(0.3, fps=4, frames=2)
+        self.assertEqual(store.frame[e], 1)
+        store.animate(0.3, fps=4, frames=2)
+        self.assertEqual(store.frame[e], 0)
+
+
+class TestRoamingCreatures(unittest.TestCase):
+    """Test roaming creatures around the player in the overworld"""
+
+    def test_population_stays_near_player(self):
+        """Test roamers are kept at the target count within range of a walking player"""
+        overworld = Overworld(new_headless_game(), World(80, 60, seed=2), 48, rng=random.Random(2), roamers=30)
+        self.assertEqual(len(overworld.creatures), 30)
+        overworld.set_input(1, 1)
+        run_headless(overworld, 600)
+        self.assertEqual(len(overworld.creatures), 30)
+        ids = overworld.creatures.ids()
+        offsets = overworld.creatures.pos[ids] - (overworld.x, overworld.y)
+        limit = ROAM_RADIUS * 48 + 60  # up to a second of roaming past the range
+        self.assertTrue(np.all(np.hypot(offsets[:, 0], offsets[:, 1]) <= limit))
+
+
+if __name__ == '__main__':
+    unittest.main()
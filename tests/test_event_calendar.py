@@ -0,0 +1,135 @@
+"""
+Tests for the event calendar, its interval tree and its use by the spawn and farming code
+"""
+
+import random
+import unittest
+
+from berry_farm import BerryFarm
+from event_calendar import EVENT_SCHEDULE, SEASON_HOURS, YEAR_HOURS, Event, EventCalendar, IntervalTree
+from world_clock import WorldConditions
+
+
+class TestIntervalTree(unittest.TestCase):
+    """Test stabbing queries against a scan of every interval"""
+
+    def test_matches_brute_force(self):
+        """Random intervals give the same answers as checking each one"""
+        rng = random.Random(3)
+        tree = IntervalTree()
+        intervals = []
+        for i in range(400):
+            start = rng.uniform(0, 1000)
+            event = Event(str(i), start, start + rng.expovariate(1 / 30))
+            intervals.append(event)
+            tree.add(event)
+        for _ in range(300):
+            t = rng.uniform(-10, 1100)
+            expected = {e.name for e in intervals if e.start <= t < e.end}
+            self.assertEqual({e.name for e in tree.stab(t)}, expected)
+
+    def test_half_open(self):
+        """An interval covers its start but not its end"""
+        tree = IntervalTree()
+        tree.add(Event("a", 5, 10))
+        self.assertEqual(tree.stab(4.9), [])
+        self.assertEqual(len(tree.stab(5)), 1)
+        self.assertEqual(tree.stab(10), [])
+
+    def test_add_after_query(self):
+        """Intervals added after a query are found by the next one"""
+        tree = IntervalTree()
+        tree.add(Event("a", 0, 10))
+        self.assertEqual(len(tree.stab(5)), 1)
+        tree.add(Event("b", 4, 6))
+        self.assertEqual({e.name for e in tree.stab(5)}, {"a", "b"})
+
+
+class TestEventCalendar(unittest.TestCase):
+    """Test recurring events, combined state and its caching"""
+
+    def setUp(self):
+        self.calendar = EventCalendar.from_config()
+
+    def test_seasons_cycle(self):
+        """Exactly one season is active at any hour, in order, year after year"""
+        for year in range(3):
+            for i, season in enumerate(["spring", "summer", "fall", "winter"]):
+                state = self.calendar.state(year * YEAR_HOURS + i * SEASON_HOURS + 1.5)
+                self.assertEqual(state.season, season)
+
+    def test_special_event_modifier(self):
+        """A special event multiplies spawns by its global modifier while it lasts"""
+        _, start, hours = EVENT_SCHEDULE["blood_moon"]
+        self.assertEqual(self.calendar.state(start - 1).spawn_multiplier, 1.0)
+        during = self.calendar.state(start + 1)
+        self.assertIn("blood_moon", during.names)
+        self.assertEqual(during.spawn_multiplier, 2.0)
+        self.assertTrue(any(c["name"] == "Shadow Beast" for c in during.creatures))
+        self.assertIn("blood_moon", self.calendar.state(start + SEASON_HOURS + 1).names)  # seasonal
+
+    def test_farming_event_duration_from_config(self):
+        """Farming events last their config duration and carry their effects"""
+        _, start, _ = EVENT_SCHEDULE["harvest_moon"]
+        self.assertIn("triple_farming_yields", self.calendar.state(start + 1).effects)
+        self.assertNotIn("harvest_moon", self.calendar.state(start + 3 * 24).names)
+        self.assertIn("harvest_moon", self.calendar.state(start + YEAR_HOURS + 1).names)  # annual
+
+    def test_state_cached_between_boundaries(self):
+        """The combined state is only recomputed when an event starts or ends"""
+        calendar = EventCalendar()
+        calendar.add(Event("a", 10, 20))
+        calendar.add(Event("b", 15, 30))
+        states = [calendar.state(t / 4) for t in range(0, 160)]
+        self.assertEqual(calendar.refresh_count, 5)  # [0,10) [10,15) [15,20) [20,30) [30,inf)
+        self.assertEqual(states[-1].until, float("inf"))
+        self.assertEqual(calendar.state(16).names, ("a", "b"))
+
+    def test_one_off_event_invalidates_state(self):
+        """Adding an event takes effect on the next query"""
+        calendar = EventCalendar()
+        self.assertEqual(calendar.state(5).names, ())
+        calendar.add(Event("storm", 4, 6, spawn_multiplier=3.0))
+        self.assertEqual(calendar.state(5).spawn_multiplier, 3.0)
+
+    def test_recurring_added_late(self):
+        """A recurring event added after queries is filled in for the years already expanded"""
+        calendar = EventCalendar()
+        calendar.state(3 * YEAR_HOURS)
+        calendar.add_recurring(Event("fair", 100, 110), YEAR_HOURS)
+        self.assertIn("fair", calendar.state(YEAR_HOURS + 105).names)
+
+
+class TestCalendarUsers(unittest.TestCase):
+    """Test the world conditions and the berry farm following the calendar"""
+
+    def test_world_conditions_scale_spawns(self):
+        """Spawn modifiers are multiplied during an event and a calendar event is reported"""
+        calendar = EventCalendar()
+        calendar.add(Event("swarm", 9, 10, spawn_multiplier=2.0))
+        plain = WorldConditions(seed=5, hour=8.5)
+        evented = WorldConditions(seed=5, hour=8.5, calendar=calendar)
+        self.assertTrue((plain.spawn_modifiers == evented.spawn_modifiers).all())
+        kinds = [kind for kind, _ in evented.advance(plain.clock.seconds_per_hour * 0.75)]
+        plain.advance(plain.clock.seconds_per_hour * 0.75)
+        self.assertIn("calendar", kinds)
+        self.assertTrue((evented.spawn_modifiers == plain.spawn_modifiers * 2.0).all())
+        self.assertEqual(evented.advance(1.0), [])
+
+    def test_farm_follows_festival(self):
+        """A calendar festival mid-growth speeds up a berry as set_festival does"""
+        calendar = EventCalendar()
+        calendar.add(Event("berry_festival", 12.0, 200.0, "farming"))
+        followed = BerryFarm(1, 1, rng=random.Random(1), calendar=calendar)
+        manual = BerryFarm(1, 1, rng=random.Random(1))
+        followed.plant(0, 0, "oran_berry", now=0.0)
+        manual.plant(0, 0, "oran_berry", now=0.0)
+        happened = manual.advance(12.0)
+        manual.set_festival("berry_festival", now=12.0)
+        happened += manual.advance(100.0)
+        self.assertEqual(followed.advance(100.0), happened)
+        self.assertEqual(followed.festivals, ("berry_festival",))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests for the retained-mode dirty-rect renderer
+"""
+
+import os
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+try:
+    import pygame
+    from pygame import Rect
+    from gui_render import DirtyRenderer, merge_rects
+except ImportError:  # pygame is optional for the console game
+    pygame = None
+
+
+@unittest.skipIf(pygame is None, "pygame not installed")
+class TestDirtyRenderer(unittest.TestCase):
+    """Test dirty region tracking"""
+
+    def setUp(self):
+        pygame.display.init()
+        self.screen = pygame.display.set_mode((200, 100))
+        self.renderer = DirtyRenderer(self.screen)
+        self.draws = []
+
+    def tearDown(self):
+        pygame.display.quit()
+
+    def _frame(self, layers):
+        self.renderer.begin_frame()
+        for key, rect, signature in layers:
+            self.renderer.add_layer(key, rect, signature, lambda s, key=key: self.draws.append(key))
+        return self.renderer.end_frame()
+
+    def test_first_frame_is_full(self):
+        """Test the first frame pushes the whole screen"""
+        dirty = self._frame([("bg", (0, 0, 200, 100), ())])
+        self.assertEqual(dirty, [Rect(0, 0, 200, 100)])
+        self.assertEqual(self.renderer.pixels_pushed, 200 * 100)
+
+    def test_unchanged_frame_pushes_nothing(self):
+        """Test a frame with identical layers is not redrawn"""
+        layers = [("bg", (0, 0, 200, 100), ()), ("label", (10, 10, 20, 20), ("a",))]
+        self._frame(layers)
+        self.draws = []
+        dirty = self._frame(layers)
+        self.assertEqual(dirty, [])
+        self.assertEqual(self.draws, [])
+        self.assertEqual(self.renderer.pixels_pushed, 0)
+
+    def test_signature_change_redraws_overlapping_layers(self):
+        """Test a changed layer recomposes only its own rect"""
+        self._frame([("bg", (0, 0, 200, 100), ()), ("label", (10, 10, 20, 20), ("a",))])
+        self.draws = []
+        dirty = self._frame([("bg", (0, 0, 200, 100), ()), ("label", (10, 10, 20, 20), ("b",))])
+        self.assertEqual(dirty, [Rect(10, 10, 20, 20)])
+        self.assertEqual(self.draws, ["bg", "label"])
+        self.assertEqual(self.renderer.pixels_pushed, 400)
+
+    def test_moved_and_removed_layers(self):
+        """Test moving a layer dirties old and new rects, removal dirties the hole"""
+        self._frame([("bg", (0, 0, 200, 100), ()), ("sprite", (0, 0, 10, 10), ())])
+        dirty = self._frame([("bg", (0, 0, 200, 100), ()), ("sprite", (50, 50, 10, 10), ())])
+        self.assertEqual(sorted(map(tuple, dirty)), [(0, 0, 10, 10), (50, 50, 10, 10)])
+
+        dirty = self._frame([("bg", (0, 0, 200, 100), ())])
+        self.assertEqual(dirty, [Rect(50, 50, 10, 10)])
+
+    def test_merge_rects(self):
+        """Test overlapping rects are merged"""
+        merged = merge_rects([(0, 0, 10, 10), (5, 5, 10, 10), (50, 50, 5, 5)])
+        self.assertEqual(sorted(map(tuple, merged)), [(0, 0, 15, 15), (50, 50, 5, 5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Tests for cached lighting tints and pooled weather particles
+"""
+
+import os
+import unittest
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+try:
+    import pygame
+    from lighting import (LightingCache, WeatherParticles, MIN_PARTICLES, PARTICLE_KINDS, combine,
+                          daylight)
+except ImportError:  # pygame is optional for the console game
+    pygame = None
+
+
+@unittest.skipIf(pygame is None, "pygame not installed")
+class TestLighting(unittest.TestCase):
+    """Test day-night tints and their cache"""
+
+    def test_daylight_clear_at_noon_dark_at_night(self):
+        """Test the tint is invisible at midday and strongest at midnight"""
+        self.assertEqual(daylight(12.0)[1], 0)
+        self.assertGreater(daylight(0.0)[1], daylight(20.0)[1] - 30)
+        self.assertEqual(daylight(24.0), daylight(0.0))
+
+    def test_combine_matches_stacked_blits(self):
+        """Test one combined tint matches blitting the two tints in turn"""
+        lower, upper = ((20, 30, 80), 140), ((200, 200, 210), 95)
+        color, alpha = combine(lower, upper)
+        base = np.array([60, 130, 60], dtype=float)
+        stacked = base
+        for c, a in (lower, upper):
+            stacked = stacked + (np.array(c) - stacked) * a / 255.0
+        single = base + (np.array(color) - base) * alpha / 255.0
+        np.testing.assert_allclose(single, stacked, atol=2)
+
+    def test_tints_are_cached_per_step(self):
+        """Test a tint is built once per step and weather, and the cache is bounded"""
+        cache = LightingCache((32, 32), steps_per_hour=4, max_cached=3)
+        key = cache.key(21.1, "rainy")
+        self.assertEqual(key, cache.key(21.2, "rainy"))
+        first = cache.tint(key)
+        self.assertIs(cache.tint(cache.key(21.2, "rainy")), first)
+        self.assertEqual(cache.builds, 1)
+        for hour in (1, 2, 3, 4):
+            cache.tint(cache.key(hour, "rainy"))
+        self.assertEqual(len(cache._surfaces), 3)
+        self.assertIsNone(cache.tint(cache.key(12, "sunny")))
+
+    def test_tint_darkens_the_view(self):
+        """Test drawing the midnight tint darkens the target"""
+        surface = pygame.Surface((16, 16))
+        surface.fill((200, 200, 200))
+        cache = LightingCache((16, 16))
+        cache.draw(surface, (0, 0), cache.key(0.0, "sunny"))
+        self.assertLess(sum(surface.get_at((8, 8))[:3]), 600)
+
+
+@unittest.skipIf(pygame is None, "pygame not installed")
+class TestWeatherParticles(unittest.TestCase):
+    """Test the particle pool and its budget"""
+
+    def setUp(self):
+        self.particles = WeatherParticles((200, 100), capacity=500, rng=np.random.default_rng(1), target_ms=10.0)
+
+    def test_weather_selects_particles(self):
+        """Test particle weathers fill the pool and clear weather empties it"""
+        self.particles.set_weather("snowy")
+        self.assertEqual(self.particles.active, min(500, PARTICLE_KINDS["snowy"][0]))
+        self.particles.set_weather("sunny")
+        self.assertEqual(self.particles.active, 0)
+
+    def test_update_wraps_inside_view(self):
+        """Test particles stay inside the view as they fall and the camera scrolls"""
+        self.particles.set_weather("stormy")
+        for i in range(50):
+            self.particles.update(0.05, cam_x=i * 7, cam_y=-i * 3)
+        pos = self.particles.pos[:self.particles.active]
+        self.assertTrue(np.all(pos >= 0))
+        self.assertTrue(np.all(pos[:, 0] <= 200) and np.all(pos[:, 1] <= 100))
+
+    def test_steps_count_only_moving_updates(self):
+        """Test an update that moves nothing does not count as a step, so the view is not redrawn"""
+        self.particles.set_weather("rainy")
+        self.particles.update(0.05, cam_x=0, cam_y=0)
+        self.particles.update(0.0, cam_x=0, cam_y=0)
+        self.assertEqual(self.particles.steps, 1)
+        self.particles.update(0.0, cam_x=5, cam_y=0)
+        self.assertEqual(self.particles.steps, 2)
+
+    def test_budget_shrinks_and_recovers(self):
+        """Test slow frames cut the particle budget and fast frames restore it"""
+        self.particles.set_weather("stormy")
+        for _ in range(60):
+            self.particles.adapt(30.0)
+        self.assertLess(self.particles.active, 100)
+        self.assertGreaterEqual(self.particles.budget, MIN_PARTICLES)
+        for _ in range(400):
+            self.particles.adapt(1.0)
+        self.assertEqual(self.particles.budget, 500)
+
+    def test_draw_blits_particles(self):
+        """Test drawing puts particle pixels on the surface"""
+        self.particles.set_weather("snowy")
+        surface = pygame.Surface((200, 100))
+        self.particles.draw(surface, (0, 0))
+        self.assertGreater(pygame.mask.from_threshold(surface, (245, 245, 255), (1, 1, 1, 255)).count(), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
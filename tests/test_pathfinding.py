@@ -0,0 +1,138 @@
+"""
+Tests for hierarchical A* pathfinding over the chunked world
+"""
+
+import heapq
+import math
+import random
+import unittest
+
+from pathfinding import STEPS, Pathfinder, octile
+from terrain import BIOME_IDS
+from world import World
+
+OCEAN = BIOME_IDS["ocean"]
+
+
+def plain_astar(pathfinder, start, goal):
+    """Cost of the optimal path from a tile-level A*, or None"""
+    best = {start: 0.0}
+    heap = [(octile(*start, *goal), 0.0, start)]
+    while heap:
+        _, cost, (x, y) = heapq.heappop(heap)
+        if (x, y) == goal:
+            return cost
+        if cost > best[(x, y)]:
+            continue
+        for dx, dy, step in STEPS:
+            nxt = (x + dx, y + dy)
+            if not pathfinder.is_walkable(*nxt):
+                continue
+            if dx and dy and not (pathfinder.is_walkable(x + dx, y) and pathfinder.is_walkable(x, y + dy)):
+                continue
+            if cost + step < best.get(nxt, math.inf):
+                best[nxt] = cost + step
+                heapq.heappush(heap, (cost + step + octile(*nxt, *goal), cost + step, nxt))
+    return None
+
+
+class TestPathfinder(unittest.TestCase):
+    """Test path validity, quality and caching"""
+
+    def setUp(self):
+        self.world = World(64, 64, seed=7, max_chunks=64)
+        self.pathfinder = Pathfinder(self.world)
+        self.rng = random.Random(5)
+
+    def random_tile(self):
+        while True:
+            tile = (self.rng.randrange(64), self.rng.randrange(64))
+            if self.pathfinder.is_walkable(*tile):
+                return tile
+
+    def path_cost(self, path):
+        """Cost of a path, checking each step is a legal move"""
+        total = 0.0
+        for (ax, ay), (bx, by) in zip(path, path[1:]):
+            dx, dy = abs(bx - ax), abs(by - ay)
+            self.assertEqual(max(dx, dy), 1)
+            self.assertTrue(self.pathfinder.is_walkable(bx, by))
+            if dx and dy:
+                self.assertTrue(self.pathfinder.is_walkable(bx, ay) and self.pathfinder.is_walkable(ax, by))
+            total += math.sqrt(2) if dx and dy else 1.0
+        return total
+
+    def test_paths_are_valid_and_near_optimal(self):
+        """Test paths agree with plain A* on reachability and stay close to its cost"""
+        ratios = []
+        for _ in range(40):
+            start, goal = self.random_tile(), self.random_tile()
+            path = self.pathfinder.find_path(start, goal)
+            optimal = plain_astar(self.pathfinder, start, goal)
+            self.assertEqual(path is None, optimal is None)
+            if path is None:
+                continue
+            self.assertEqual(path[0], start)
+            self.assertEqual(path[-1], goal)
+            if optimal:
+                ratios.append(self.path_cost(path) / optimal)
+        self.assertGreater(len(ratios), 20)
+        self.assertLess(sum(ratios) / len(ratios), 1.15)
+
+    def test_blocked_endpoints_have_no_path(self):
+        """Test a blocked goal or a goal walled in by water gives None"""
+        start, goal = self.random_tile(), self.random_tile()
+        tiles = self.world.chunk(goal[0] // 16, goal[1] // 16)
+        tiles[goal[1] % 16, goal[0] % 16] = OCEAN
+        self.pathfinder.invalidate_tile(*goal)
+        self.assertIsNone(self.pathfinder.find_path(start, goal))
+
+        start, goal = (2, 2), (40, 40)
+        for x in range(39, 42):
+            for y in range(39, 42):
+                self.world.chunk(x // 16, y // 16)[y % 16, x % 16] = OCEAN
+        self.world.chunk(2, 2)[8, 8] = BIOME_IDS["forest"]
+        self.world.chunk(0, 0)[2, 2] = BIOME_IDS["forest"]
+        self.pathfinder.invalidate_chunk(2, 2)
+        self.pathfinder.invalidate_chunk(0, 0)
+        self.assertIsNone(self.pathfinder.find_path(start, goal))
+
+    def test_repeat_queries_hit_the_cache(self):
+        """Test the same query is answered from the path cache"""
+        start, goal = self.random_tile(), self.random_tile()
+        first = self.pathfinder.find_path(start, goal)
+        graphs = len(self.pathfinder._graphs)
+        self.assertIs(self.pathfinder.find_path(start, goal), first)
+        self.assertEqual((self.pathfinder.hits, self.pathfinder.misses), (1, 1))
+        self.assertEqual(len(self.pathfinder._graphs), graphs)
+
+    def test_terrain_change_invalidates_paths_through_the_chunk(self):
+        """Test blocking a tile on a cached path gives a new path around it"""
+        while True:
+            start, goal = self.random_tile(), self.random_tile()
+            path = self.pathfinder.find_path(start, goal)
+            if path is not None and len(path) > 10:
+                break
+        x, y = path[len(path) // 2]
+        self.world.chunk(x // 16, y // 16)[y % 16, x % 16] = OCEAN
+        self.assertIs(self.pathfinder.find_path(start, goal), path)  # stale until told
+
+        self.pathfinder.invalidate_tile(x, y)
+        detour = self.pathfinder.find_path(start, goal)
+        self.assertIsNot(detour, path)
+        self.assertEqual(detour is None, plain_astar(self.pathfinder, start, goal) is None)
+        if detour is not None:
+            self.assertNotIn((x, y), detour)
+            self.path_cost(detour)
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test the path cache stays within its size"""
+        pathfinder = Pathfinder(self.world, cache_size=3)
+        for _ in range(6):
+            pathfinder.find_path(self.random_tile(), self.random_tile())
+        self.assertEqual(len(pathfinder._paths), 3)
+        self.assertTrue(all(len(keys) <= 3 for keys in pathfinder._paths_by_chunk.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
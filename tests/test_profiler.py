@@ -0,0 +1,99 @@
+"""
+Tests for the per-stage frame profiler
+"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from profiler import FrameProfiler
+from text_cache import TEXT_CACHE
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+try:
+    import pygame
+except ImportError:  # pygame is optional for the console game
+    pygame = None
+
+
+class TestFrameProfiler(unittest.TestCase):
+    """Test stage timing and trace export"""
+
+    def run_frame(self, profiler):
+        profiler.begin_frame()
+        with profiler.stage("compose"):
+            with profiler.stage("text"):
+                time.sleep(0.002)
+        profiler.end_frame()
+
+    def test_nested_stages_charge_self_time(self):
+        """Test a nested stage is not counted twice in the frame breakdown"""
+        profiler = FrameProfiler()
+        self.run_frame(profiler)
+        total, stages = profiler.frames[-1]
+        self.assertGreaterEqual(stages["text"], 0.002)
+        self.assertLess(stages["compose"], 0.002)
+        self.assertAlmostEqual(sum(stages.values()), total, places=6)
+
+    def test_history_is_bounded(self):
+        """Test only the most recent frames are kept"""
+        profiler = FrameProfiler(history=3)
+        for _ in range(5):
+            profiler.begin_frame()
+            profiler.end_frame()
+        self.assertEqual(len(profiler.frames), 3)
+        self.assertEqual(profiler.frame_count, 5)
+        self.assertLessEqual(profiler.percentile(50), profiler.percentile(99))
+
+    def test_disabled_profiler_records_nothing(self):
+        """Test stages share one idle context and nothing is kept until the overlay is shown"""
+        profiler = FrameProfiler(enabled=False)
+        self.run_frame(profiler)
+        self.assertIs(profiler.stage("text"), profiler.stage("world"))
+        self.assertEqual((len(profiler.frames), len(profiler.trace), profiler.frame_count), (0, 0, 0))
+        profiler.show_overlay(True)
+        self.run_frame(profiler)
+        self.assertEqual(profiler.frame_count, 1)
+        self.assertIn("text", profiler.frames[-1][1])
+        profiler.show_overlay(False)
+        self.run_frame(profiler)
+        self.assertEqual(profiler.frame_count, 1)
+
+    def test_chrome_trace_export(self):
+        """Test the trace file holds complete events for every stage and frame"""
+        profiler = FrameProfiler()
+        self.run_frame(profiler)
+        self.run_frame(profiler)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            self.assertEqual(profiler.export_chrome_trace(path), 6)
+            with open(path, encoding="utf-8") as f:
+                events = json.load(f)["traceEvents"]
+        spans = [e for e in events if e["ph"] == "X"]
+        self.assertEqual(sorted(e["name"] for e in spans), ["compose"] * 2 + ["frame"] * 2 + ["text"] * 2)
+        text = next(e for e in spans if e["name"] == "text")
+        compose = next(e for e in spans if e["name"] == "compose")
+        self.assertGreaterEqual(text["ts"], compose["ts"])
+        self.assertLessEqual(text["ts"] + text["dur"], compose["ts"] + compose["dur"])
+
+    @unittest.skipIf(pygame is None, "pygame not installed")
+    def test_overlay_caches_only_stage_names(self):
+        """Test redrawing the overlay with new timings adds no entries to the text cache"""
+        pygame.font.init()
+        font = pygame.font.Font(None, 18)
+        surface = pygame.Surface((324, 200))
+        profiler = FrameProfiler()
+        self.run_frame(profiler)
+        profiler.draw_overlay(surface, surface.get_rect(), font)
+        cached = len(TEXT_CACHE)
+        for _ in range(20):
+            self.run_frame(profiler)
+            profiler.draw_overlay(surface, surface.get_rect(), font)
+        self.assertEqual(len(TEXT_CACHE), cached)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+"""
+Tests for quests, achievements and the trigger engine
+"""
+
+import random
+import unittest
+
+from config_loader import load_config
+from creature import WILD_SPECIES
+from encyclopedia import encyclopedia
+from quests import (ANY, ARRIVED, CAUGHT, TRAP_SET, Goal, Quest, QuestEngine, SetGoal, achievement_goal,
+                    load_achievements, quest_from_spec)
+from simulation import Overworld, new_headless_game, run_headless
+from world import World
+
+
+class TestQuestEngine(unittest.TestCase):
+    """Test goal counting, subscriptions and completion"""
+
+    def setUp(self):
+        self.engine = QuestEngine()
+
+    def test_counted_goal(self):
+        """A keyed goal counts only its key and completes at its target"""
+        quest = self.engine.add(Quest("rats", [Goal(CAUGHT, "Sparkrat", 3)]))
+        self.assertEqual(self.engine.emit(CAUGHT, "Windbird"), [])
+        self.assertEqual(self.engine.emit(CAUGHT, "Sparkrat"), [])
+        self.assertEqual(self.engine.emit(CAUGHT, "Sparkrat", 2), [quest])
+        self.assertTrue(quest.complete)
+        self.assertNotIn("rats", self.engine)
+        self.assertEqual(self.engine.completed, [quest])
+
+    def test_any_key_goal(self):
+        """A goal without a key counts every key of its event"""
+        quest = self.engine.add(Quest("catch two", [Goal(CAUGHT, count=2)]))
+        self.engine.emit(CAUGHT, "Sparkrat")
+        self.assertEqual(self.engine.emit(CAUGHT, "Windbird"), [quest])
+
+    def test_all_goals_needed(self):
+        """A quest with several goals completes only when the last one does"""
+        quest = self.engine.add(quest_from_spec({"name": "tour", "kind": "npc", "goals": [
+            {"event": ARRIVED, "key": "Forest"}, {"event": TRAP_SET, "count": 2}]}))
+        self.engine.emit(TRAP_SET, "basic_net", 2)
+        self.assertFalse(quest.complete)
+        self.assertEqual(self.engine.emit(ARRIVED, "Forest"), [quest])
+
+    def test_set_goal(self):
+        """A set goal needs each key once; repeats do not count"""
+        quest = self.engine.add(Quest("trio", [SetGoal(CAUGHT, ["a", "b", "c"])]))
+        self.engine.emit(CAUGHT, "a")
+        self.engine.emit(CAUGHT, "a")
+        self.engine.emit(CAUGHT, "b")
+        self.assertEqual(quest.goals[0].progress, 2)
+        self.assertEqual(self.engine.emit(CAUGHT, "c"), [quest])
+
+    def test_only_subscribed_goals_are_evaluated(self):
+        """An event touches only the goals that listen for it, however many quests are active"""
+        for i in range(500):
+            self.engine.add(Quest(f"q{i}", [Goal(CAUGHT, f"species {i}", 5)]))
+        self.engine.add(Quest("arrive", [Goal(ARRIVED, "Forest")]))
+        self.engine.emit(CAUGHT, "species 7")
+        self.engine.emit(ARRIVED, "Forest")
+        self.engine.emit(TRAP_SET, "basic_net")
+        self.assertEqual(self.engine.evaluated, 2)
+
+    def test_finished_goals_unsubscribe(self):
+        """Goals stop being evaluated once done, and abandoned quests leave no subscriptions"""
+        self.engine.add(Quest("one", [Goal(CAUGHT, count=1)]))
+        self.engine.emit(CAUGHT, "x")
+        self.engine.emit(CAUGHT, "x")
+        self.assertEqual(self.engine.evaluated, 1)
+        self.engine.add(Quest("set", [SetGoal(CAUGHT, ["a", "b"])]))
+        self.engine.remove("set")
+        self.assertEqual(self.engine._subscribers, {})
+
+    def test_count_past(self):
+        """With count_past, goals start from the lifetime totals"""
+        for name in ["a", "b", "a"]:
+            self.engine.emit(CAUGHT, name)
+        self.assertEqual(self.engine.totals[(CAUGHT, ANY)], 3)
+        counted = self.engine.add(Quest("three", [Goal(CAUGHT, count=4)]), count_past=True)
+        self.assertEqual(counted.goals[0].progress, 3)
+        done = self.engine.add(Quest("both", [SetGoal(CAUGHT, ["a", "b"])]), count_past=True)
+        self.assertTrue(done.complete)
+        self.assertIn(done, self.engine.completed)
+        fresh = self.engine.add(Quest("fresh", [Goal(CAUGHT, count=4)]))
+        self.assertEqual(fresh.goals[0].progress, 0)
+
+    def test_duplicate_quest_rejected(self):
+        """The same quest name cannot be active twice"""
+        self.engine.add(Quest("q", [Goal(CAUGHT)]))
+        with self.assertRaises(ValueError):
+            self.engine.add(Quest("q", [Goal(CAUGHT)]))
+
+
+class TestAchievements(unittest.TestCase):
+    """Test achievements from config and their capture bonus"""
+
+    def test_config_achievements(self):
+        """Every achievement in the config is understood and can be earned by catching the game's species"""
+        quests = {q.name: q for q in load_achievements()}
+        self.assertEqual(set(quests), set(load_config("capture_probabilities")["achievements_bonuses"]))
+        roster = {species.name for species in WILD_SPECIES}
+        for quest in quests.values():
+            for goal in quest.goals:
+                if isinstance(goal, SetGoal):
+                    self.assertTrue(goal.missing and goal.missing <= roster)
+        self.assertEqual(quests["perfect_encyclopedia"].goals[0].missing, roster)
+        self.assertIsNone(achievement_goal("win_a_contest", {}))
+        self.assertEqual(achievement_goal("capture_500_creatures", {}).count, 500)
+
+    def test_catch_every_achievement_can_complete(self):
+        """Catching each species of a rarity's types earns its achievement"""
+        engine = QuestEngine()
+        for achievement in load_achievements():
+            engine.add(achievement)
+        rare_types = {entry.type for entry in encyclopedia().entries if entry.rarity == "rare"}
+        for species in WILD_SPECIES:
+            if species.type.lower() in rare_types:
+                engine.emit(CAUGHT, species.name)
+        self.assertIn("capture_all_rare", [quest.name for quest in engine.completed])
+
+    def test_unmapped_achievements_logged(self):
+        """Achievements with no species to catch are left out with a warning"""
+        with self.assertLogs("quests", "WARNING") as logs:
+            names = [q.name for q in load_achievements([])]
+        self.assertIn("capture_100_creatures", names)
+        self.assertNotIn("capture_all_common", names)
+        self.assertNotIn("perfect_encyclopedia", names)
+        self.assertTrue(any("perfect_encyclopedia" in line for line in logs.output))
+
+    def test_best_bonus_applies(self):
+        """The capture bonus is the best reward among earned achievements"""
+        engine = QuestEngine()
+        for achievement in load_achievements():
+            engine.add(achievement)
+        self.assertEqual(engine.capture_bonus(), 1.0)
+        engine.emit(CAUGHT, "Sparkrat", 50)
+        self.assertAlmostEqual(engine.capture_bonus(), 1.05)
+        engine.emit(CAUGHT, "Sparkrat", 50)
+        self.assertAlmostEqual(engine.capture_bonus(), 1.10)
+
+
+class TestOverworldQuests(unittest.TestCase):
+    """Test the overworld reporting quest events"""
+
+    def setUp(self):
+        self.overworld = Overworld(new_headless_game(), World(40, 30, seed=2), 16, rng=random.Random(4))
+
+    def test_trap_set_completes_quest(self):
+        """Setting a trap reports an event and the completion shows up in the next step"""
+        self.overworld.quests.add(Quest("trapper", [Goal(TRAP_SET, "basic_net")]))
+        self.overworld.place_trap("basic_net")
+        events = self.overworld.step()
+        self.assertIn("quest_completed", [kind for kind, _ in events])
+        self.assertNotIn("quest_completed", [kind for kind, _ in self.overworld.step()])
+
+    def test_arrivals_are_reported(self):
+        """Arriving at locations counts toward arrival goals"""
+        self.overworld.quests.add(Quest("wander", [Goal(ARRIVED, count=10 ** 6)]))
+        events = run_headless(self.overworld, 400, policy=lambda o: (1, 1))
+        arrivals = sum(1 for kind, _ in events if kind == "arrived")
+        self.assertEqual(self.overworld.quests.quests["wander"].goals[0].progress, arrivals)
+
+    def test_capture_bonus_applies(self):
+        """A completed achievement raises the battle capture modifier"""
+        before = self.overworld.capture_modifier()
+        self.overworld.notify(CAUGHT, "Sparkrat", 100)
+        self.assertAlmostEqual(self.overworld.capture_modifier(), before * 1.10, places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
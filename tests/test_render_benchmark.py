@@ -0,0 +1,63 @@
+"""
+Tests for the headless rendering benchmark
+"""
+
+import os
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+try:
+    import pygame
+    import gui_app
+    from render_benchmark import FRAME_DT, NO_KEYS, compare, default_scenarios, run_benchmarks
+except ImportError:  # pygame is optional for the console game
+    pygame = None
+
+
+@unittest.skipIf(pygame is None, "pygame not installed")
+class TestRenderBenchmark(unittest.TestCase):
+    """Test the benchmark drives every scene and reports its stats"""
+
+    def test_quick_run_reports_every_scenario(self):
+        """Test each scenario reports frame time percentiles and allocations"""
+        assets = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+        before = sorted(os.listdir(assets))
+        scenarios = default_scenarios(sizes=[(20, 20)], marker_counts=[50])
+        results = run_benchmarks(scenarios, frames=5, warmup=2, alloc_frames=2)
+        self.assertEqual(sorted(os.listdir(assets)), before)  # no tile map baked into the source tree
+        self.assertEqual(list(results["scenarios"]),
+                         ["title", "starter", "map_20x20_50_markers", "map_storm_night",
+                          "battle_200_log_lines"])
+        for stats in results["scenarios"].values():
+            self.assertLessEqual(stats["p50_ms"], stats["p95_ms"])
+            self.assertLessEqual(stats["p95_ms"], stats["p99_ms"])
+            self.assertGreaterEqual(stats["alloc_peak_bytes_p50"], 0)
+        self.assertEqual(results["meta"]["video_driver"], "dummy")
+
+    def test_still_map_repaints_only_moving_creatures(self):
+        """Test a map view with roaming creatures and a still camera pushes a fraction of the map"""
+        pygame.init()
+        try:
+            screen = pygame.display.set_mode((gui_app.WIDTH, gui_app.HEIGHT))
+            scenario = default_scenarios(sizes=[(40, 30)], marker_counts=[50])[2]
+            app = gui_app.GuiApp(screen, world=scenario.world, locations=scenario.locations)
+            scenario.setup(app)
+            pixels = []
+            for _ in range(30):
+                app.frame(FRAME_DT, [], NO_KEYS)
+                pixels.append(app.renderer.pixels_pushed)
+        finally:
+            pygame.quit()
+        self.assertGreater(len(app.overworld.creatures), 0)
+        self.assertLess(sum(pixels[10:]) / 20, app.map_area.width * app.map_area.height / 2)
+
+    def test_compare_flags_regressions(self):
+        """Test only scenarios slower than the tolerance are reported"""
+        baseline = {"scenarios": {"a": {"p95_ms": 10.0}, "b": {"p95_ms": 10.0}}}
+        results = {"scenarios": {"a": {"p95_ms": 12.0}, "b": {"p95_ms": 13.0}, "c": {"p95_ms": 99.0}}}
+        self.assertEqual(compare(results, baseline, 0.25), [("b", 10.0, 13.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests for the fixed-timestep overworld simulation
+"""
+
+import random
+import unittest
+
+from simulation import (FIXED_DT, FixedTimestep, Overworld, new_headless_game,
+                        random_walk, run_headless)
+from world import World
+
+
+def make_overworld(seed=1):
+    game = new_headless_game()
+    return Overworld(game, World(40, 30, seed=seed), 48, rng=random.Random(seed))
+
+
+class TestFixedTimestep(unittest.TestCase):
+    """Test frame time is turned into whole ticks"""
+
+    def test_ticks_and_alpha(self):
+        """Test leftover time carries over and becomes the interpolation factor"""
+        stepper = FixedTimestep(dt=0.01)
+        self.assertEqual(stepper.advance(0.025), 2)
+        self.assertAlmostEqual(stepper.alpha, 0.5)
+        self.assertEqual(stepper.advance(0.005), 1)
+        self.assertAlmostEqual(stepper.alpha, 0.0)
+
+    def test_long_stall_is_capped(self):
+        """Test a long stall runs at most max_steps ticks"""
+        stepper = FixedTimestep(dt=0.01, max_steps=5)
+        self.assertEqual(stepper.advance(2.0), 5)
+        self.assertLess(stepper.alpha, 1.0)
+
+
+class TestOverworld(unittest.TestCase):
+    """Test the overworld simulation"""
+
+    def test_speed_independent_of_frame_rate(self):
+        """Test the player covers the same distance at 30 and 144 frames per second"""
+        positions = []
+        for fps in (30, 144):
+            overworld = make_overworld()
+            overworld.set_input(1, 0)
+            stepper = FixedTimestep()
+            for _ in range(fps):
+                for _ in range(stepper.advance(1.0 / fps)):
+                    overworld.step(FIXED_DT)
+            positions.append(overworld.position(stepper.alpha))
+        self.assertAlmostEqual(positions[0][0], positions[1][0], delta=1.0)
+
+    def test_headless_run_is_deterministic(self):
+        """Test a seeded headless run arrives and meets creatures reproducibly"""
+        results = []
+        for _ in range(2):
+            overworld = make_overworld(seed=3)
+            events = run_headless(overworld, 20000, policy=random_walk(random.Random(3)))
+            results.append([(kind, getattr(value, "name", value)) for kind, value in events])
+        self.assertEqual(results[0], results[1])
+        self.assertIn("encounter", [kind for kind, _ in results[0]])
+
+    def test_arrival_updates_location(self):
+        """Test walking onto a marker travels there"""
+        overworld = make_overworld()
+        target = "Forest Path"
+        x, y = overworld.locations[target]
+        overworld.x, overworld.y = x - 10, y
+        overworld.set_input(1, 0)
+        events = run_headless(overworld, 10)
+        self.assertIn(("arrived", target), events)
+        self.assertEqual(overworld.game.current_location, target)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Tests for the spatial hash used for world markers
+"""
+
+import random
+import unittest
+
+from spatial_hash import SpatialHash
+
+
+class TestSpatialHash(unittest.TestCase):
+    """Test spatial hash queries"""
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.points = {i: (rng.uniform(-500, 2000), rng.uniform(-500, 2000)) for i in range(400)}
+        self.index = SpatialHash(64)
+        for item, (x, y) in self.points.items():
+            self.index.insert(item, x, y)
+
+    def test_query_rect_matches_brute_force(self):
+        """Test viewport culling returns exactly the points inside the rect"""
+        x, y, w, h = 100, -50, 640, 480
+        expected = {i for i, (px, py) in self.points.items() if x <= px < x + w and y <= py < y + h}
+        self.assertEqual(set(self.index.query_rect(x, y, w, h)), expected)
+
+    def test_query_radius_nearest_first(self):
+        """Test radius queries match brute force and are sorted by distance"""
+        cx, cy, r = 700, 800, 150
+        found = self.index.query_radius(cx, cy, r)
+        dists = [(self.points[i][0] - cx) ** 2 + (self.points[i][1] - cy) ** 2 for i in found]
+        expected = {i for i, (px, py) in self.points.items() if (px - cx) ** 2 + (py - cy) ** 2 <= r * r}
+        self.assertEqual(set(found), expected)
+        self.assertEqual(dists, sorted(dists))
+
+    def test_move_and_remove(self):
+        """Test moved items are found at their new position and removed items are gone"""
+        self.index.move(0, 5000, 5000)
+        self.assertEqual(self.index.query_rect(4990, 4990, 20, 20), [0])
+        self.index.remove(0)
+        self.assertNotIn(0, self.index)
+        self.assertEqual(self.index.query_radius(5000, 5000, 10), [])
+        self.assertEqual(len(self.index), len(self.points) - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Tests for procedural terrain generation
+"""
+
+import unittest
+
+import numpy as np
+
+from terrain import BIOMES, BIOME_NAMES, generate_chunk, generate_chunks, generate_region
+
+
+class TestTerrain(unittest.TestCase):
+    """Test noise-based biome generation"""
+
+    def test_biome_list(self):
+        """Test the 27 environments from the design document are defined"""
+        self.assertEqual(len(BIOMES), 27)
+        self.assertEqual(len(set(BIOME_NAMES)), 27)
+
+    def test_deterministic_per_chunk(self):
+        """Test a chunk depends only on (seed, cx, cy)"""
+        a = generate_chunk(42, 3, -2, 16)
+        b = generate_chunk(42, 3, -2, 16)
+        self.assertEqual(a.dtype, np.uint8)
+        self.assertTrue(np.array_equal(a, b))
+        self.assertFalse(np.array_equal(a, generate_chunk(43, 3, -2, 16)))
+
+    def test_chunks_are_seamless(self):
+        """Test chunks generated independently tile into the same region"""
+        region = generate_region(9, 0, 0, 64, 32)
+        left = generate_chunk(9, 0, 0, 32)
+        right = generate_chunk(9, 1, 0, 32)
+        self.assertTrue(np.array_equal(region, np.hstack([left, right])))
+
+    def test_region_uses_many_biomes(self):
+        """Test a large region covers most of the biome table"""
+        region = generate_region(1234, 0, 0, 512, 512)
+        self.assertGreaterEqual(len(np.unique(region)), 20)
+        self.assertLess(region.max(), len(BIOMES))
+
+    def test_generate_chunks_matches_serial(self):
+        """Test batch generation returns the same chunks as one-by-one generation"""
+        coords = [(0, 0), (1, 0), (5, 7)]
+        chunks = generate_chunks(7, coords, 16)
+        for cx, cy in coords:
+            self.assertTrue(np.array_equal(chunks[(cx, cy)], generate_chunk(7, cx, cy, 16)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests for the rendered text surface cache
+"""
+
+import unittest
+from text_cache import TextCache
+
+
+class FakeFont:
+    """Stands in for pygame.font.Font and counts rasterizations"""
+
+    def __init__(self):
+        self.renders = 0
+
+    def render(self, text, antialias, color):
+        self.renders += 1
+        return (text, antialias, color)
+
+
+class TestTextCache(unittest.TestCase):
+    """Test text surface caching"""
+
+    def test_hits_and_misses(self):
+        """Test repeated strings are rendered only once"""
+        cache = TextCache()
+        font = FakeFont()
+        first = cache.render(font, "Route 1", (255, 255, 255))
+        second = cache.render(font, "Route 1", [255, 255, 255])
+        self.assertIs(first, second)
+        self.assertEqual(font.renders, 1)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 1)
+
+        cache.render(font, "Route 1", (200, 160, 40))
+        cache.render(font, "Route 1", (255, 255, 255), antialias=False)
+        self.assertEqual(font.renders, 3)
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted at the size cap"""
+        cache = TextCache(max_entries=2)
+        font = FakeFont()
+        cache.render(font, "a", (0, 0, 0))
+        cache.render(font, "b", (0, 0, 0))
+        cache.render(font, "a", (0, 0, 0))  # "b" is now least recently used
+        cache.render(font, "c", (0, 0, 0))
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(len(cache), 2)
+
+        renders = font.renders
+        cache.render(font, "a", (0, 0, 0))
+        self.assertEqual(font.renders, renders)
+        cache.render(font, "b", (0, 0, 0))
+        self.assertEqual(font.renders, renders + 1)
+
+    def test_prerendered_labels_are_pinned(self):
+        """Test prerendered labels survive eviction pressure"""
+        cache = TextCache(max_entries=1)
+        font = FakeFont()
+        cache.prerender(font, ["Fight", "Run"], (255, 255, 255))
+        for i in range(10):
+            cache.render(font, f"log {i}", (255, 255, 255))
+
+        renders = font.renders
+        cache.render(font, "Fight", (255, 255, 255))
+        cache.render(font, "Run", (255, 255, 255))
+        self.assertEqual(font.renders, renders)
+        self.assertGreater(cache.hit_rate(), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Tests for the memory-mapped tile-id store
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from terrain import BIOME_NAMES, generate_region
+from tile_store import TileStore, bake_world
+from world import World
+
+
+class TestTileStore(unittest.TestCase):
+    """Test tile map files"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "world.tmap")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_create_and_reopen(self):
+        """Test tile ids and the tile table survive a round trip"""
+        store = TileStore.create(self.path, 10, 4, ["grass", "water", "rock"])
+        store.tiles[1, 2] = store.tile_id("water")
+        store.tiles[3, 9] = store.tile_id("rock")
+        store.close()
+
+        store = TileStore(self.path)
+        self.assertEqual((store.width, store.height), (10, 4))
+        self.assertEqual(store.tile_names, ["grass", "water", "rock"])
+        self.assertEqual(store.tile_name(int(store.tiles[1, 2])), "water")
+        self.assertEqual(store.tile_name(int(store.tiles[3, 9])), "rock")
+        self.assertEqual(store.tiles.dtype, np.uint8)
+        # one byte per tile after the header and table
+        self.assertLess(os.path.getsize(self.path) - 10 * 4, 256)
+
+    def test_uint16_ids(self):
+        """Test maps with more than 256 tile types use two-byte ids"""
+        names = [f"t{i}" for i in range(300)]
+        store = TileStore.create(self.path, 3, 3, names, dtype=np.uint16)
+        store.tiles[2, 2] = 299
+        store.close()
+        self.assertEqual(TileStore(self.path).tile_name(int(TileStore(self.path).tiles[2, 2])), "t299")
+        with self.assertRaises(ValueError):
+            TileStore.create(self.path, 3, 3, names)
+
+    def test_rejects_other_files(self):
+        """Test opening a file that is not a tile map fails cleanly"""
+        with open(self.path, "wb") as f:
+            f.write(b"not a map at all, definitely not")
+        with self.assertRaises(ValueError):
+            TileStore(self.path)
+
+    def test_baked_world_matches_generated_world(self):
+        """Test a baked world serves the same tiles as on-the-fly generation"""
+        store = bake_world(self.path, 50, 37, seed=11)
+        self.assertEqual(store.tile_names, BIOME_NAMES)
+        self.assertTrue(np.array_equal(store.tiles, generate_region(11, 0, 0, 50, 37)))
+
+        baked = World(50, 37, seed=11, store=store)
+        generated = World(50, 37, seed=11)
+        for tx, ty in ((0, 0), (49, 36), (17, 20)):
+            self.assertEqual(baked.tile_at(tx, ty), generated.tile_at(tx, ty))
+        self.assertTrue(np.array_equal(baked.chunk(3, 2), generated.chunk(3, 2)))
+        self.assertEqual(baked.generated, 0)
+
+        with self.assertRaises(ValueError):
+            World(40, 30, seed=11, store=store)
+
+    def test_interrupted_bake_keeps_old_map(self):
+        """Test a bake that fails partway leaves the previous map and no temporary file"""
+        bake_world(self.path, 20, 10, seed=3)
+        with open(self.path, "rb") as f:
+            before = f.read()
+        with mock.patch("tile_store.generate_region", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                bake_world(self.path, 40, 30, seed=4)
+        self.assertEqual(os.listdir(self.tmp), ["world.tmap"])
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Tests for placed traps and their batched resolution
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+from creature import WILD_SPECIES
+from simulation import Overworld, new_headless_game
+from terrain import BIOME_IDS
+from trap_field import NO_CATCH, VISITS_PER_HOUR, TrapField, load_trap_kinds
+from world import World
+from world_clock import SECONDS_PER_HOUR
+
+FOREST = BIOME_IDS["forest"]
+
+
+class TestTrapKinds(unittest.TestCase):
+    """Test the trap tables built from the config"""
+
+    def test_tables_follow_the_config(self):
+        """Test effectiveness, durability and uses come from trap_types.yaml"""
+        names, params = load_trap_kinds(WILD_SPECIES)
+        net = names.index("basic_net")
+        windbird = [s.name for s in WILD_SPECIES].index("Windbird")
+        self.assertAlmostEqual(params["by_species"][net, windbird], 0.35 * 1.0 * 1.2)
+        self.assertEqual(params["durability"][net], 5)
+        self.assertEqual(params["uses"][net], 1)
+        self.assertEqual(params["uses"][names.index("reinforced_net")], 3)
+
+
+class TestTrapField(unittest.TestCase):
+    """Test placing, resolving and collecting traps"""
+
+    def setUp(self):
+        self.field = TrapField(rng=np.random.default_rng(3), capacity=2)
+
+    def test_slots_are_reused_and_arrays_grow(self):
+        """Test removed slots are reused and placing past capacity grows the arrays"""
+        traps = [self.field.place(i, 0, FOREST, "basic_net") for i in range(3)]
+        self.assertEqual(self.field.capacity, 4)
+        self.field.remove(traps[1])
+        self.assertNotIn(traps[1], self.field)
+        self.assertEqual(self.field.place(9, 9, FOREST, "cage_trap"), traps[1])
+        self.assertEqual(len(self.field), 3)
+        with self.assertRaises(KeyError):
+            self.field.remove(7)
+
+    def test_hourly_batch_matches_expected_catch_rate(self):
+        """Test the share of traps that catch in one hour matches visit and catch odds"""
+        n = 4000
+        for i in range(n):
+            self.field.place(i % 100, i // 100, FOREST, "master_net")
+        caught, broken = self.field.resolve_hours(self.field.ids(), hours=1.0)
+        k = self.field.kinds.index("master_net")
+        pool = self.field.pool_cum[FOREST]
+        species_odds = np.diff(np.concatenate([[0.0], pool]))
+        by_species = self.field.params["by_species"][k] * self.field.params["by_temperament"][k].mean()
+        chance = (np.minimum(by_species, 1.0) * species_odds).sum()
+        expected = (1.0 - np.exp(-VISITS_PER_HOUR)) * chance * n
+        self.assertAlmostEqual(len(caught) / expected, 1.0, delta=0.1)
+        self.assertEqual(len(broken), 0)
+        self.assertTrue((self.field.caught[caught] != NO_CATCH).all())
+
+        # traps holding a catch are not resolved again
+        again, _ = self.field.resolve_hours(caught, hours=5.0)
+        self.assertEqual(len(again), 0)
+
+    def test_no_visits_without_spawns(self):
+        """Test a zero spawn modifier means no trap is ever sprung"""
+        for i in range(50):
+            self.field.place(i, 0, FOREST, "basic_net")
+        spawn = np.zeros(len(BIOME_IDS))
+        caught, broken = self.field.resolve_hours(self.field.ids(), 10.0, spawn_modifiers=spawn)
+        self.assertEqual((len(caught), len(broken)), (0, 0))
+
+    def test_escapes_wear_traps_out(self):
+        """Test each escape costs durability and a worn-out trap is removed"""
+        trap = self.field.place(0, 0, FOREST, "pitfall_trap")
+        self.field.params["by_species"] = np.zeros_like(self.field.params["by_species"])
+        broken = []
+        for _ in range(200):
+            _, b = self.field.resolve_hours(self.field.ids(), hours=2.0)
+            broken.extend(b)
+        self.assertEqual(broken, [trap])
+        self.assertNotIn(trap, self.field)
+
+    def test_contact_catches_the_visitor_once(self):
+        """Test a creature on a trap's tile springs it, and only once in a row"""
+        trap = self.field.place(4, 5, FOREST, "basic_net")
+        self.field.params["by_species"] = np.zeros_like(self.field.params["by_species"])
+        tiles = np.array([[1, 1], [4, 5]], dtype=np.int32)
+        entities = np.array([10, 11])
+        args = (tiles, entities, np.array([0, 3]), np.array([0, 0]))
+        catches, _ = self.field.resolve_contacts(self.field.ids(), *args)
+        self.assertEqual(catches, [])
+        self.assertEqual(self.field.durability[trap], 4)
+        self.field.resolve_contacts(self.field.ids(), *args)
+        self.assertEqual(self.field.durability[trap], 4)  # same visitor, not sprung again
+
+        self.field.params["by_species"] += 1.0
+        catches, _ = self.field.resolve_contacts(self.field.ids(), tiles, np.array([10, 12]), *args[2:])
+        self.assertEqual(catches, [(trap, 12)])
+        self.assertEqual(self.field.caught[trap], 3)
+
+    def test_traps_sharing_a_tile_catch_a_creature_once(self):
+        """Test two traps on one tile spring only one of them on a single creature"""
+        first = self.field.place(3, 3, FOREST, "basic_net")
+        second = self.field.place(3, 3, FOREST, "basic_net")
+        self.field.params["by_species"] = np.ones_like(self.field.params["by_species"]) * 10.0
+        tiles = np.array([[3, 3]], dtype=np.int32)
+        args = (tiles, np.array([7]), np.array([0]), np.array([0]))
+        catches, _ = self.field.resolve_contacts(self.field.ids(), *args)
+        self.assertEqual(catches, [(first, 7)])
+        self.assertEqual(self.field.caught[second], NO_CATCH)
+
+    def test_collect_resets_reusable_traps(self):
+        """Test collecting re-sets a reusable trap until its uses run out"""
+        trap = self.field.place(0, 0, FOREST, "reinforced_net")
+        self.assertIsNone(self.field.collect(trap))
+        for i in range(3):
+            self.field.caught[trap] = 1
+            creature = self.field.collect(trap, random.Random(i))
+            self.assertEqual(creature.name, WILD_SPECIES[1].name)
+        self.assertNotIn(trap, self.field)
+
+
+class TestOverworldTraps(unittest.TestCase):
+    """Test traps placed and collected in the overworld"""
+
+    def setUp(self):
+        self.overworld = Overworld(new_headless_game(), World(40, 30, seed=2), 16, rng=random.Random(4))
+
+    def test_roaming_creature_is_caught_and_collected(self):
+        """Test a roamer stepping on a trap near the player ends up in the party"""
+        trap = self.overworld.place_trap("master_ball_trap")
+        self.overworld.traps.params["by_species"] += 1.0
+        entity = int(self.overworld.creatures.ids()[0])
+        tx, ty = self.overworld.traps.tile[trap]
+        self.overworld.creatures.pos[entity] = ((tx + 0.5) * 16, (ty + 0.5) * 16)
+        self.overworld.creatures.vel[entity] = 0.0
+        self.overworld.ticks = 5  # the next step checks contacts
+        events = self.overworld.step()
+        self.assertIn(("trapped", trap), events)
+        self.assertNotIn(entity, self.overworld.creatures)
+
+        party = len(self.overworld.game.player.party)
+        collected = self.overworld.collect_traps()
+        self.assertEqual(len(collected), 1)
+        self.assertEqual(len(self.overworld.game.player.party), party + 1)
+        self.assertNotIn(trap, self.overworld.traps)
+
+    def test_far_traps_resolve_hourly(self):
+        """Test traps away from the player are settled once per game hour"""
+        field = self.overworld.traps
+        field.params["by_species"] += 1.0
+        for i in range(40):
+            field.place(i, 0, FOREST, "master_net")
+        self.overworld.x, self.overworld.y = self.overworld.width - 20, self.overworld.height - 20  # far from row 0
+        field.params["by_temperament"] += 1.0
+        events = []
+        self.overworld.trap_seconds = SECONDS_PER_HOUR - 0.05
+        for _ in range(6):
+            events.extend(self.overworld.step())
+        self.assertGreater(sum(1 for kind, _ in events if kind == "trapped"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Tests for the event-driven widget layer
+"""
+
+import os
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+try:
+    import pygame
+    from ui import UI, Widget
+except ImportError:  # pygame is optional for the console game
+    pygame = None
+
+
+def mouse(kind, pos):
+    if kind == "motion":
+        return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))
+    etype = pygame.MOUSEBUTTONDOWN if kind == "down" else pygame.MOUSEBUTTONUP
+    return pygame.event.Event(etype, pos=pos, button=1)
+
+
+def key(k, mod=0):
+    return pygame.event.Event(pygame.KEYDOWN, key=k, mod=mod, unicode="")
+
+
+@unittest.skipIf(pygame is None, "pygame not installed")
+class TestUI(unittest.TestCase):
+    """Test event dispatch through the widget tree"""
+
+    def setUp(self):
+        self.ui = UI()
+        self.a = Widget((0, 0, 100, 40), "a")
+        self.b = Widget((0, 50, 100, 40), "b")
+        self.ui.set_widgets([self.a, self.b])
+
+    def test_click_fires_once_on_release(self):
+        """Test an action fires on mouse-up over the pressed widget, once"""
+        self.assertIsNone(self.ui.handle_event(mouse("down", (10, 10))))
+        self.assertIs(self.ui.handle_event(mouse("up", (10, 10))), self.a)
+        self.assertIsNone(self.ui.handle_event(mouse("up", (10, 10))))
+
+    def test_release_elsewhere_cancels(self):
+        """Test dragging off a widget before releasing does not click it"""
+        self.ui.handle_event(mouse("down", (10, 10)))
+        self.assertIsNone(self.ui.handle_event(mouse("up", (10, 60))))
+        self.assertTrue(self.b.hovered)
+        self.assertFalse(self.a.hovered)
+
+    def test_hit_test_prefers_topmost(self):
+        """Test overlapping widgets resolve to the one added last"""
+        panel = Widget((0, 0, 200, 200))
+        top = panel.add(Widget((5, 5, 20, 20), "top"))
+        self.ui.set_widgets([self.a, panel])
+        self.assertIs(self.ui.root.hit_test((10, 10)), top)
+        self.assertIsNone(self.ui.root.hit_test((150, 150)))
+
+    def test_keyboard_focus(self):
+        """Test Tab cycles focus, Enter activates and focus survives rebuilds"""
+        self.ui.handle_event(key(pygame.K_TAB))
+        self.assertIs(self.ui.focus, self.a)
+        self.ui.handle_event(key(pygame.K_TAB))
+        self.assertIs(self.ui.handle_event(key(pygame.K_RETURN)), self.b)
+        self.ui.handle_event(key(pygame.K_TAB, pygame.KMOD_SHIFT))
+        self.assertIs(self.ui.focus, self.a)
+        rebuilt = Widget((0, 0, 100, 40), "a")
+        self.ui.set_widgets([Widget((0, 50, 100, 40), "b"), rebuilt])
+        self.assertIs(self.ui.focus, rebuilt)
+        self.assertTrue(rebuilt.focused)
+
+
+if __name__ == '__main__':
+    unittest.main()
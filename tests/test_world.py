@@ -0,0 +1,92 @@
+"""
+Tests for chunked world generation and chunk surface streaming
+"""
+
+import os
+import unittest
+
+from terrain import BIOME_COLORS, BIOME_NAMES
+from world import World, CHUNK_TILES, DEFAULT_TILE
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+try:
+    import pygame
+    from world_chunks import ChunkCache
+except ImportError:  # pygame is optional for the console game
+    pygame = None
+
+
+class TestWorld(unittest.TestCase):
+    """Test chunked tile data"""
+
+    def test_chunks_are_deterministic(self):
+        """Test a chunk regenerates identically from (seed, cx, cy)"""
+        a = World(64, 64, seed=7, max_chunks=1)
+        b = World(64, 64, seed=7)
+        tiles = [a.tile_at(x, y) for y in range(0, 64, 5) for x in range(0, 64, 3)]
+        self.assertEqual(tiles, [b.tile_at(x, y) for y in range(0, 64, 5) for x in range(0, 64, 3)])
+        self.assertTrue(all(0 <= t < len(BIOME_NAMES) for t in tiles))
+
+    def test_edge_chunks_and_bounds(self):
+        """Test edge chunks are clipped to the world size"""
+        world = World(CHUNK_TILES + 5, CHUNK_TILES, seed=1)
+        self.assertEqual(world.chunk_cols, 2)
+        self.assertEqual(world.chunk_size(1, 0), (5, CHUNK_TILES))
+        self.assertEqual(world.chunk(1, 0).shape, (CHUNK_TILES, 5))
+        self.assertEqual(world.tile_at(-1, 0), DEFAULT_TILE)
+
+    def test_tile_cache_is_bounded(self):
+        """Test only max_chunks chunks of tile data are kept"""
+        world = World(CHUNK_TILES * 10, CHUNK_TILES * 10, max_chunks=4)
+        for cx in range(10):
+            world.chunk(cx, 0)
+        self.assertEqual(len(world._chunks), 4)
+        self.assertEqual(world.generated, 10)
+
+
+@unittest.skipIf(pygame is None, "pygame not installed")
+class TestChunkCache(unittest.TestCase):
+    """Test chunk surface streaming"""
+
+    TILE = 4
+
+    def setUp(self):
+        self.world = World(CHUNK_TILES * 8, CHUNK_TILES * 8, seed=3)
+
+    def test_memory_budget_evicts_lru(self):
+        """Test chunk surfaces stay within the memory budget"""
+        chunk_px = CHUNK_TILES * self.TILE
+        one_chunk = chunk_px * chunk_px * ChunkCache(self.world, BIOME_COLORS, self.TILE).rasterize(0, 0).get_bytesize()
+        cache = ChunkCache(self.world, BIOME_COLORS, self.TILE, budget_bytes=one_chunk * 3)
+        for cx in range(8):
+            cache.get(cx, 0)
+        self.assertEqual(len(cache), 3)
+        self.assertLessEqual(cache.memory_bytes, cache.budget_bytes)
+        self.assertEqual(cache.evictions, 5)
+        self.assertIn((7, 0), cache)
+        self.assertNotIn((0, 0), cache)
+
+    def test_prefetch_in_direction_of_travel(self):
+        """Test the chunks ahead of the camera are rasterized before they are visible"""
+        cache = ChunkCache(self.world, BIOME_COLORS, self.TILE)
+        chunk_px = CHUNK_TILES * self.TILE
+        view = pygame.Rect(0, 0, chunk_px, chunk_px)
+        self.assertEqual(cache.prefetch(view, 0, 0), 0)
+        self.assertEqual(cache.prefetch(view, 1, 0, max_chunks=4), 1)
+        self.assertIn((1, 0), cache)
+        self.assertNotIn((0, 0), cache)
+
+    def test_draw_view_matches_tiles(self):
+        """Test the composed view shows the right tile colors"""
+        cache = ChunkCache(self.world, BIOME_COLORS, self.TILE)
+        target = pygame.Surface((100, 100))
+        cam_x, cam_y = 50, 30
+        cache.draw_view(target, (0, 0, 100, 100), cam_x, cam_y)
+        for sx, sy in ((0, 0), (99, 99), (63, 10)):
+            tile = self.world.tile_at((cam_x + sx) // self.TILE, (cam_y + sy) // self.TILE)
+            self.assertEqual(tuple(target.get_at((sx, sy))[:3]), tuple(BIOME_COLORS[tile]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Tests for the world clock, weather chains and modifier tables
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+from config_loader import load_config
+from simulation import Overworld, new_headless_game
+from terrain import BIOME_IDS, BIOME_NAMES
+from world import World
+from world_clock import (CLIMATES, WEATHER_IDS, WEATHER_TYPES, ModifierTables, WeatherSystem, WorldClock,
+                         WorldConditions, transition_matrix)
+
+
+class TestConfigLoader(unittest.TestCase):
+    """Test cached config loading"""
+
+    def test_loads_once(self):
+        """Test the same parsed table is returned on every call"""
+        self.assertIs(load_config("creature_spawns"), load_config("creature_spawns"))
+        self.assertIn("time_periods", load_config("creature_spawns"))
+
+
+class TestWorldClock(unittest.TestCase):
+    """Test game time and periods"""
+
+    def test_periods_from_config(self):
+        """Test hours map to the configured periods, including night wrapping past midnight"""
+        clock = WorldClock(hour=0)
+        expected = {0: "night", 4: "night", 5: "dawn", 6: "dawn", 7: "day", 16: "day", 17: "dusk", 19: "night"}
+        for hour, period in expected.items():
+            clock.hours = hour
+            self.assertEqual(clock.period, period)
+
+    def test_advance_counts_hours(self):
+        """Test advancing reports the hour boundaries crossed"""
+        clock = WorldClock(hour=23.5, seconds_per_hour=10.0)
+        self.assertEqual(clock.advance(4.0), 0)
+        self.assertEqual(clock.advance(2.0), 1)
+        self.assertEqual(clock.day, 2)
+        self.assertEqual(clock.time_string(), "Day 2 00:06")
+
+
+class TestWeather(unittest.TestCase):
+    """Test the per-region weather Markov chains"""
+
+    def test_transition_rows_are_distributions(self):
+        """Test every climate's matrix rows sum to one and only reach allowed types"""
+        for frequencies in CLIMATES.values():
+            matrix = transition_matrix(frequencies)
+            np.testing.assert_allclose(matrix.sum(axis=1), 1.0)
+            allowed = [WEATHER_IDS[name] for name in frequencies]
+            disallowed = [i for i in range(len(WEATHER_TYPES)) if i not in allowed]
+            self.assertTrue(np.all(matrix[:, disallowed] == 0))
+
+    def test_regions_stay_in_their_climate(self):
+        """Test desert regions never snow and caves are always clear"""
+        weather = WeatherSystem(rng=np.random.default_rng(3))
+        desert, caves = BIOME_IDS["desert"], BIOME_IDS["caves"]
+        for _ in range(500):
+            weather.step()
+            self.assertIn(weather.weather(desert), CLIMATES["arid"])
+            self.assertEqual(weather.weather(caves), "clear")
+
+    def test_vectorized_step_matches_chain(self):
+        """Test the long-run weather frequencies match the chain's stationary distribution"""
+        regions = ["plains"] * 2000
+        weather = WeatherSystem(regions, rng=np.random.default_rng(5))
+        for _ in range(40):
+            weather.step()
+        matrix = transition_matrix(CLIMATES["temperate"])
+        values, vectors = np.linalg.eig(matrix.T)
+        stationary = np.real(vectors[:, np.argmin(abs(values - 1))])
+        stationary /= stationary.sum()
+        observed = np.bincount(weather.state, minlength=len(WEATHER_TYPES)) / len(regions)
+        np.testing.assert_allclose(observed, stationary, atol=0.04)
+
+
+class TestModifierTables(unittest.TestCase):
+    """Test spawn and capture modifier tables"""
+
+    def test_spawn_modifier_is_weighted_mean(self):
+        """Test a region's spawn modifier is the spawn-weighted mean of its creatures' modifiers"""
+        periods = ["day", "night"]
+        spawns = {"environments": {"forest": {"creatures": [
+            {"base_probability": 0.3, "time_modifiers": {"night": 2.0}, "weather_modifiers": {"rainy": 0.5}},
+            {"base_probability": 0.1, "time_modifiers": {"night": 1.0}, "weather_modifiers": {"any": 3.0}},
+        ]}}}
+        capture = {"environmental_modifiers": {"time_of_day": {}, "weather_conditions": {}}}
+        tables = ModifierTables(periods, ["forest", "plains"], spawns, capture)
+        rainy = WEATHER_IDS["rainy"]
+        self.assertAlmostEqual(tables.spawn[0, 1, rainy], (0.3 * 2.0 * 0.5 + 0.1 * 3.0) / 0.4)
+        self.assertTrue(np.all(tables.spawn[1] == 1.0))
+
+    def test_clear_night_capture_bonus(self):
+        """Test clear weather at night uses the clear_night capture modifier"""
+        tables = ModifierTables(["day", "night"])
+        capture = load_config("capture_probabilities")["environmental_modifiers"]
+        night = capture["time_of_day"]["night"]["base_modifier"]
+        clear_night = capture["weather_conditions"]["clear_night"]["base_modifier"]
+        self.assertAlmostEqual(tables.capture[1, WEATHER_IDS["clear"]], night * clear_night)
+
+
+class TestWorldConditions(unittest.TestCase):
+    """Test conditions refresh and the overworld hookup"""
+
+    def test_refresh_only_on_transitions(self):
+        """Test modifier arrays are only regathered when the period or weather changes"""
+        conditions = WorldConditions(seed=2, seconds_per_hour=10.0)
+        refreshes = conditions.refresh_count
+        for _ in range(599):
+            self.assertEqual(conditions.advance(1 / 60), [])
+        self.assertEqual(conditions.refresh_count, refreshes)
+        transitions = 0
+        for _ in range(60 * 10 * 48):
+            transitions += bool(conditions.advance(1 / 60))
+        self.assertEqual(conditions.refresh_count, refreshes + transitions)
+        self.assertLess(transitions, 49)
+
+    def test_modifiers_follow_current_state(self):
+        """Test the gathered modifiers match the tables at the current period and weather"""
+        conditions = WorldConditions(seed=4)
+        conditions.advance(conditions.clock.seconds_per_hour * 13)
+        forest = BIOME_IDS["forest"]
+        period = conditions.clock.period_index
+        weather = WEATHER_IDS[conditions.weather_at(forest)]
+        self.assertEqual(conditions.spawn_modifier(forest), conditions.tables.spawn[forest, period, weather])
+        self.assertEqual(len(conditions.spawn_modifiers), len(BIOME_NAMES))
+
+    def test_overworld_rate_uses_spawn_modifier(self):
+        """Test the overworld encounter rate scales with the region's spawn modifier"""
+        game = new_headless_game()
+        game.current_location = "Forest Path"
+        world = World(40, 30, seed=1)
+        plain = Overworld(game, world, 48, rng=random.Random(1))
+        weathered = Overworld(game, world, 48, rng=random.Random(1), conditions=WorldConditions(seed=1))
+        region = weathered.tile_under(weathered.x, weathered.y)
+        self.assertAlmostEqual(weathered.encounter_rate(),
+                               plain.encounter_rate() * weathered.conditions.spawn_modifier(region))
+
+
+if __name__ == '__main__':
+    unittest.main()
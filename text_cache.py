@@ -0,0 +1,76 @@
+"""
+Cache of rendered text surfaces for the Trapper-Mastering GUI.
+
+`font.render` rasterizes glyphs every time it is called, but the GUI draws the
+same strings (location labels, party list, battle log, button labels) frame
+after frame. Rendered surfaces are kept in an LRU cache keyed by
+(font, text, color, antialias). Static labels can be prerendered once and
+pinned so they are never evicted.
+"""
+
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 512
+
+
+class TextCache:
+    """
+    LRU cache of surfaces produced by `font.render`
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._pinned = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries) + len(self._pinned)
+
+    def render(self, font, text, color, antialias=True):
+        """Return the rendered surface for text, rasterizing it only on a miss"""
+        key = (font, text, tuple(color), antialias)
+
+        surf = self._pinned.get(key)
+        if surf is not None:
+            self.hits += 1
+            return surf
+
+        surf = self._entries.get(key)
+        if surf is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self._entries[key] = surf
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def prerender(self, font, labels, color, antialias=True):
+        """Render static labels once and pin them so they are never evicted"""
+        for text in labels:
+            key = (font, text, tuple(color), antialias)
+            if key not in self._pinned:
+                self._pinned[key] = self._entries.pop(key, None) or font.render(text, antialias, color)
+
+    def hit_rate(self):
+        """Fraction of lookups served from the cache"""
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+    def clear(self):
+        """Drop every cached surface, including pinned labels"""
+        self._entries.clear()
+        self._pinned.clear()
+
+
+# Shared cache used by gui_app.draw_text
+TEXT_CACHE = TextCache()
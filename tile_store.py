@@ -0,0 +1,166 @@
+"""
+File-backed tile-id storage for the Trapper-Mastering world map.
+
+A tile map is stored as one small header, a tile-type table and a packed
+uint8 (or uint16) array of tile ids, which is opened with `numpy.memmap`.
+Opening a map only maps the file; pages are read on first touch and shared
+between processes, and each tile costs one byte on disk and in memory.
+
+File layout (little endian):
+    magic      4s   b"TMAP"
+    version    u16
+    itemsize   u16  1 (uint8 ids) or 2 (uint16 ids)
+    width      u32
+    height     u32
+    tile_count u32
+    tile table tile_count x 32-byte NUL-padded UTF-8 names
+    padding    up to DATA_ALIGN bytes
+    tiles      height x width ids, row major
+
+Bake a map offline with:
+    python tile_store.py world.tmap --width 4096 --height 4096 --seed 1234
+"""
+
+import argparse
+import os
+import struct
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from terrain import BIOME_NAMES, generate_region
+
+MAGIC = b"TMAP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIII")
+NAME_BYTES = 32
+DATA_ALIGN = 64
+DTYPES = {1: np.uint8, 2: np.uint16}
+BAKE_STRIP_TILES = 1 << 20  # tiles generated per strip while baking
+
+
+def _data_offset(tile_count):
+    end = HEADER.size + tile_count * NAME_BYTES
+    return (end + DATA_ALIGN - 1) // DATA_ALIGN * DATA_ALIGN
+
+
+class TileStore:
+    """
+    A memory-mapped tile-id map with a tile-type table
+    """
+
+    def __init__(self, path, mode="r"):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is not a tile map")
+            magic, version, itemsize, width, height, tile_count = HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a tile map")
+            if version != VERSION or itemsize not in DTYPES:
+                raise ValueError(f"{path} has unsupported tile map version {version}")
+            table = f.read(tile_count * NAME_BYTES)
+
+        self.width = width
+        self.height = height
+        self.tile_names = [
+            table[i * NAME_BYTES:(i + 1) * NAME_BYTES].rstrip(b"\0").decode("utf-8")
+            for i in range(tile_count)
+        ]
+        self.tile_ids = {name: i for i, name in enumerate(self.tile_names)}
+        self.tiles = np.memmap(path, dtype=DTYPES[itemsize], mode=mode,
+                               offset=_data_offset(tile_count), shape=(height, width))
+
+    @classmethod
+    def create(cls, path, width, height, tile_names, dtype=np.uint8):
+        """Create a new zero-filled tile map file and open it for writing"""
+        itemsize = np.dtype(dtype).itemsize
+        if itemsize not in DTYPES:
+            raise ValueError("tile ids must be uint8 or uint16")
+        if len(tile_names) > np.iinfo(DTYPES[itemsize]).max + 1:
+            raise ValueError(f"{len(tile_names)} tile types do not fit in {np.dtype(dtype).name}")
+
+        offset = _data_offset(len(tile_names))
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, itemsize, width, height, len(tile_names)))
+            for name in tile_names:
+                encoded = name.encode("utf-8")
+                if len(encoded) > NAME_BYTES:
+                    raise ValueError(f"tile name {name!r} is longer than {NAME_BYTES} bytes")
+                f.write(encoded.ljust(NAME_BYTES, b"\0"))
+            f.truncate(offset + width * height * itemsize)
+        return cls(path, mode="r+")
+
+    def region(self, x0, y0, width, height):
+        """A view (no copy) of a block of tile ids"""
+        return self.tiles[y0:y0 + height, x0:x0 + width]
+
+    def tile_id(self, name):
+        """Look up the id of a tile type"""
+        return self.tile_ids[name]
+
+    def tile_name(self, tile_id):
+        """Look up the name of a tile id"""
+        return self.tile_names[tile_id]
+
+    def flush(self):
+        """Write pending changes to disk"""
+        self.tiles.flush()
+
+    def close(self):
+        """Flush and drop the mapping (it is unmapped once no views remain)"""
+        if self.tiles is not None and self.tiles.mode != "r":
+            self.tiles.flush()
+        self.tiles = None
+
+
+def _bake_strip(args):
+    seed, y0, width, height = args
+    return y0, generate_region(seed, 0, y0, width, height)
+
+
+def bake_world(path, width, height, seed, workers=None):
+    """
+    Generate a whole world with `terrain` and write it to a tile map file.
+    The map is baked into a temporary file next to `path` and moved into
+    place when complete, so an interrupted bake never leaves a partial map.
+    """
+    fd, partial = tempfile.mkstemp(suffix=".part", dir=os.path.dirname(os.path.abspath(path)))
+    os.close(fd)
+    try:
+        store = TileStore.create(partial, width, height, BIOME_NAMES)
+        # Terrain noise depends only on global tile coordinates, so the map can
+        # be generated in full-width strips; each strip bounds peak memory.
+        strip_rows = max(1, BAKE_STRIP_TILES // max(1, width))
+        jobs = [(seed, y0, width, min(strip_rows, height - y0)) for y0 in range(0, height, strip_rows)]
+        if workers and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for y0, ids in pool.map(_bake_strip, jobs):
+                    store.tiles[y0:y0 + ids.shape[0]] = ids
+        else:
+            for y0, ids in map(_bake_strip, jobs):
+                store.tiles[y0:y0 + ids.shape[0]] = ids
+        store.close()
+        os.replace(partial, path)
+    except BaseException:
+        os.remove(partial)
+        raise
+    return TileStore(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bake a procedural world into a tile map file")
+    parser.add_argument("path")
+    parser.add_argument("--width", type=int, required=True)
+    parser.add_argument("--height", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    store = bake_world(args.path, args.width, args.height, args.seed, workers=args.workers)
+    print(f"Wrote {store.width}x{store.height} tiles to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Traps placed on the world map and left to catch wild creatures over time.
+
+A placed trap sits on a tile until the player collects its catch. Its odds come
+from config/trap_types.yaml: the trap's base effectiveness times its
+multipliers for the creature's type and temperament. Species have no size
+yet, so every creature counts as "medium". Durability is the number of
+escapes a trap withstands before it breaks. A catch holds the trap until it
+is collected. After collection a reusable trap is set again, until its
+reuse_count is used up.
+
+Traps are resolved at two levels of detail:
+- near the player, `resolve_contacts` springs a trap when one of the roaming
+  creatures simulated there steps onto its tile;
+- everywhere else, `resolve_hours` settles all traps in one vectorized batch
+  per game hour. A visit is drawn from each trap tile's spawn modifier, the
+  visitor's species from the tile's spawn pool, and the outcome from the
+  effectiveness table, with the temperament averaged out.
+Berry lures (berry_lures.LureField) near a trap raise its visit and catch
+odds either way.
+All traps live in flat NumPy arrays with free-list slot reuse, like
+entities.EntityStore.
+
+This module has no pygame dependency.
+"""
+
+import random
+
+import numpy as np
+
+from behavior import TEMPERAMENTS
+from config_loader import load_config
+from encounters import ENCOUNTERS
+
+DEFAULT_CAPACITY = 64
+CREATURE_SIZE = "medium"  # species have no size yet
+VISITS_PER_HOUR = 0.5  # creatures passing an unwatched trap per game hour, times the spawn modifier
+NO_CATCH = -1
+
+
+def load_trap_kinds(species, temperaments=TEMPERAMENTS):
+    """
+    Trap kind names and their parameters as arrays: base effectiveness times
+    type multiplier by (kind, species) and behavior multiplier by (kind,
+    temperament), durability, and how many catches each trap yields.
+    """
+    table = load_config("trap_types")["trap_types"]
+    names = list(table)
+    by_species = np.ones((len(names), len(species)))
+    by_temperament = np.ones((len(names), len(temperaments)))
+    for k, name in enumerate(names):
+        trap = table[name]
+        multipliers = trap.get("effectiveness_multipliers", {})
+        size = multipliers.get("creature_size", {}).get(CREATURE_SIZE, 1.0)
+        types = multipliers.get("creature_type", {})
+        behaviors = multipliers.get("creature_behavior", {})
+        for s, kind in enumerate(species):
+            by_species[k, s] = trap["base_effectiveness"] * size * types.get(kind.type.lower(), 1.0)
+        for t, temperament in enumerate(temperaments):
+            by_temperament[k, t] = behaviors.get(temperament, 1.0)
+    return names, {
+        "by_species": by_species,
+        "by_temperament": by_temperament,
+        "durability": np.array([table[n].get("durability", 1) for n in names]),
+        "uses": np.array([table[n].get("reuse_count", 1) if table[n].get("reusable") else 1 for n in names]),
+    }
+
+
+class TrapField:
+    """
+    Placed traps, resolved near the player by contact and elsewhere in hourly batches
+    """
+
+    def __init__(self, encounters=ENCOUNTERS, capacity=DEFAULT_CAPACITY, rng=None):
+        self.encounters = encounters
+        self.species = encounters.default_pool.species
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.kinds, self.params = load_trap_kinds(self.species)
+        # cumulative spawn pool weights per biome id, for drawing visitors in a batch
+        cum = np.array([pool.cum_weights for pool in encounters.tile_pools], dtype=float)
+        self.pool_cum = cum / cum[:, -1:]
+        self.capacity = 0
+        self.alive = np.zeros(0, dtype=bool)
+        self.tile = np.zeros((0, 2), dtype=np.int32)
+        self.biome = np.zeros(0, dtype=np.int16)
+        self.kind = np.zeros(0, dtype=np.int16)
+        self.durability = np.zeros(0, dtype=np.int16)
+        self.uses = np.zeros(0, dtype=np.int16)  # catches left to collect, including a held one
+        self.caught = np.zeros(0, dtype=np.int16)  # species index of the held creature, or NO_CATCH
+        self.last_visitor = np.zeros(0, dtype=np.int64)  # entity that last sprung the trap by contact
+        self.free = []
+        self.size = 0
+        self.count = 0
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        def resized(array, fill=0):
+            out = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            out[:len(array)] = array
+            return out
+
+        self.alive = resized(self.alive)
+        self.tile = resized(self.tile)
+        self.biome = resized(self.biome)
+        self.kind = resized(self.kind)
+        self.durability = resized(self.durability)
+        self.uses = resized(self.uses)
+        self.caught = resized(self.caught, NO_CATCH)
+        self.last_visitor = resized(self.last_visitor, -1)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, trap):
+        return 0 <= trap < self.size and bool(self.alive[trap])
+
+    def place(self, tx, ty, biome, kind):
+        """Set a trap of a named kind on a tile of the given biome id; returns its id"""
+        k = self.kinds.index(kind)
+        if self.free:
+            trap = self.free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(max(1, self.capacity * 2))
+            trap = self.size
+            self.size += 1
+        self.alive[trap] = True
+        self.tile[trap] = (tx, ty)
+        self.biome[trap] = biome
+        self.kind[trap] = k
+        self.durability[trap] = self.params["durability"][k]
+        self.uses[trap] = self.params["uses"][k]
+        self.caught[trap] = NO_CATCH
+        self.last_visitor[trap] = -1
+        self.count += 1
+        return trap
+
+    def remove(self, trap):
+        """Take a trap off the map; its slot is reused by a later placement"""
+        if trap not in self:
+            raise KeyError(trap)
+        self.alive[trap] = False
+        self.caught[trap] = NO_CATCH
+        self.free.append(trap)
+        self.count -= 1
+
+    def ids(self):
+        """Ids of all placed traps"""
+        return np.flatnonzero(self.alive[:self.size])
+
+    def ready(self):
+        """Ids of traps holding a catch"""
+        n = self.size
+        return np.flatnonzero(self.alive[:n] & (self.caught[:n] != NO_CATCH))
+
+    def near(self, tx, ty, radius):
+        """Mask over [:size] of placed traps within a radius in tiles of a tile"""
+        n = self.size
+        offset = self.tile[:n] - (tx, ty)
+        return self.alive[:n] & ((offset ** 2).sum(axis=1) <= radius * radius)
+
+    def _spring(self, idx, species, chance):
+        """
+        Resolve triggered traps: catch with the given chances, otherwise
+        wear them down. Returns the ids of traps that caught and that broke.
+        """
+        caught = self.rng.random(len(idx)) < chance
+        self.caught[idx[caught]] = species[caught]
+        escaped = idx[~caught]
+        self.durability[escaped] -= 1
+        broken = escaped[self.durability[escaped] <= 0]
+        for trap in broken:
+            self.remove(int(trap))
+        return idx[caught], broken
+
+    def resolve_hours(self, idx, hours=1.0, spawn_modifiers=None, capture_modifiers=None, lures=None):
+        """
+        Settle the selected traps over some game hours in one batch.
+
+        Modifiers are per-biome arrays from world_clock.WorldConditions, or
+        None for 1, and `lures` is a berry_lures.LureField or None. Returns
+        the ids of traps that caught and that broke.
+        """
+        idx = idx[self.caught[idx] == NO_CATCH]
+        biome = self.biome[idx]
+        rate = VISITS_PER_HOUR * hours * np.ones(len(idx))
+        if spawn_modifiers is not None:
+            rate *= spawn_modifiers[biome]
+        lure_capture = 1.0
+        if lures is not None:
+            lure_spawn, lure_capture = lures.boosts(self.tile[idx])
+            rate *= lure_spawn
+        visited = self.rng.random(len(idx)) < 1.0 - np.exp(-rate)
+        idx = idx[visited]
+        biome = biome[visited]
+        if lures is not None:
+            lure_capture = lure_capture[visited]
+        species = (self.rng.random(len(idx))[:, None] >= self.pool_cum[biome]).sum(axis=1)
+        species = np.minimum(species, len(self.species) - 1)
+        kind = self.kind[idx]
+        chance = self.params["by_species"][kind, species] * self.params["by_temperament"][kind].mean(axis=1)
+        chance = chance * lure_capture
+        if capture_modifiers is not None:
+            chance = chance * capture_modifiers[biome]
+        return self._spring(idx, species, chance)
+
+    def resolve_contacts(self, idx, tiles, entities, species, temperaments, capture_modifiers=None, lures=None):
+        """
+        Spring the selected traps on creatures standing on their tiles.
+
+        `tiles`, `entities`, `species` and `temperaments` describe the
+        creatures nearby, one row each. Modifiers and lures are as for
+        `resolve_hours`. A trap is sprung at most once per call and never
+        twice in a row by the same creature, and a creature springs at most
+        one trap per call. Returns
+        (trap, entity) pairs for catches and the ids of traps that broke.
+        """
+        idx = idx[self.caught[idx] == NO_CATCH]
+        if len(idx) == 0 or len(entities) == 0:
+            return [], np.zeros(0, dtype=np.int64)
+        on_tile = (self.tile[idx][:, None, :] == tiles[None, :, :]).all(axis=2)
+        on_tile &= entities[None, :] != self.last_visitor[idx][:, None]
+        hit = on_tile.any(axis=1)
+        idx = idx[hit]
+        visitor = on_tile[hit].argmax(axis=1)  # the first creature on each sprung trap's tile
+        # traps sharing a tile would all spring on the same creature; it can only end up in one
+        _, first = np.unique(visitor, return_index=True)
+        first = np.sort(first)
+        idx = idx[first]
+        visitor = visitor[first]
+        self.last_visitor[idx] = entities[visitor]
+        kind = self.kind[idx]
+        chance = (self.params["by_species"][kind, species[visitor]]
+                  * self.params["by_temperament"][kind, temperaments[visitor]])
+        if capture_modifiers is not None:
+            chance = chance * capture_modifiers[self.biome[idx]]
+        if lures is not None:
+            chance = chance * lures.boosts(self.tile[idx])[1]
+        caught, broken = self._spring(idx, species[visitor], chance)
+        catches = [(int(trap), int(entity)) for trap, entity in zip(idx, entities[visitor]) if trap in caught]
+        return catches, broken
+
+    def collect(self, trap, rng=random):
+        """
+        Take the creature out of a trap, or None if it is empty. The trap is
+        set again if it has catches left and removed otherwise.
+        """
+        if trap not in self or self.caught[trap] == NO_CATCH:
+            return None
+        creature = self.species[self.caught[trap]].create(rng)
+        self.caught[trap] = NO_CATCH
+        self.last_visitor[trap] = -1
+        self.uses[trap] -= 1
+        if self.uses[trap] <= 0:
+            self.remove(trap)
+        return creature
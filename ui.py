@@ -0,0 +1,160 @@
+"""
+Event-driven widget layer for the Trapper-Mastering GUI.
+
+Widgets form a tree of rects. `UI.handle_event` takes pygame events straight
+from the event queue: mouse motion updates hover, a click activates the widget
+the button was both pressed and released on, and Tab / Enter / Space move and
+activate keyboard focus. Nothing polls the mouse or sleeps, so a click costs
+a hit-test and never stalls the frame, and holding the button down fires an
+action exactly once.
+
+Activating a widget returns it from `handle_event`; the caller reacts to its
+`action` value, the same way simulation ticks report events.
+"""
+
+import pygame
+from pygame import Rect
+
+ACTIVATE_KEYS = (pygame.K_RETURN, pygame.K_KP_ENTER, pygame.K_SPACE)
+
+
+class Widget:
+    """
+    A node in the widget tree
+
+    A widget with an action can be clicked or focused and activated. A widget
+    without a rect (rect=None) covers the whole screen, like the root.
+    """
+
+    def __init__(self, rect=None, action=None):
+        self.rect = Rect(rect) if rect is not None else None
+        self.action = action
+        self.visible = True
+        self.enabled = True
+        self.hovered = False
+        self.focused = False
+        self.parent = None
+        self.children = []
+
+    @property
+    def interactive(self):
+        return self.action is not None and self.visible and self.enabled
+
+    def add(self, child):
+        """Append a child widget (drawn and hit-tested above earlier children)"""
+        child.parent = self
+        self.children.append(child)
+        return child
+
+    def clear(self):
+        """Remove all children"""
+        for child in self.children:
+            child.parent = None
+        self.children = []
+
+    def contains(self, pos):
+        return self.rect is None or self.rect.collidepoint(pos)
+
+    def walk(self):
+        """This widget and its visible descendants, in tree order"""
+        yield self
+        for child in self.children:
+            if child.visible:
+                yield from child.walk()
+
+    def hit_test(self, pos):
+        """The topmost interactive widget under pos, or None"""
+        if not self.visible or not self.contains(pos):
+            return None
+        for child in reversed(self.children):
+            hit = child.hit_test(pos)
+            if hit is not None:
+                return hit
+        return self if self.interactive else None
+
+    def on_key(self, event):
+        """Handle a key press while focused; return True if it was consumed"""
+        return False
+
+
+class UI:
+    """
+    Routes pygame events through a widget tree
+    """
+
+    def __init__(self):
+        self.root = Widget()
+        self.hover = None
+        self.focus = None
+        self.pointer = (-1, -1)
+        self._pressed = None
+
+    def set_widgets(self, widgets):
+        """Replace the widget tree, keeping focus on a widget with the same action"""
+        focus_action = self.focus.action if self.focus is not None else None
+        self.root.clear()
+        for widget in widgets:
+            self.root.add(widget)
+        self._pressed = None
+        self.focus = None
+        if focus_action is not None:
+            for widget in self.focusable():
+                if widget.action == focus_action:
+                    self.set_focus(widget)
+                    break
+        self._update_hover(self.pointer)
+
+    def focusable(self):
+        """Interactive widgets in tab order"""
+        return [w for w in self.root.walk() if w.interactive]
+
+    def set_focus(self, widget):
+        if self.focus is not None:
+            self.focus.focused = False
+        self.focus = widget
+        if widget is not None:
+            widget.focused = True
+
+    def _update_hover(self, pos):
+        self.pointer = pos
+        hit = self.root.hit_test(pos)
+        if hit is not self.hover:
+            if self.hover is not None:
+                self.hover.hovered = False
+            if hit is not None:
+                hit.hovered = True
+            self.hover = hit
+
+    def _cycle_focus(self, step):
+        widgets = self.focusable()
+        if not widgets:
+            self.set_focus(None)
+            return
+        if self.focus in widgets:
+            i = (widgets.index(self.focus) + step) % len(widgets)
+        else:
+            i = 0 if step > 0 else len(widgets) - 1
+        self.set_focus(widgets[i])
+
+    def handle_event(self, event):
+        """Process one event; return the widget it activated, if any"""
+        if event.type == pygame.MOUSEMOTION:
+            self._update_hover(event.pos)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self._update_hover(event.pos)
+            self._pressed = self.hover
+            if self.hover is not None:
+                self.set_focus(self.hover)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self._update_hover(event.pos)
+            pressed, self._pressed = self._pressed, None
+            if pressed is not None and pressed is self.hover:
+                return pressed
+        elif event.type == pygame.KEYDOWN:
+            if self.focus is not None and self.focus.on_key(event):
+                return None
+            if event.key == pygame.K_TAB:
+                self._cycle_focus(-1 if event.mod & pygame.KMOD_SHIFT else 1)
+            elif event.key in ACTIVATE_KEYS and self.focus is not None and self.focus.interactive:
+                return self.focus
+        return None
@@ -0,0 +1,86 @@
+"""
+Overworld tile data for Trapper-Mastering.
+
+The world is split into fixed-size square chunks of tiles. Each tile is a
+biome id (see `terrain.BIOMES`), and each chunk is generated deterministically
+from (seed, chunk x, chunk y), so any chunk can be produced on demand without
+generating the rest of the map, and only recently used chunks are kept in
+memory. A world can instead be backed by a baked, memory-mapped
+`tile_store.TileStore`, in which case chunks are views into the mapped file.
+This module has no pygame dependency; see `world_chunks.py` for rasterizing
+chunks into surfaces.
+"""
+
+from collections import OrderedDict
+
+from terrain import BIOME_IDS, BIOME_NAMES, generate_chunk
+
+CHUNK_TILES = 16  # chunk width/height in tiles
+DEFAULT_MAX_CHUNKS = 1024  # tile-data chunks kept in memory
+DEFAULT_TILE = BIOME_IDS["plains"]  # reported for coordinates outside the world
+
+
+class World:
+    """
+    A tile map of cols x rows tiles generated chunk by chunk
+    """
+
+    def __init__(self, cols, rows, seed=0, chunk_tiles=CHUNK_TILES, max_chunks=DEFAULT_MAX_CHUNKS, store=None):
+        if store is not None:
+            if store.tile_names != BIOME_NAMES:
+                raise ValueError("tile map was baked with a different biome table")
+            if (store.width, store.height) != (cols, rows):
+                raise ValueError("tile map size does not match the world size")
+        self.store = store
+        self.cols = cols
+        self.rows = rows
+        self.seed = seed
+        self.chunk_tiles = chunk_tiles
+        self.max_chunks = max_chunks
+        self.chunk_cols = (cols + chunk_tiles - 1) // chunk_tiles
+        self.chunk_rows = (rows + chunk_tiles - 1) // chunk_tiles
+        self._chunks = OrderedDict()
+        self.generated = 0
+
+    def in_bounds(self, tx, ty):
+        """Check if a tile coordinate lies inside the world"""
+        return 0 <= tx < self.cols and 0 <= ty < self.rows
+
+    def has_chunk(self, cx, cy):
+        """Check if a chunk coordinate lies inside the world"""
+        return 0 <= cx < self.chunk_cols and 0 <= cy < self.chunk_rows
+
+    def chunk_size(self, cx, cy):
+        """Width and height in tiles of a chunk (edge chunks may be smaller)"""
+        width = min(self.chunk_tiles, self.cols - cx * self.chunk_tiles)
+        height = min(self.chunk_tiles, self.rows - cy * self.chunk_tiles)
+        return width, height
+
+    def chunk(self, cx, cy):
+        """Get the (height, width) biome-id array of a chunk, generating it if needed"""
+        key = (cx, cy)
+        tiles = self._chunks.get(key)
+        if tiles is not None:
+            self._chunks.move_to_end(key)
+            return tiles
+
+        width, height = self.chunk_size(cx, cy)
+        if self.store is not None:
+            tiles = self.store.region(cx * self.chunk_tiles, cy * self.chunk_tiles, width, height)
+        else:
+            tiles = generate_chunk(self.seed, cx, cy, self.chunk_tiles, width, height)
+            self.generated += 1
+        self._chunks[key] = tiles
+        while len(self._chunks) > self.max_chunks:
+            self._chunks.popitem(last=False)
+        return tiles
+
+    def tile_at(self, tx, ty, default=DEFAULT_TILE):
+        """Get the biome id of the tile at a tile coordinate"""
+        if not self.in_bounds(tx, ty):
+            return default
+        if self.store is not None:
+            return int(self.store.tiles[ty, tx])
+        cx, lx = divmod(tx, self.chunk_tiles)
+        cy, ly = divmod(ty, self.chunk_tiles)
+        return int(self.chunk(cx, cy)[ly, lx])
@@ -0,0 +1,126 @@
+"""
+Streaming chunk rasterizer for the Trapper-Mastering overworld.
+
+Instead of painting the whole world into one huge surface, each chunk of a
+`world.World` is rasterized into its own surface the first time the camera
+needs it, by mapping its biome ids through a color palette in one NumPy
+operation. Chunk surfaces live in an LRU cache bounded by a memory budget, and
+chunks just ahead of the camera in the direction of travel are prefetched a
+few at a time so they are ready before they scroll into view.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+from pygame import Rect
+
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+DEFAULT_PREFETCH_PER_FRAME = 1
+
+
+class ChunkCache:
+    """
+    LRU cache of rasterized chunk surfaces with a memory budget
+    """
+
+    def __init__(self, world, palette, tile_size, budget_bytes=DEFAULT_BUDGET_BYTES, tile_images=None):
+        self.world = world
+        self.palette = np.asarray(palette, dtype=np.uint8)
+        self.tile_size = tile_size
+        self.budget_bytes = budget_bytes
+        self.tile_images = tile_images or {}  # optional biome id -> tile surface overrides
+        self.chunk_px = world.chunk_tiles * tile_size
+        self._surfaces = OrderedDict()
+        self.memory_bytes = 0
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefetched = 0
+
+    def __contains__(self, key):
+        return key in self._surfaces
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def rasterize(self, cx, cy):
+        """Paint the tiles of one chunk into a new surface"""
+        tiles = self.world.chunk(cx, cy)
+        ts = self.tile_size
+        # (h, w) ids -> (h * ts, w * ts, 3) colors, transposed to pygame's (x, y) order
+        pixels = self.palette[tiles].repeat(ts, axis=0).repeat(ts, axis=1)
+        surf = pygame.surfarray.make_surface(pixels.swapaxes(0, 1))
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert()
+        if self.tile_images:
+            for tile_id, img in self.tile_images.items():
+                for ly, lx in zip(*np.nonzero(tiles == tile_id)):
+                    surf.blit(img, (int(lx) * ts, int(ly) * ts))
+        return surf
+
+    def _store(self, key, surf):
+        self._surfaces[key] = surf
+        self.memory_bytes += surf.get_width() * surf.get_height() * surf.get_bytesize()
+        # Never evict the chunk just stored, even if it alone exceeds the budget
+        while self.memory_bytes > self.budget_bytes and len(self._surfaces) > 1:
+            _, old = self._surfaces.popitem(last=False)
+            self.memory_bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+            self.evictions += 1
+
+    def get(self, cx, cy):
+        """Get the surface for a chunk, rasterizing it on a miss"""
+        key = (cx, cy)
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = self.rasterize(cx, cy)
+        self._store(key, surf)
+        return surf
+
+    def chunks_in_view(self, view):
+        """Chunk coordinates overlapping a world-space rect"""
+        view = Rect(view)
+        cx0 = max(0, view.left // self.chunk_px)
+        cy0 = max(0, view.top // self.chunk_px)
+        cx1 = min(self.world.chunk_cols - 1, (view.right - 1) // self.chunk_px)
+        cy1 = min(self.world.chunk_rows - 1, (view.bottom - 1) // self.chunk_px)
+        return [(cx, cy) for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1)]
+
+    def prefetch(self, view, vx, vy, max_chunks=DEFAULT_PREFETCH_PER_FRAME):
+        """Rasterize up to max_chunks chunks one chunk ahead of the view along (vx, vy)"""
+        if vx == 0 and vy == 0:
+            return 0
+        ahead = Rect(view)
+        if vx:
+            ahead.x += self.chunk_px if vx > 0 else -self.chunk_px
+        if vy:
+            ahead.y += self.chunk_px if vy > 0 else -self.chunk_px
+        done = 0
+        for cx, cy in self.chunks_in_view(ahead):
+            if done >= max_chunks:
+                break
+            if (cx, cy) in self._surfaces or not self.world.has_chunk(cx, cy):
+                continue
+            self._store((cx, cy), self.rasterize(cx, cy))
+            self.prefetched += 1
+            done += 1
+        return done
+
+    def draw_view(self, surface, dest, cam_x, cam_y):
+        """Blit the part of the world at (cam_x, cam_y) that fits in the dest rect"""
+        dest = Rect(dest)
+        view = Rect(cam_x, cam_y, dest.width, dest.height)
+        for cx, cy in self.chunks_in_view(view):
+            surf = self.get(cx, cy)
+            wx = cx * self.chunk_px
+            wy = cy * self.chunk_px
+            area = view.clip(Rect(wx, wy, surf.get_width(), surf.get_height()))
+            if area.width <= 0 or area.height <= 0:
+                continue
+            pos = (dest.x + area.x - cam_x, dest.y + area.y - cam_y)
+            surface.blit(surf, pos, area=area.move(-wx, -wy))
@@ -0,0 +1,275 @@
+"""
+World time, day-night periods and weather for Trapper-Mastering.
+
+A `WorldClock` runs game hours from real seconds. The hour maps to a time
+period (dawn, day, dusk, night) through the `time_periods` table in
+config/creature_spawns.yaml. Every biome is a weather region. Each region's
+weather is a Markov chain whose transition matrix comes from the region's
+climate. The matrices are built once, and all regions advance together in
+one vectorized NumPy step per game hour.
+
+Spawn and capture modifiers from the config tables depend only on the
+period and each region's weather. Their full (period x weather) tensors are
+built once at load. `WorldConditions` gathers the current per-region values
+from them only when the period or some region's weather changes, so
+encounters and captures just index an array.
+
+This module has no pygame dependency.
+"""
+
+import numpy as np
+
+from config_loader import load_config
+from terrain import BIOME_NAMES, BIOME_TERRAIN, TERRAIN_WATER
+
+SECONDS_PER_HOUR = 30.0  # real seconds per game hour: a 12 minute day
+START_HOUR = 8.0
+WEATHER_PERSISTENCE = 0.7  # chance a region keeps its weather for another hour
+
+WEATHER_TYPES = ["sunny", "clear", "cloudy", "rainy", "stormy", "foggy",
+                 "snowy", "blizzard", "sandstorm", "ash_fall"]
+WEATHER_IDS = {name: i for i, name in enumerate(WEATHER_TYPES)}
+
+# Relative frequency of each weather type in a climate; missing types never occur
+CLIMATES = {
+    "temperate": {"sunny": 4, "cloudy": 3, "rainy": 2, "stormy": 0.5, "foggy": 1},
+    "wet": {"sunny": 2, "cloudy": 3, "rainy": 3, "stormy": 1, "foggy": 2},
+    "arid": {"sunny": 5, "clear": 3, "cloudy": 1, "rainy": 0.3, "sandstorm": 1},
+    "volcanic": {"sunny": 2, "clear": 2, "cloudy": 2, "rainy": 0.5, "ash_fall": 2},
+    "cold": {"sunny": 2, "clear": 2, "cloudy": 3, "snowy": 3, "blizzard": 1},
+    "underground": {"clear": 1},
+}
+CLIMATE_NAMES = list(CLIMATES)
+BIOME_CLIMATES = {
+    "desert": "arid", "dunes": "arid", "salt_flats": "arid", "badlands": "arid",
+    "volcano": "volcanic", "obsidian_wastes": "volcanic", "lava_tubes": "volcanic", "gas_vents": "volcanic",
+    "glacier": "cold", "tundra": "cold", "storm_peaks": "cold",
+    "caves": "underground", "mineshafts": "underground", "crystal_caves": "underground",
+}
+
+
+def biome_climate(biome):
+    """Climate name of a biome; water biomes default to wet, the rest to temperate"""
+    if biome in BIOME_CLIMATES:
+        return BIOME_CLIMATES[biome]
+    return "wet" if BIOME_TERRAIN[BIOME_NAMES.index(biome)] == TERRAIN_WATER else "temperate"
+
+
+def transition_matrix(frequencies, persistence=WEATHER_PERSISTENCE):
+    """
+    Weather transition matrix of a climate: stay with chance `persistence`,
+    otherwise move to another allowed type in proportion to its frequency.
+    Types the climate does not allow are always left on the next step.
+    """
+    n = len(WEATHER_TYPES)
+    weights = np.zeros(n)
+    for name, weight in frequencies.items():
+        weights[WEATHER_IDS[name]] = weight
+    matrix = np.zeros((n, n))
+    for i in range(n):
+        others = weights.copy()
+        others[i] = 0.0
+        if weights[i] > 0 and others.sum() == 0:
+            matrix[i, i] = 1.0
+        elif weights[i] > 0:
+            matrix[i] = (1.0 - persistence) * others / others.sum()
+            matrix[i, i] = persistence
+        else:
+            matrix[i] = weights / weights.sum()
+    return matrix
+
+
+def period_table(time_periods):
+    """Period names and the period index of each of the 24 hours"""
+    names = list(time_periods)
+    by_hour = np.zeros(24, dtype=np.int64)
+    for i, name in enumerate(names):
+        start = time_periods[name]["start_hour"]
+        end = time_periods[name]["end_hour"]
+        hours = range(start, end) if start < end else list(range(start, 24)) + list(range(end))
+        by_hour[list(hours)] = i
+    return names, by_hour
+
+
+class WorldClock:
+    """
+    Game time of day, advanced from real seconds
+    """
+
+    def __init__(self, hour=START_HOUR, seconds_per_hour=SECONDS_PER_HOUR, time_periods=None):
+        if time_periods is None:
+            time_periods = load_config("creature_spawns")["time_periods"]
+        self.periods, self.period_by_hour = period_table(time_periods)
+        self.seconds_per_hour = seconds_per_hour
+        self.hours = float(hour)  # game hours since day 1 midnight
+
+    @property
+    def hour(self):
+        """Hour of the day, 0..23"""
+        return int(self.hours) % 24
+
+    @property
+    def day(self):
+        return int(self.hours) // 24 + 1
+
+    @property
+    def period_index(self):
+        return int(self.period_by_hour[self.hour])
+
+    @property
+    def period(self):
+        return self.periods[self.period_index]
+
+    def advance(self, dt):
+        """Advance by dt real seconds; returns how many hour boundaries were crossed"""
+        before = int(self.hours)
+        self.hours += dt / self.seconds_per_hour
+        return int(self.hours) - before
+
+    def time_string(self):
+        minutes = int(self.hours * 60 + 1e-6)  # absorb float drift from summing frame times
+        return f"Day {minutes // 1440 + 1} {minutes // 60 % 24:02d}:{minutes % 60:02d}"
+
+
+class WeatherSystem:
+    """
+    Weather of every region as Markov chains advanced together
+    """
+
+    def __init__(self, regions=BIOME_NAMES, rng=None, persistence=WEATHER_PERSISTENCE):
+        self.regions = list(regions)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        matrices = np.stack([transition_matrix(CLIMATES[c], persistence) for c in CLIMATE_NAMES])
+        self.cum = np.cumsum(matrices, axis=2)
+        self.cum[:, :, -1] = 1.0  # guard against rounding leaving a gap at the top
+        self.climate = np.array([CLIMATE_NAMES.index(biome_climate(r)) for r in self.regions])
+        # start each region on its climate's most common weather, then mix a little
+        start = [max(CLIMATES[CLIMATE_NAMES[c]].items(), key=lambda item: item[1])[0] for c in self.climate]
+        self.state = np.array([WEATHER_IDS[name] for name in start])
+        for _ in range(3):
+            self.step()
+
+    def step(self):
+        """Advance every region one hour; returns the indices of regions whose weather changed"""
+        rows = self.cum[self.climate, self.state]
+        u = self.rng.random(len(self.regions))
+        new = (u[:, None] >= rows).sum(axis=1)
+        changed = np.flatnonzero(new != self.state)
+        self.state = new
+        return changed
+
+    def weather(self, region):
+        return WEATHER_TYPES[self.state[region]]
+
+
+def weather_modifier(modifiers, weather):
+    """A config weather modifier, falling back to an `any` entry, then to 1"""
+    return modifiers.get(weather, modifiers.get("any", 1.0))
+
+
+class ModifierTables:
+    """
+    Spawn and capture modifiers for every (region, period, weather)
+
+    Built once from the config tables. A region's spawn modifier is the
+    spawn-weighted mean of its environment's creature time and weather
+    modifiers, so it scales how often anything appears there; regions with
+    no environment in the config get 1. Capture modifiers are the product of
+    the period's and the weather's base modifiers.
+    """
+
+    def __init__(self, periods, regions=BIOME_NAMES, spawns=None, capture=None):
+        if spawns is None:
+            spawns = load_config("creature_spawns")
+        if capture is None:
+            capture = load_config("capture_probabilities")
+        environments = spawns["environments"]
+        self.spawn = np.ones((len(regions), len(periods), len(WEATHER_TYPES)))
+        for r, region in enumerate(regions):
+            creatures = environments.get(region, {}).get("creatures", [])
+            total = sum(c["base_probability"] for c in creatures)
+            if not total:
+                continue
+            for p, period in enumerate(periods):
+                for w, weather in enumerate(WEATHER_TYPES):
+                    self.spawn[r, p, w] = sum(
+                        c["base_probability"] * c.get("time_modifiers", {}).get(period, 1.0)
+                        * weather_modifier(c.get("weather_modifiers", {}), weather)
+                        for c in creatures) / total
+
+        env = capture["environmental_modifiers"]
+        times = env["time_of_day"]
+        weathers = env["weather_conditions"]
+        self.capture = np.ones((len(periods), len(WEATHER_TYPES)))
+        for p, period in enumerate(periods):
+            for w, weather in enumerate(WEATHER_TYPES):
+                if period == "night" and weather in ("sunny", "clear") and "clear_night" in weathers:
+                    weather = "clear_night"
+                self.capture[p, w] = (times.get(period, {}).get("base_modifier", 1.0)
+                                      * weathers.get(weather, {}).get("base_modifier", 1.0))
+
+
+class WorldConditions:
+    """
+    The clock, the weather and the current per-region modifiers
+
+    `advance` runs the clock each tick; the weather steps once per game
+    hour. With an event_calendar.EventCalendar, active events scale the
+    spawn modifiers too. The current modifier arrays are refreshed only when
+    the period, any region's weather or the set of active events changed.
+    """
+
+    def __init__(self, seed=None, hour=START_HOUR, seconds_per_hour=SECONDS_PER_HOUR, regions=BIOME_NAMES,
+                 calendar=None):
+        self.clock = WorldClock(hour, seconds_per_hour)
+        self.weather = WeatherSystem(regions, np.random.default_rng(seed))
+        self.tables = ModifierTables(self.clock.periods, regions)
+        self.region_ids = np.arange(len(self.weather.regions))
+        self.calendar = calendar
+        self.events = calendar.state(self.clock.hours) if calendar is not None else None
+        self.refresh_count = 0
+        self.refresh()
+
+    def refresh(self):
+        """Gather the current spawn and capture modifier of every region"""
+        period = self.clock.period_index
+        self.period = self.clock.periods[period]
+        self.spawn_modifiers = self.tables.spawn[self.region_ids, period, self.weather.state]
+        if self.events is not None:
+            self.spawn_modifiers = self.spawn_modifiers * self.events.spawn_multiplier
+        self.capture_modifiers = self.tables.capture[period, self.weather.state]
+        self.refresh_count += 1
+
+    def advance(self, dt):
+        """
+        Advance by dt real seconds.
+
+        Returns a list of events: ("period", period name), ("weather",
+        array of the region ids whose weather changed) and, with a calendar,
+        ("calendar", names of the events now active).
+        """
+        events = []
+        hours = self.clock.advance(dt)
+        if self.events is not None and self.clock.hours >= self.events.until:
+            self.events = self.calendar.state(self.clock.hours)
+            events.append(("calendar", self.events.names))
+        if hours:
+            changed = np.zeros(0, dtype=np.int64)
+            for _ in range(hours):
+                changed = np.union1d(changed, self.weather.step())
+            if len(changed):
+                events.append(("weather", changed))
+            if self.clock.period != self.period:
+                events.append(("period", self.clock.period))
+        if events:
+            self.refresh()
+        return events
+
+    def spawn_modifier(self, region):
+        return float(self.spawn_modifiers[region])
+
+    def capture_modifier(self, region):
+        return float(self.capture_modifiers[region])
+
+    def weather_at(self, region):
+        return self.weather.weather(region)